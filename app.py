@@ -1,21 +1,50 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import config
+from utils.metrics import InstrumentedJWTManager
+from utils.replicas import RoutingSession
 
-db = SQLAlchemy()
-jwt = JWTManager()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = InstrumentedJWTManager()
 
 @jwt.user_identity_loader
 def user_identity_lookup(user):
     """Convert user object to identity for JWT"""
     return str(user.id) if user else None
 
-def create_app(config_name='default'):
+@jwt.additional_claims_loader
+def add_claims_to_access_token(user):
+    """Embed the role and token version so requests authorize from claims"""
+    return {'role': user.role, 'ver': user.token_version}
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(_jwt_header, jwt_data):
+    from utils.identity import is_token_revoked
+    return is_token_revoked(jwt_data)
+
+@jwt.user_lookup_loader
+def user_lookup_callback(_jwt_header, jwt_data):
+    """Build the caller's identity once per request; exposed via get_current_user()"""
+    from utils.identity import load_identity
+    return load_identity(jwt_data)
+
+def create_app(config_name='default', overrides=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if overrides:
+        app.config.update(overrides)
+    
+    from utils.json_provider import configure_json
+    from utils.metrics import init_metrics
+    from utils.ratelimit import init_rate_limiter
+    configure_json(app)
+    init_metrics(app)
+    init_rate_limiter(app)
     
+    from utils.engine import engine_options, tune_engine
+    from utils.replicas import init_replica_router
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
 
     db.init_app(app)
     jwt.init_app(app)
@@ -23,10 +52,49 @@ def create_app(config_name='default'):
     
     from routes.auth import auth_bp
     from routes.tasks import tasks_bp
+    from routes.jobs import jobs_bp
+    from utils.identity import identity_cache
+    from utils.cache import init_response_cache
+    from utils.events import init_events
+    from utils.passwords import init_password_hasher
+    from utils.jobs import init_jobs
+    
+    identity_cache.configure(
+        maxsize=app.config['IDENTITY_CACHE_SIZE'],
+        ttl=app.config['IDENTITY_CACHE_TTL']
+    )
+    init_response_cache(app)
+    init_events(app)
+    init_password_hasher(app)
+    init_jobs(app)
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(tasks_bp, url_prefix='/api')
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    
+    if app.config['API_DOCS_ENABLED']:
+        register_api_docs(app)
+    
+    with app.app_context():
+        tune_engine(db.engine, app.config)
+        init_replica_router(app)
+        if app.config['DB_CREATE_ALL']:
+            db.create_all()
+    
+    if app.config['ASYNC_MODE']:
+        # Swap in coroutine views over the same routes; serve with asgi.py
+        from utils.async_db import async_db
+        from routes.async_auth import async_views as async_auth_views
+        from routes.async_tasks import async_views as async_task_views
+        
+        async_db.init_app(app)
+        app.view_functions.update(async_auth_views)
+        app.view_functions.update(async_task_views)
     
+    return app
+
+def register_api_docs(app):
+    """Mount the Swagger UI; flask_swagger_ui is only imported when docs are enabled"""
     from flask_swagger_ui import get_swaggerui_blueprint
     
     SWAGGER_URL = '/api/docs'
@@ -41,11 +109,6 @@ def create_app(config_name='default'):
     )
     
     app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
-    
-    with app.app_context():
-        db.create_all()
-    
-    return app
 
 if __name__ == '__main__':
     app = create_app()
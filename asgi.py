@@ -0,0 +1,151 @@
+"""
+ASGI entry point for the async deployment mode.
+
+Serve with any ASGI server, e.g.:
+
+    uvicorn --factory asgi:create_asgi_app
+    hypercorn "asgi:create_asgi_app()"
+"""
+
+import inspect
+import io
+import os
+import sys
+from asgiref.wsgi import WsgiToAsgi
+from flask import request, request_started
+from werkzeug.exceptions import HTTPException
+from app import create_app
+from utils.async_db import async_db
+
+class AsyncDispatcher:
+    """ASGI application around a Flask app built with ASYNC_MODE.
+    
+    Endpoints whose view is a coroutine function are awaited directly on the
+    server's event loop, with Flask's request context, hooks and error
+    handlers applied as in Flask.full_dispatch_request(). A waiting request
+    then costs a task instead of a thread. Every other endpoint (batch
+    writes, export, docs) runs through the WSGI app on asgiref's thread pool.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+        
+        body = await self.read_body(receive)
+        environ = self.build_environ(scope, body)
+        
+        if not self.is_async_endpoint(environ):
+            async def replay():
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            return await self.wsgi(scope, replay, send)
+        
+        status, headers, chunks = await self.dispatch(environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+    
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose(self.app)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    @staticmethod
+    async def read_body(receive):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return body
+    
+    @staticmethod
+    def build_environ(scope, body):
+        script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+        path_info = scope['path'].encode('utf8').decode('latin1')
+        if path_info.startswith(script_name):
+            path_info = path_info[len(script_name):]
+        server = scope.get('server') or ('localhost', 80)
+        
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': script_name,
+            'PATH_INFO': path_info,
+            'QUERY_STRING': scope['query_string'].decode('latin1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+        if scope.get('client'):
+            environ['REMOTE_ADDR'] = scope['client'][0]
+        
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1').upper().replace('-', '_')
+            if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = f'HTTP_{name}'
+            value = value.decode('latin1')
+            environ[name] = f'{environ[name]},{value}' if name in environ else value
+        return environ
+    
+    def is_async_endpoint(self, environ):
+        try:
+            rule, _ = self.app.url_map.bind_to_environ(environ).match(return_rule=True)
+        except HTTPException:
+            return False  # Let the WSGI app render routing errors
+        return inspect.iscoroutinefunction(self.app.view_functions.get(rule.endpoint))
+    
+    async def dispatch(self, environ):
+        app = self.app
+        error = None
+        ctx = app.request_context(environ)
+        ctx.push()
+        try:
+            try:
+                response = app.finalize_request(await self.full_dispatch())
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            
+            headers = [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in response.get_wsgi_headers(environ).items()
+            ]
+            return response.status_code, headers, list(response.get_app_iter(environ))
+        finally:
+            await async_db.remove()
+            ctx.pop(error)
+    
+    async def full_dispatch(self):
+        app = self.app
+        try:
+            request_started.send(app)
+            rv = app.preprocess_request()
+            if rv is None:
+                if request.routing_exception is not None:
+                    app.raise_routing_exception(request)
+                view = app.view_functions[request.url_rule.endpoint]
+                rv = await view(**request.view_args)
+        except Exception as e:
+            rv = app.handle_user_exception(e)
+        return rv
+
+def create_asgi_app(config_name=None):
+    """Build the app in ASYNC_MODE and wrap it for an ASGI server"""
+    config_name = config_name or os.environ.get('FLASK_CONFIG', 'default')
+    return AsyncDispatcher(create_app(config_name, {'ASYNC_MODE': True}))
@@ -0,0 +1,92 @@
+"""
+Seed a database with benchmark users and tasks through the models
+
+Usage: python -m bench.data [--config development] [--users 100] [--tasks 10000]
+
+Users are bench_user0..N-1 plus bench_admin0..K-1, all with the password
+'benchpass123', so a server seeded this way can be benchmarked with
+python -m bench.runner --url ...
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from app import create_app, db
+from models.user import User
+from models.task import Task
+
+PASSWORD = 'benchpass123'
+WORDS = (
+    'report', 'review', 'deploy', 'invoice', 'meeting', 'design', 'budget',
+    'release', 'backup', 'migration', 'feedback', 'roadmap', 'audit', 'hiring',
+    'customer', 'security', 'onboarding', 'analytics', 'cleanup', 'research'
+)
+
+def usernames(users, admins):
+    return [f'bench_user{i}' for i in range(users)], [f'bench_admin{i}' for i in range(admins)]
+
+def seed(app, users=100, tasks=10000, admins=1, chunk_size=5000, seed=0):
+    """Insert users and tasks (spread over the last year) with ORM bulk inserts.
+    
+    Every user shares one password hash, computed once, so seeding does not
+    pay the hashing cost per user. Returns the user and admin usernames.
+    """
+    rng = random.Random(seed)
+    user_names, admin_names = usernames(users, admins)
+    now = datetime.utcnow()
+    
+    with app.app_context():
+        db.create_all()
+        probe = User()
+        probe.set_password(PASSWORD)
+        password_hash = probe.password_hash
+        
+        db.session.execute(insert(User), [{
+            'username': name,
+            'email': f'{name}@bench.example.com',
+            'password_hash': password_hash,
+            'role': 'admin' if name in admin_names else 'user',
+            'created_at': now,
+            'updated_at': now
+        } for name in user_names + admin_names])
+        
+        user_ids = db.session.scalars(
+            select(User.id).where(User.username.in_(user_names))
+        ).all()
+        
+        for start in range(0, tasks, chunk_size):
+            rows = []
+            for _ in range(min(chunk_size, tasks - start)):
+                created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                words = rng.sample(WORDS, 3)
+                rows.append({
+                    'title': ' '.join(words[:2]).capitalize(),
+                    'description': f'Follow up on the {words[2]} for the {words[0]}',
+                    'completed': rng.random() < 0.3,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                    'user_id': rng.choice(user_ids)
+                })
+            db.session.execute(insert(Task), rows)
+        
+        db.session.commit()
+    
+    return user_names, admin_names
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='development', help='Config name whose database is seeded')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--admins', type=int, default=1)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+    
+    app = create_app(args.config)
+    seed(app, args.users, args.tasks, args.admins, seed=args.seed)
+    print(f'Seeded {args.users} users, {args.admins} admins and {args.tasks} tasks '
+          f"into {app.config['SQLALCHEMY_DATABASE_URI']} (password: {PASSWORD})")
+
+if __name__ == '__main__':
+    main()
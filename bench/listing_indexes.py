@@ -0,0 +1,123 @@
+"""
+Listing latency before and after the composite task indexes
+
+Usage: python -m bench.listing_indexes [--tasks 1000000] [--users 1000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+from migrate_db import upgrade
+
+# Schema as created by db.create_all() before the indexes were introduced
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY,
+    username VARCHAR(80) NOT NULL UNIQUE,
+    email VARCHAR(120) NOT NULL UNIQUE,
+    password_hash VARCHAR(128) NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME
+);
+CREATE TABLE tasks (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    completed BOOLEAN NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    user_id INTEGER NOT NULL REFERENCES users (id)
+);
+"""
+
+COLUMNS = 'id, title, description, completed, created_at, updated_at, user_id'
+
+# The statements get_tasks issues for each listing shape
+SCENARIOS = [
+    ('user page 1', f'SELECT {COLUMNS} FROM tasks WHERE user_id = :user '
+                    'ORDER BY created_at DESC LIMIT 10'),
+    ('user count', 'SELECT COUNT(*) FROM tasks WHERE user_id = :user'),
+    ('user open tasks', f'SELECT {COLUMNS} FROM tasks WHERE user_id = :user AND completed = 0 '
+                        'ORDER BY created_at DESC LIMIT 10'),
+    ('admin page 1', f'SELECT {COLUMNS} FROM tasks ORDER BY created_at DESC LIMIT 10'),
+    ('admin page 5000', f'SELECT {COLUMNS} FROM tasks ORDER BY created_at DESC '
+                        'LIMIT 10 OFFSET 50000'),
+    ('admin keyset', f'SELECT {COLUMNS} FROM tasks WHERE (created_at, id) < (:created_at, :id) '
+                     'ORDER BY created_at DESC, id DESC LIMIT 10'),
+]
+
+def seed(path, n_users, n_tasks):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    now = datetime(2024, 1, 1)
+    conn.executemany(
+        'INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?)',
+        ((i, f'user{i}', f'user{i}@example.com', 'x', 'user', now, now)
+         for i in range(1, n_users + 1))
+    )
+    rng = random.Random(42)
+    conn.executemany(
+        'INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)',
+        ((i, f'Task {i}', f'Description {i}', rng.random() < 0.5,
+          (now + timedelta(seconds=i)).isoformat(sep=' '),
+          (now + timedelta(seconds=i)).isoformat(sep=' '),
+          rng.randint(1, n_users))
+         for i in range(1, n_tasks + 1))
+    )
+    conn.commit()
+    conn.close()
+
+def measure(conn, sql, params, repeat):
+    stmt = text(sql)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(stmt, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def run_scenarios(engine, params, repeat):
+    with engine.connect() as conn:
+        return {name: measure(conn, sql, params, repeat) for name, sql in SCENARIOS}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        print(f"Seeding {args.tasks:,} tasks across {args.users:,} users...")
+        seed(path, args.users, args.tasks)
+        
+        engine = create_engine(f'sqlite:///{path}')
+        params = {
+            'user': args.users // 2,
+            'created_at': (datetime(2024, 1, 1) + timedelta(seconds=args.tasks // 2)).isoformat(sep=' '),
+            'id': args.tasks // 2,
+        }
+        
+        before = run_scenarios(engine, params, args.repeat)
+        start = time.perf_counter()
+        upgrade(engine)
+        build_time = time.perf_counter() - start
+        after = run_scenarios(engine, params, args.repeat)
+        engine.dispose()
+    
+    print(f"Index build: {build_time:.1f}s")
+    print(f"{'scenario':<18}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for name, _ in SCENARIOS:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<18}{before[name]:>14.2f}{after[name]:>14.2f}{speedup:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
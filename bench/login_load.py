@@ -0,0 +1,122 @@
+"""
+Login latency under a concurrent login storm, with unrelated task traffic
+
+Usage: python -m bench.login_load [--clients 32] [--logins 8] [--rounds 12]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from app import create_app, db
+from config import config, TestingConfig
+from models.user import User
+from bench.stats import percentile
+
+def make_app(path, workers, rounds, max_pending):
+    config['bench'] = type('BenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'PASSWORD_BCRYPT_ROUNDS': rounds,
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_MAX_PENDING': max_pending,
+    })
+    return create_app('bench')
+
+def seed(app, n_users):
+    with app.app_context():
+        db.create_all()
+        password_hash = None
+        for i in range(n_users):
+            user = User(username=f'user{i}', email=f'user{i}@example.com')
+            if password_hash is None:
+                user.set_password('password123')
+                password_hash = user.password_hash
+            user.password_hash = password_hash
+            db.session.add(user)
+        db.session.commit()
+
+def run_scenario(app, clients, logins_per_client, listers):
+    login_times, list_times, statuses = [], [], {}
+    lock = threading.Lock()
+    done = threading.Event()
+    
+    with app.test_client() as client:
+        token = client.post('/api/auth/login', json={
+            'username': 'user0', 'password': 'password123'
+        }).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    
+    def login_worker(index):
+        client = app.test_client()
+        for _ in range(logins_per_client):
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', json={
+                'username': f'user{index}', 'password': 'password123'
+            })
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    login_times.append(elapsed)
+    
+    def list_worker():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/api/tasks', headers=headers)
+            with lock:
+                list_times.append((time.perf_counter() - start) * 1000)
+    
+    listing_threads = [threading.Thread(target=list_worker) for _ in range(listers)]
+    login_threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in listing_threads + login_threads:
+        thread.start()
+    for thread in login_threads:
+        thread.join()
+    done.set()
+    for thread in listing_threads:
+        thread.join()
+    
+    return {
+        'duration': time.perf_counter() - started,
+        'statuses': statuses,
+        'login': login_times,
+        'listing': list_times,
+    }
+
+def report(name, result):
+    ok = result['statuses'].get(200, 0)
+    print(f"\n{name}: {ok / result['duration']:.1f} logins/s, statuses {result['statuses']}")
+    for label in ('login', 'listing'):
+        samples = result[label]
+        print(f"  {label:<8} n={len(samples):<5} p50={percentile(samples, 50):8.1f}ms "
+              f"p95={percentile(samples, 95):8.1f}ms p99={percentile(samples, 99):8.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent login clients')
+    parser.add_argument('--logins', type=int, default=8, help='Logins per client')
+    parser.add_argument('--listers', type=int, default=4, help='Concurrent listing clients')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='Hashing queue bound (default: 2 x workers)')
+    args = parser.parse_args()
+    max_pending = args.max_pending or 2 * args.workers
+    
+    scenarios = [
+        ('inline hashing (request thread)', 0),
+        (f'pool: {args.workers} workers, max {max_pending} pending', args.workers),
+    ]
+    for name, workers in scenarios:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = make_app(os.path.join(tmp, 'bench.db'), workers, args.rounds, max_pending)
+            seed(app, args.clients)
+            report(name, run_scenario(app, args.clients, args.logins, args.listers))
+            with app.app_context():
+                db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
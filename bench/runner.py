@@ -0,0 +1,179 @@
+"""
+API benchmark suite: scenario throughput and latency, with JSON baselines
+
+Usage:
+  python -m bench.runner [--users 50] [--tasks 5000] [--requests 200] [--concurrency 4]
+  python -m bench.runner --url http://127.0.0.1:5000 --users 100   # after python -m bench.data,
+                                                                   # server run with RATELIMIT_ENABLED=false
+  python -m bench.runner --save bench/baseline.json
+  python -m bench.runner --baseline bench/baseline.json --threshold 0.25
+
+Without --url the suite seeds a temporary database and drives the app
+through the Flask test client. With --url it benchmarks a running server
+whose database was seeded with python -m bench.data using the same
+--users/--admins and started with RATELIMIT_ENABLED=false; the run
+aborts with status 2 if the server answers 429. Exits with status 1
+when --baseline is given and a scenario regressed by more than
+--threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from app import create_app, db
+from config import config, TestingConfig
+from bench.data import seed, usernames
+from bench.scenarios import SCENARIOS, TestClientTransport, HTTPTransport, RateLimited, build_context
+from bench.stats import summarize
+
+def make_app(path, rounds):
+    config['bench'] = type('BenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'PASSWORD_BCRYPT_ROUNDS': rounds,
+    })
+    return create_app('bench')
+
+def run_scenario(transport, scenario, context, requests, concurrency, seed=0):
+    """Run `requests` operations of one scenario spread over `concurrency` clients.
+    
+    Raises RateLimited if any request got 429: those would be counted as
+    errors and skew the latencies, so the run is not worth recording.
+    """
+    latencies, errors, limited = [], [0], [0]
+    lock = threading.Lock()
+    remaining = [requests]
+    
+    def worker(index):
+        client = transport.client()
+        rng = random.Random(seed * 1000 + index)
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                status = scenario(client, context, rng)
+            except Exception:
+                status = 599
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if status == 429:
+                    limited[0] += 1
+                if status >= 400:
+                    errors[0] += 1
+                else:
+                    latencies.append(elapsed)
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if limited[0]:
+        raise RateLimited(f'{limited[0]} of {requests} {scenario.__name__} requests got 429')
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+def run_suite(transport, user_names, admin_names, names, requests, concurrency):
+    context = build_context(transport.client(), user_names, admin_names)
+    return {
+        name: run_scenario(transport, SCENARIOS[name], context, requests, concurrency)
+        for name in names
+    }
+
+def compare(results, baseline, threshold):
+    """Regressions against a saved baseline: p95 slower or throughput lower by more than threshold"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        if base['p95'] and result['p95'] > base['p95'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95']:.1f}ms -> {result['p95']:.1f}ms")
+        if base['throughput'] and result['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f}/s -> {result['throughput']:.1f}/s")
+        if result['errors'] > base['errors']:
+            regressions.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+def report(results):
+    print(f"\n{'scenario':<16} {'reqs':>6} {'errs':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, result in results.items():
+        print(f"{name:<16} {result['requests']:>6} {result['errors']:>5} {result['throughput']:>8.1f} "
+              f"{result['p50']:>6.1f}ms {result['p95']:>6.1f}ms {result['p99']:>6.1f}ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Benchmark a running server instead of the test client')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--admins', type=int, default=1)
+    parser.add_argument('--tasks', type=int, default=5000, help='Tasks to seed (test client mode)')
+    parser.add_argument('--rounds', type=int, default=4, help='bcrypt cost (test client mode)')
+    parser.add_argument('--requests', type=int, default=200, help='Operations per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--save', help='Write the results as a JSON baseline')
+    parser.add_argument('--baseline', help='Compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative regression (default: 0.2 = 20%%)')
+    args = parser.parse_args(argv)
+    
+    names = [name for name in args.scenarios.split(',') if name]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    user_names, admin_names = usernames(args.users, args.admins)
+    
+    if args.url:
+        target = args.url
+        try:
+            results = run_suite(HTTPTransport(args.url), user_names, admin_names, names,
+                                args.requests, args.concurrency)
+        except RateLimited as err:
+            print(f'Aborted: {err}. Restart the server with RATELIMIT_ENABLED=false.', file=sys.stderr)
+            return 2
+    else:
+        target = 'test client'
+        with tempfile.TemporaryDirectory() as tmp:
+            app = make_app(os.path.join(tmp, 'bench.db'), args.rounds)
+            seed(app, args.users, args.tasks, args.admins)
+            results = run_suite(TestClientTransport(app), user_names, admin_names, names,
+                                args.requests, args.concurrency)
+            with app.app_context():
+                db.engine.dispose()
+    
+    report(results)
+    
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'target': target,
+                'python': platform.python_version(),
+                'options': {key: getattr(args, key) for key in ('users', 'tasks', 'requests', 'concurrency')},
+                'scenarios': results
+            }, f, indent=2)
+        print(f'\nBaseline saved to {args.save}')
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f'\nRegressions beyond {args.threshold:.0%}:')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'\nNo regressions beyond {args.threshold:.0%} against {args.baseline}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Benchmark scenarios: each makes one logical operation through a transport client
+
+A scenario is a function (client, context, rng) -> HTTP status of its last
+request; statuses >= 400 count as errors. context is built once per run by
+build_context() and holds tokens and known task ids.
+"""
+
+import http.client
+from json import dumps, loads
+from urllib.parse import urlsplit
+from bench.data import PASSWORD, WORDS
+
+class TestClientTransport:
+    """Requests through the Flask test client of an in-process app"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    def client(self):
+        return TestClientSession(self.app.test_client())
+
+class TestClientSession:
+    def __init__(self, client):
+        self._client = client
+    
+    def request(self, method, path, json=None, headers=None):
+        response = self._client.open(path, method=method, json=json, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+class HTTPTransport:
+    """Requests to a running server, one keep-alive connection per client"""
+    
+    def __init__(self, base_url):
+        self.url = urlsplit(base_url)
+    
+    def client(self):
+        return HTTPSession(self.url)
+
+class HTTPSession:
+    def __init__(self, url):
+        self.url = url
+        self._connection = None
+    
+    def request(self, method, path, json=None, headers=None):
+        body = None
+        headers = dict(headers or {})
+        if json is not None:
+            body = dumps(json)
+            headers['Content-Type'] = 'application/json'
+        
+        for attempt in (1, 2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=60)
+            try:
+                self._connection.request(method, self.url.path.rstrip('/') + path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; retry once
+                self._connection.close()
+                self._connection = None
+                if attempt == 2:
+                    raise
+        
+        payload = None
+        if response.getheader('Content-Type', '').startswith('application/json') and data:
+            payload = loads(data)
+        return response.status, payload
+
+class RateLimited(RuntimeError):
+    """The target server answered 429; its numbers would measure the limiter"""
+
+def auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def login(client, username):
+    status, payload = client.request('POST', '/api/auth/login', json={
+        'username': username, 'password': PASSWORD
+    })
+    if status == 429:
+        raise RateLimited('the server rate-limited the benchmark logins')
+    if status != 200:
+        raise RuntimeError(f'Cannot log in as {username!r} ({status}); seed the database with bench.data')
+    return payload['access_token']
+
+def build_context(client, user_names, admin_names, sample_users=20):
+    """Log in a sample of users and the admins, and collect task ids and page counts"""
+    users = []
+    for username in user_names[:sample_users]:
+        token = login(client, username)
+        _, payload = client.request('GET', '/api/tasks?per_page=100', headers=auth(token))
+        users.append({
+            'username': username,
+            'token': token,
+            'task_ids': [task['id'] for task in payload['tasks']],
+            'pages': payload['pagination']['pages']
+        })
+    
+    admins = [{'username': name, 'token': login(client, name)} for name in admin_names]
+    _, payload = client.request('GET', '/api/tasks', headers=auth(admins[0]['token']))
+    return {
+        'user_names': user_names,
+        'users': users,
+        'admins': admins,
+        'admin_pages': payload['pagination']['pages']
+    }
+
+def login_scenario(client, context, rng):
+    status, _ = client.request('POST', '/api/auth/login', json={
+        'username': rng.choice(context['user_names']), 'password': PASSWORD
+    })
+    return status
+
+def list_first_page(client, context, rng):
+    user = rng.choice(context['users'])
+    status, _ = client.request('GET', '/api/tasks?page=1', headers=auth(user['token']))
+    return status
+
+def list_deep_page(client, context, rng):
+    user = rng.choice(context['users'])
+    status, _ = client.request('GET', f"/api/tasks?page={max(1, user['pages'])}", headers=auth(user['token']))
+    return status
+
+def list_search(client, context, rng):
+    user = rng.choice(context['users'])
+    status, _ = client.request('GET', f'/api/tasks?search={rng.choice(WORDS)}', headers=auth(user['token']))
+    return status
+
+def list_completed(client, context, rng):
+    user = rng.choice(context['users'])
+    completed = rng.choice(('true', 'false'))
+    status, _ = client.request('GET', f'/api/tasks?completed={completed}', headers=auth(user['token']))
+    return status
+
+def get_task(client, context, rng):
+    user = rng.choice([user for user in context['users'] if user['task_ids']])
+    status, _ = client.request('GET', f"/api/tasks/{rng.choice(user['task_ids'])}", headers=auth(user['token']))
+    return status
+
+def crud_mix(client, context, rng):
+    """Create, read, update and delete one task"""
+    headers = auth(rng.choice(context['users'])['token'])
+    status, payload = client.request('POST', '/api/tasks', json={
+        'title': f'Bench {rng.choice(WORDS)}', 'description': 'Created by bench.runner'
+    }, headers=headers)
+    if status != 201:
+        return status
+    
+    path = f"/api/tasks/{payload['task']['id']}"
+    for method, body in (('GET', None), ('PUT', {'completed': True}), ('DELETE', None)):
+        status, _ = client.request(method, path, json=body, headers=headers)
+        if status >= 400:
+            return status
+    return status
+
+def admin_listing(client, context, rng):
+    admin = rng.choice(context['admins'])
+    page = rng.choice((1, max(1, context['admin_pages'] // 2), max(1, context['admin_pages'])))
+    status, _ = client.request('GET', f'/api/tasks?page={page}', headers=auth(admin['token']))
+    return status
+
+SCENARIOS = {
+    'login': login_scenario,
+    'list_first_page': list_first_page,
+    'list_deep_page': list_deep_page,
+    'list_search': list_search,
+    'list_completed': list_completed,
+    'get_task': get_task,
+    'crud_mix': crud_mix,
+    'admin_listing': admin_listing
+}
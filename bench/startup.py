@@ -0,0 +1,107 @@
+"""
+Cold start profile: import time per module (python -X importtime) and create_app() time
+
+Usage: python -m bench.startup [--config production] [--runs 5] [--top 15]
+
+Each run starts a fresh interpreter that imports app and builds the app,
+so caches of earlier runs do not count (bytecode caches do, as in a real
+deployment). This is what every worker pays without preloading. The
+app runs against a scratch SQLite database (--database-url to change)
+whose schema an untimed first run creates, as on a deployed server.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from bench.stats import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({config!r})
+built = time.perf_counter()
+print(f'{{imported - started}} {{built - imported}}')
+"""
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from python -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def by_package(modules):
+    """Import time per top-level package: the sum of its modules' self times"""
+    totals = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return totals
+
+def run_child(config_name, database_url, importtime):
+    command = [sys.executable, '-c', CHILD.format(config=config_name)]
+    if importtime:
+        command[1:1] = ['-X', 'importtime']
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    import_s, build_s = map(float, result.stdout.split()[-2:])
+    return import_s, build_s, result.stderr
+
+def profile(config_name, runs, database_url):
+    """Median (and range of) import and create_app() ms over `runs` fresh interpreters, and one import profile"""
+    subprocess.run([sys.executable, 'init_db.py', '--config', config_name], cwd=ROOT,
+                   env=dict(os.environ, DATABASE_URL=database_url), capture_output=True, check=True)
+    imports, builds = [], []
+    for _ in range(runs):
+        import_s, build_s, _ = run_child(config_name, database_url, importtime=False)
+        imports.append(import_s)
+        builds.append(build_s)
+    _, _, stderr = run_child(config_name, database_url, importtime=True)
+    return {
+        'import_ms': percentile(imports, 50) * 1000,
+        'import_range_ms': (min(imports) * 1000, max(imports) * 1000),
+        'create_app_ms': percentile(builds, 50) * 1000,
+        'create_app_range_ms': (min(builds) * 1000, max(builds) * 1000),
+        'modules': parse_importtime(stderr)
+    }
+
+def report(result, top):
+    # Cold imports swing by tens of ms between runs; compare medians only when the ranges barely overlap
+    for label, key in (('import app', 'import'), ('create_app()', 'create_app')):
+        low, high = result[f'{key}_range_ms']
+        print(f"{label + ':':<14} {result[f'{key}_ms']:.1f}ms median ({low:.1f}-{high:.1f}ms)")
+    
+    packages = sorted(by_package(result['modules']).items(), key=lambda item: -item[1])
+    print(f"\n{'package':<32} {'import':>10}")
+    for name, self_us in packages[:top]:
+        print(f'{name:<32} {self_us / 1000:>8.1f}ms')
+    
+    modules = sorted(result['modules'].items(), key=lambda item: -item[1][0])
+    print(f"\n{'module':<48} {'self':>10} {'cumulative':>12}")
+    for name, (self_us, cumulative_us) in modules[:top]:
+        print(f'{name:<48} {self_us / 1000:>8.1f}ms {cumulative_us / 1000:>10.1f}ms')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='production', help='Config name passed to create_app()')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=15, help='Rows per table')
+    parser.add_argument('--database-url', help='Database the app starts against (default: a scratch SQLite file)')
+    args = parser.parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        report(profile(args.config, args.runs, database_url), args.top)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
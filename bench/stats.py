@@ -0,0 +1,19 @@
+import statistics
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def summarize(latencies, errors, duration):
+    """Throughput and latency percentiles (ms) of one benchmark run"""
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput': round(len(latencies) / duration, 2) if duration else 0.0,
+        'mean': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        'p50': round(percentile(latencies, 50), 2),
+        'p95': round(percentile(latencies, 95), 2),
+        'p99': round(percentile(latencies, 99), 2)
+    }
@@ -0,0 +1,132 @@
+"""
+Task write throughput with many concurrent writers, default engine vs tuned profile
+
+Usage: python -m bench.write_concurrency [--writers 32] [--writes 50] [--readers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from config import config, TestingConfig
+from models.user import User
+from bench.stats import percentile
+
+def make_app(path, tuning, busy_timeout):
+    config['bench'] = type('BenchConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'DB_ENGINE_TUNING': tuning,
+        'SQLITE_PRAGMAS': dict(TestingConfig.SQLITE_PRAGMAS, busy_timeout=busy_timeout),
+        'PASSWORD_HASH_WORKERS': 0,
+    })
+    return create_app('bench')
+
+def seed(app, n_users):
+    with app.app_context():
+        db.create_all()
+        for i in range(n_users):
+            user = User(username=f'user{i}', email=f'user{i}@example.com')
+            user.set_password('password123')
+            db.session.add(user)
+        db.session.commit()
+    
+    tokens = []
+    client = app.test_client()
+    for i in range(n_users):
+        response = client.post('/api/auth/login', json={
+            'username': f'user{i}', 'password': 'password123'
+        })
+        tokens.append({'Authorization': f"Bearer {response.json['access_token']}"})
+    return tokens
+
+def run_scenario(app, tokens, writes_per_writer, readers):
+    write_times, read_times, outcomes = [], [], {}
+    lock = threading.Lock()
+    done = threading.Event()
+    
+    def record(outcome):
+        with lock:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    
+    def writer(headers):
+        client = app.test_client()
+        for i in range(writes_per_writer):
+            start = time.perf_counter()
+            try:
+                # Create then update: two commits per operation
+                response = client.post('/api/tasks', json={'title': f'Task {i}'}, headers=headers)
+                if response.status_code == 201:
+                    response = client.put(
+                        f"/api/tasks/{response.json['task']['id']}",
+                        json={'completed': True}, headers=headers
+                    )
+                record(response.status_code)
+            except OperationalError as err:
+                record('locked' if 'locked' in str(err) else 'error')
+                continue
+            with lock:
+                write_times.append((time.perf_counter() - start) * 1000)
+    
+    def reader(headers):
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                client.get('/api/tasks?per_page=50', headers=headers)
+            except OperationalError:
+                record('read locked')
+                continue
+            with lock:
+                read_times.append((time.perf_counter() - start) * 1000)
+    
+    read_threads = [threading.Thread(target=reader, args=(tokens[0],)) for _ in range(readers)]
+    write_threads = [threading.Thread(target=writer, args=(headers,)) for headers in tokens]
+    started = time.perf_counter()
+    for thread in read_threads + write_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    done.set()
+    for thread in read_threads:
+        thread.join()
+    
+    return {
+        'duration': time.perf_counter() - started,
+        'outcomes': outcomes,
+        'write': write_times,
+        'read': read_times,
+    }
+
+def report(name, result):
+    ok = result['outcomes'].get(200, 0)
+    print(f"\n{name}: {ok / result['duration']:.1f} create+update/s, outcomes {result['outcomes']}")
+    for label in ('write', 'read'):
+        samples = result[label]
+        print(f"  {label:<6} n={len(samples):<5} p50={percentile(samples, 50):8.1f}ms "
+              f"p95={percentile(samples, 95):8.1f}ms p99={percentile(samples, 99):8.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=32, help='Concurrent writing clients')
+    parser.add_argument('--writes', type=int, default=50, help='Create+update operations per writer')
+    parser.add_argument('--readers', type=int, default=4, help='Concurrent listing clients')
+    parser.add_argument('--busy-timeout', type=int, default=5000, help='Tuned busy_timeout (ms)')
+    args = parser.parse_args()
+    
+    scenarios = [
+        ('default engine (rollback journal, driver defaults)', False),
+        ('tuned profile (pool preset, WAL, busy_timeout)', True),
+    ]
+    for name, tuning in scenarios:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = make_app(os.path.join(tmp, 'bench.db'), tuning, args.busy_timeout)
+            tokens = seed(app, args.writers)
+            report(name, run_scenario(app, tokens, args.writes, args.readers))
+            with app.app_context():
+                db.engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Task change log compaction script
+Prunes delete tombstones older than TASK_CHANGES_RETENTION_DAYS
+"""
+
+import argparse
+from datetime import timedelta
+from app import create_app, db
+from utils.changes import compact_change_log
+
+def main():
+    parser = argparse.ArgumentParser(description='Prune old tombstones from the task change log')
+    parser.add_argument('--config', default='default', help='Configuration name')
+    parser.add_argument('--days', type=int, help='Retention in days (default: TASK_CHANGES_RETENTION_DAYS)')
+    args = parser.parse_args()
+    
+    app = create_app(args.config)
+    days = args.days if args.days is not None else app.config['TASK_CHANGES_RETENTION_DAYS']
+    
+    with app.app_context():
+        with db.engine.begin() as conn:
+            pruned = compact_change_log(conn, timedelta(days=days))
+    
+    print(f"Pruned {pruned} tombstones older than {days} days")
+
+if __name__ == '__main__':
+    main()
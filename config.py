@@ -1,24 +1,191 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# .env files are a development convenience; deployments that set the
+# environment themselves skip the search (and the import) with FLASK_SKIP_DOTENV=1
+if os.environ.get('FLASK_SKIP_DOTENV', '').lower() not in ('1', 'true', 'yes'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Threads per gunicorn worker (gunicorn.conf.py). Each open event stream holds
+# one, so EVENTS_MAX_STREAMS defaults to one fewer to keep a thread for requests.
+WORKER_THREADS = int(os.environ.get('GUNICORN_THREADS', 4))
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///task_manager.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    JWT_ACCESS_TOKEN_EXPIRES = False  # Tokens don't expire for simplicity
+    # Tokens don't expire unless JWT_ACCESS_TOKEN_EXPIRES (seconds) is set;
+    # revoke them by bumping the user's token version (POST /api/auth/logout)
+    JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 0)) or False
+    JWT_REVOCATION_CHECK = True  # Compare the token version claim on every request
+    JSON_USE_ORJSON = True  # Encode responses with orjson when it is installed
+    SEARCH_FULL_TEXT = True  # Use the FTS5 index for ?search= when the database has one
+    # Startup: create missing tables in create_app(), and serve the Swagger UI
+    # at /api/docs. Production leaves the schema to init_db.py/migrate_db.py,
+    # so workers start without reflecting it, and only mounts the docs on request.
+    DB_CREATE_ALL = True
+    API_DOCS_ENABLED = True
+    
+    # Process-wide cache of (user id, role, token version) used to authorize
+    # requests, so authenticated requests skip the user SELECT. Commits that
+    # change a role or token version evict the entry in the writing process
+    # only: other worker processes keep accepting revoked or demoted tokens
+    # for up to IDENTITY_CACHE_TTL seconds. Disable it for immediate revocation
+    # everywhere at the cost of a SELECT per request.
+    IDENTITY_CACHE_ENABLED = os.environ.get('IDENTITY_CACHE_ENABLED', 'true').lower() == 'true'
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 10))  # seconds
+    IDENTITY_CACHE_SIZE = 10000
+    
+    # Password hashing: 'bcrypt' or a werkzeug method such as 'scrypt' or
+    # 'pbkdf2:sha256:600000'. Stored hashes with other parameters are
+    # upgraded on the next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'bcrypt')
+    PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_EXECUTOR = 'thread'  # or 'process'
+    PASSWORD_HASH_WORKERS = None  # Defaults to the CPU count; 0 hashes on the request thread
+    PASSWORD_HASH_MAX_PENDING = 64  # Queued + running hashes before logins get 503
+    # Admin bulk provisioning (POST /api/auth/users/batch, provision_users.py)
+    # hashes on a separate pool of PASSWORD_BULK_HASH_WORKERS (default: CPU count)
+    USER_BATCH_MAX_CREATE = 5000
+    PASSWORD_BULK_HASH_WORKERS = None
+    # Admin user deletion (DELETE /api/auth/users/<id>) removes tasks in chunks;
+    # users with more tasks than USER_DELETE_INLINE_MAX are deleted by a job
+    USER_DELETE_CHUNK_SIZE = 1000
+    USER_DELETE_INLINE_MAX = 1000
+    
+    # Maximum number of items per request on /api/tasks/batch
+    TASK_BATCH_MAX_CREATE = 1000
+    TASK_BATCH_MAX_UPDATE = 1000
+    TASK_BATCH_MAX_DELETE = 1000
+    
+    TASK_EXPORT_CHUNK_SIZE = 1000  # Rows fetched and flushed per chunk by /api/tasks/export
+    
+    # Background jobs (POST /api/tasks/import, /complete and /export, large user
+    # deletions). JOBS_WORKERS threads start with each process's first request;
+    # set it to 0 to leave the jobs to run_jobs.py processes.
+    JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS', 2))
+    JOBS_POLL_INTERVAL = 1.0  # Seconds between checks for jobs queued by other processes
+    JOBS_LEASE_TIMEOUT = 300  # Seconds without progress before a running job is retried
+    JOBS_MAX_ATTEMPTS = 3
+    JOBS_RETRY_BACKOFF = 5  # Seconds before the first retry, doubled for each further one
+    JOBS_EXPORT_DIR = None  # Export job files; defaults to <instance>/exports
+    # Finished jobs (and their export files) are deleted after this many days; 0 keeps them
+    JOBS_RETENTION_DAYS = int(os.environ.get('JOBS_RETENTION_DAYS', 7))
+    TASK_IMPORT_MAX = 100000  # Tasks per POST /api/tasks/import
+    TASK_JOB_CHUNK_SIZE = 1000  # Rows written per transaction (and progress update) by task jobs
+    
+    # Rate limiting (utils/ratelimit.py): a token bucket per client (JWT
+    # identity, else IP address) and limit. RATELIMIT_LIMITS maps an endpoint
+    # ('auth.login') or a blueprint ('tasks') to 'count/period' (second,
+    # minute, hour, day or seconds) or None for no limit; the most specific
+    # entry applies, else 'default'. The memory backend is per process;
+    # multi-process deployments should point RATELIMIT_BACKEND at a shared
+    # RateLimitBackend ('package.module:Class') so limits hold across workers.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')
+    RATELIMIT_SWEEP_INTERVAL = 60  # Seconds between evictions of full buckets
+    RATELIMIT_LIMITS = {
+        'default': '300/minute',
+        'auth.login': '10/minute',
+        'auth.register': '5/minute',
+        'tasks.get_tasks': '120/minute',
+        'tasks.export_tasks': '10/minute',
+        'metrics': None,
+        'static': None
+    }
+    
+    # Cache for GET /api/tasks responses. The memory backend is per process;
+    # multi-process deployments should point RESPONSE_CACHE_BACKEND at a
+    # shared CacheBackend ('package.module:Class') so invalidations reach
+    # every worker.
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'false').lower() == 'true'
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_TTL = 30  # seconds
+    RESPONSE_CACHE_SIZE = 1024
+    
+    # Async deployment mode (asgi.py): auth and task CRUD/listing views are
+    # coroutines on an async engine. ASYNC_DATABASE_URI defaults to
+    # SQLALCHEMY_DATABASE_URI with the matching async driver (aiosqlite, ...).
+    ASYNC_MODE = os.environ.get('ASYNC_MODE', 'false').lower() == 'true'
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    
+    # Engine profile (utils/engine.py). When DB_ENGINE_TUNING is on, the pool
+    # uses the preset of the configured driver, with DB_POOL_* overriding
+    # single values, and SQLite connections get SQLITE_PRAGMAS on connect.
+    # Explicit SQLALCHEMY_ENGINE_OPTIONS always win.
+    DB_ENGINE_TUNING = os.environ.get('DB_ENGINE_TUNING', 'false').lower() == 'true'
+    DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    DB_POOL_TIMEOUT = int(os.environ['DB_POOL_TIMEOUT']) if os.environ.get('DB_POOL_TIMEOUT') else None
+    DB_POOL_RECYCLE = int(os.environ['DB_POOL_RECYCLE']) if os.environ.get('DB_POOL_RECYCLE') else None
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',       # Readers no longer block the writer, and vice versa
+        'synchronous': 'NORMAL',     # Safe with WAL; fsync at checkpoints, not every commit
+        'busy_timeout': 5000,        # ms a writer waits for the lock before "database is locked"
+        'cache_size': -65536,        # 64 MiB page cache per connection
+        'mmap_size': 268435456,      # Read through a 256 MiB memory map
+        'temp_store': 'MEMORY'
+    }
+    
+    # Read replicas (utils/replicas.py) for GET /api/tasks, /api/tasks/<id> and
+    # /api/auth/profile. A user's reads stay on the primary for
+    # REPLICA_READ_YOUR_WRITES_WINDOW seconds after they commit a write.
+    SQLALCHEMY_REPLICA_URIS = [uri for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri]
+    REPLICA_STRATEGY = os.environ.get('REPLICA_STRATEGY', 'round_robin')  # or 'least_loaded'
+    REPLICA_READ_YOUR_WRITES_WINDOW = 5  # seconds
+    
+    # Request instrumentation (utils/metrics.py): per-endpoint request, SQL and
+    # phase timings served in the Prometheus text format at METRICS_PATH.
+    # Set METRICS_ACCESS_TOKEN to require "Authorization: Bearer <token>".
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_PATH = '/metrics'
+    METRICS_ACCESS_TOKEN = os.environ.get('METRICS_ACCESS_TOKEN')
+    SLOW_QUERY_THRESHOLD = float(os.environ.get('SLOW_QUERY_THRESHOLD', 0.1))  # seconds
+    # Query guard: log slow queries, statements repeated within a request
+    # (N+1 patterns) and requests running too many statements.
+    # None enables it when DEBUG is on.
+    QUERY_GUARD_ENABLED = None
+    QUERY_GUARD_REPEAT_THRESHOLD = 5
+    QUERY_GUARD_MAX_QUERIES = 20
+    
+    # Change feed (GET /api/tasks/changes). compact_changes.py prunes delete
+    # tombstones older than this; clients whose token predates the pruned
+    # range get 410 Gone and must resync from since=0.
+    TASK_CHANGES_RETENTION_DAYS = int(os.environ.get('TASK_CHANGES_RETENTION_DAYS', 30))
+    TASK_CHANGES_PAGE_SIZE = 100
+    TASK_CHANGES_MAX_PAGE_SIZE = 1000
+    
+    # Server-sent events (GET /api/tasks/stream, utils/events.py). Commits
+    # that wrote tasks notify EVENTS_BACKEND; each process's hub then reads
+    # the new change log entries on its delivery thread and queues them for
+    # its streams. The 'local' backend only reaches streams of the writing
+    # process; set an EventBackend import path to fan out across workers.
+    # Each open stream holds a worker thread for up to EVENTS_STREAM_TIMEOUT,
+    # so EVENTS_MAX_STREAMS stays below WORKER_THREADS; raise both together.
+    EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED', 'true').lower() == 'true'
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'local')
+    EVENTS_QUEUE_SIZE = 1000             # Entries per stream before it catches up from the log
+    EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS', WORKER_THREADS - 1))  # Per process; more get 503
+    EVENTS_HEARTBEAT_INTERVAL = 15       # seconds
+    EVENTS_STREAM_TIMEOUT = 300          # seconds; clients reconnect with Last-Event-ID
+    EVENTS_RETRY_MS = 3000               # Reconnect delay advertised to clients
 
 class DevelopmentConfig(Config):
     DEBUG = True
 
 class ProductionConfig(Config):
     DEBUG = False
+    DB_CREATE_ALL = os.environ.get('DB_CREATE_ALL', 'false').lower() == 'true'
+    API_DOCS_ENABLED = os.environ.get('API_DOCS_ENABLED', 'false').lower() == 'true'
+    DB_ENGINE_TUNING = os.environ.get('DB_ENGINE_TUNING', 'true').lower() == 'true'
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_BCRYPT_ROUNDS = 4
+    JOBS_WORKERS = 0  # Tests run jobs with get_job_queue().run_pending()
+    RATELIMIT_ENABLED = False  # tests/test_ratelimit.py enables it
 
 config = {
     'development': DevelopmentConfig,
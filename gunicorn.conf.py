@@ -0,0 +1,27 @@
+"""
+gunicorn settings for the pre-fork deployment: gunicorn -c gunicorn.conf.py wsgi:app
+
+The master imports wsgi:app once (preload_app) and forks workers that share
+it copy-on-write, so a new worker starts serving without importing or
+building anything.
+"""
+
+import os
+from config import WORKER_THREADS
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1))
+# Each /api/tasks/stream holds a thread for up to EVENTS_STREAM_TIMEOUT; EVENTS_MAX_STREAMS
+# defaults to threads - 1 so streams can never take the last one (see config.py)
+threads = WORKER_THREADS  # GUNICORN_THREADS, default 4
+preload_app = True
+
+def when_ready(server):
+    from utils.prefork import prepare_for_fork
+    from wsgi import app
+    prepare_for_fork(app)
+
+def post_fork(server, worker):
+    from utils.prefork import after_fork
+    from wsgi import app
+    after_fork(app)
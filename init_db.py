@@ -4,16 +4,19 @@ Database initialization script
 Creates tables and optionally creates an admin user
 """
 
+import argparse
 from app import create_app, db
 from models.user import User
+from migrate_db import upgrade
 
-def init_db():
+def init_db(config_name='default'):
     """Initialize database and create tables"""
-    app = create_app()
+    app = create_app(config_name)
     
     with app.app_context():
         
         db.create_all()
+        upgrade(db.engine)
         print("Database tables created successfully!")
         
         admin = User.query.filter_by(username='admin').first()
@@ -37,4 +40,6 @@ def init_db():
             print("Admin user already exists!")
 
 if __name__ == '__main__':
-    init_db()
+    parser = argparse.ArgumentParser(description='Create the Task Manager schema and admin user')
+    parser.add_argument('--config', default='default', help='Configuration name')
+    init_db(parser.parse_args().config)
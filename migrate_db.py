@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Database migration script
+Applies versioned schema changes to an existing database in place
+"""
+
+import argparse
+from sqlalchemy import text, inspect
+from app import create_app, db
+from utils.search import install_search_index
+from utils.counters import install_task_counters
+from utils.changes import install_change_log
+from models.user_task_stats import UserTaskStats
+from models.task_change import TaskChange, TaskChangeCompaction
+from models.user_deletion import UserDeletion
+from models.job import Job
+
+def add_column(table, column, ddl):
+    """Step that adds a column unless db.create_all() already created it"""
+    def step(conn):
+        if column not in {c['name'] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+    return step
+
+def widen_column(table, column, length):
+    """Step that widens a VARCHAR column; SQLite does not enforce lengths, so it skips"""
+    def step(conn):
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            return
+        if dialect == 'mysql':
+            nullable = {c['name']: c['nullable'] for c in inspect(conn).get_columns(table)}[column]
+            conn.execute(text(
+                f"ALTER TABLE {table} MODIFY {column} VARCHAR({length}){'' if nullable else ' NOT NULL'}"))
+        else:
+            conn.execute(text(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR({length})'))
+    return step
+
+def create_table(model):
+    """Step that creates a model's table unless it already exists"""
+    def step(conn):
+        model.__table__.create(conn, checkfirst=True)
+    return step
+
+# Each migration is (version, description, steps). A step is either a SQL
+# string or a callable taking a connection. Steps must be idempotent so a
+# database created by db.create_all() can be stamped by replaying them.
+MIGRATIONS = [
+    (1, 'Composite indexes for task listings', [
+        'CREATE INDEX IF NOT EXISTS ix_tasks_user_id_created_at_id '
+        'ON tasks (user_id, created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_tasks_user_id_completed_created_at '
+        'ON tasks (user_id, completed, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_tasks_created_at_id '
+        'ON tasks (created_at, id)',
+    ]),
+    (2, 'Full-text search index for tasks (SQLite FTS5)', [
+        install_search_index,
+    ]),
+    (3, 'Token version for access token revocation', [
+        add_column('users', 'token_version', 'INTEGER NOT NULL DEFAULT 0'),
+    ]),
+    (4, 'Index for conditional listing validators', [
+        'CREATE INDEX IF NOT EXISTS ix_tasks_user_id_updated_at '
+        'ON tasks (user_id, updated_at)',
+    ]),
+    (5, 'Per-user task counters maintained by triggers', [
+        create_table(UserTaskStats),
+        install_task_counters,
+    ]),
+    (6, 'Indexes for sort=updated_at and date range filters', [
+        'CREATE INDEX IF NOT EXISTS ix_tasks_user_id_completed_updated_at '
+        'ON tasks (user_id, completed, updated_at)',
+        'CREATE INDEX IF NOT EXISTS ix_tasks_updated_at_id '
+        'ON tasks (updated_at, id)',
+    ]),
+    (7, 'Task change log for incremental sync', [
+        create_table(TaskChange),
+        create_table(TaskChangeCompaction),
+        install_change_log,
+    ]),
+    (8, 'Progress records for admin user deletions', [
+        create_table(UserDeletion),
+    ]),
+    (9, 'Background job queue', [
+        create_table(Job),
+    ]),
+    (10, 'Room for scrypt password hashes', [
+        widen_column('users', 'password_hash', 255),
+    ]),
+]
+
+def ensure_version_table(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'
+    ))
+    if conn.execute(text('SELECT COUNT(*) FROM schema_version')).scalar() == 0:
+        conn.execute(text('INSERT INTO schema_version (version) VALUES (0)'))
+
+def current_version(conn):
+    """Return the applied schema version (0 for an unversioned database)"""
+    ensure_version_table(conn)
+    return conn.execute(text('SELECT version FROM schema_version')).scalar()
+
+def upgrade(engine, target=None):
+    """Apply pending migrations up to target, each in its own transaction"""
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        with engine.begin() as conn:
+            if version <= current_version(conn):
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(text(step))
+            conn.execute(text('UPDATE schema_version SET version = :v'), {'v': version})
+        applied.append((version, description))
+    return applied
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate the Task Manager database')
+    parser.add_argument('--config', default='default', help='Configuration name')
+    parser.add_argument('--target', type=int, help='Stop after this version')
+    parser.add_argument('--status', action='store_true', help='Show the current version and exit')
+    args = parser.parse_args()
+    
+    app = create_app(args.config)
+    
+    with app.app_context():
+        if args.status:
+            with db.engine.begin() as conn:
+                version = current_version(conn)
+            print(f"Schema version: {version} (latest: {MIGRATIONS[-1][0]})")
+            return
+        
+        applied = upgrade(db.engine, target=args.target)
+        for version, description in applied:
+            print(f"Applied migration {version}: {description}")
+        if not applied:
+            print("Database is up to date!")
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,8 @@
 from .user import User
 from .task import Task
+from .user_task_stats import UserTaskStats
+from .task_change import TaskChange, TaskChangeCompaction
+from .user_deletion import UserDeletion
+from .job import Job
 
-__all__ = ['User', 'Task']
+__all__ = ['User', 'Task', 'UserTaskStats', 'TaskChange', 'TaskChangeCompaction', 'UserDeletion', 'Job']
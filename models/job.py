@@ -0,0 +1,61 @@
+from datetime import datetime
+from app import db
+
+class Job(db.Model):
+    """A unit of background work run by the job queue (utils/jobs.py).
+    
+    Workers claim queued jobs whose run_after has passed and hold them
+    under a lease (locked_at, renewed by progress updates); a job whose
+    lease expires is retried. idempotency_key is unique per user, so a
+    repeated request finds the job it created the first time.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_jobs_user_id_idempotency_key'),
+        # Claiming: the oldest ready job; lease expiry: running jobs by lock time
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+        db.Index('ix_jobs_status_locked_at', 'status', 'locked_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)  # Who enqueued it; may see it
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, succeeded, failed
+    payload = db.Column(db.JSON, nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)  # Hash of kind + payload
+    idempotency_key = db.Column(db.String(255), nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.Integer, default=0, nullable=False)
+    total = db.Column(db.Integer, nullable=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=3, nullable=False)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
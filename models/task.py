@@ -1,8 +1,24 @@
 from datetime import datetime
+from sqlalchemy import event
 from app import db
+from utils.search import install_search_index, drop_search_index
+from utils.counters import install_task_counters
+from utils.changes import install_change_log
+from schemas.serializers import dump_task
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Listing access paths: per-user by recency, per-user by status, admin-wide
+        db.Index('ix_tasks_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_tasks_user_id_completed_created_at', 'user_id', 'completed', 'created_at'),
+        db.Index('ix_tasks_created_at_id', 'created_at', 'id'),
+        # Freshness aggregate for conditional listings: max(updated_at), count(*)
+        db.Index('ix_tasks_user_id_updated_at', 'user_id', 'updated_at'),
+        # sort=updated_at and updated_* ranges: per user by status, admin-wide
+        db.Index('ix_tasks_user_id_completed_updated_at', 'user_id', 'completed', 'updated_at'),
+        db.Index('ix_tasks_updated_at_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -11,18 +27,20 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'completed': self.completed,
-            'user_id': self.user_id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+        return dump_task(self)
     
     def __repr__(self):
         return f'<Task {self.title}>'
+
+@event.listens_for(Task.__table__, 'after_create')
+def create_search_index(target, connection, **kw):
+    install_search_index(connection, rebuild=False)
+    install_task_counters(connection, rebuild=False)
+    install_change_log(connection, backfill=False)
+
+@event.listens_for(Task.__table__, 'before_drop')
+def remove_search_index(target, connection, **kw):
+    drop_search_index(connection)
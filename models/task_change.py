@@ -0,0 +1,33 @@
+from app import db
+
+class TaskChange(db.Model):
+    """Change log behind GET /api/tasks/changes, written by triggers (utils/changes.py).
+    
+    Each task keeps only its latest entry per owner: an upsert while it
+    exists, a tombstone once deleted (or moved to another user). seq never
+    goes backwards (AUTOINCREMENT), so it doubles as the clients' sync token.
+    """
+    __tablename__ = 'task_changes'
+    __table_args__ = (
+        db.Index('ix_task_changes_user_id_seq', 'user_id', 'seq'),
+        db.Index('ix_task_changes_task_id_user_id', 'task_id', 'user_id'),
+        db.Index('ix_task_changes_op_changed_at', 'op', 'changed_at'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # 'upsert' or 'delete'
+    changed_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<TaskChange {self.seq} {self.op} {self.task_id}>'
+
+class TaskChangeCompaction(db.Model):
+    """One row per compaction; tokens below the latest seq can no longer sync"""
+    __tablename__ = 'task_change_compactions'
+    
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Highest pruned seq
+    compacted_at = db.Column(db.DateTime, nullable=False)
+    pruned = db.Column(db.Integer, nullable=False)
@@ -1,6 +1,8 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
 from app import db
+from utils.passwords import get_password_hasher
+from schemas.serializers import dump_user
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -8,31 +10,48 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)  # scrypt hashes run to 162 characters
     role = db.Column(db.String(20), default='user', nullable=False)  # 'user' or 'admin'
+    token_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Bumped to revoke issued tokens
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan')
+    # Deleting a user never loads its tasks: delete_user_tasks() removes
+    # them in SQL just before the user row (see below)
+    tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_password_hasher().hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_password_hasher().verify(password, self.password_hash)
+    
+    async def set_password_async(self, password):
+        self.password_hash = await get_password_hasher().hash_async(password)
+    
+    async def check_password_async(self, password):
+        return await get_password_hasher().verify_async(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        return get_password_hasher().needs_rehash(self.password_hash)
     
     def is_admin(self):
         return self.role == 'admin'
     
+    def revoke_tokens(self):
+        """Invalidate every access token issued to this user so far"""
+        self.token_version = (self.token_version or 0) + 1
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'role': self.role,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+        return dump_user(self)
     
     def __repr__(self):
         return f'<User {self.username}>'
+
+@event.listens_for(User, 'before_delete')
+def delete_user_tasks(mapper, connection, target):
+    # Databases created before tasks.user_id had ON DELETE CASCADE (and
+    # SQLite without foreign_keys) need the tasks removed explicitly. One
+    # set-based DELETE; the triggers keep counters, search and changes in step.
+    from models.task import Task
+    connection.execute(Task.__table__.delete().where(Task.__table__.c.user_id == target.id))
@@ -0,0 +1,43 @@
+from datetime import datetime
+from app import db
+
+class UserDeletion(db.Model):
+    """Progress of an admin user deletion (utils/deletion.py).
+    
+    Outlives the user, so it keeps the id and username it deleted. deleted
+    counts the tasks removed so far out of total (counted when requested).
+    """
+    __tablename__ = 'user_deletions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    username = db.Column(db.String(80), nullable=False)
+    requested_by = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, running, completed, failed
+    total = db.Column(db.Integer, default=0, nullable=False)
+    deleted = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'username': self.username,
+            'status': self.status,
+            'total': self.total,
+            'deleted': self.deleted,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<UserDeletion {self.id} user={self.user_id} {self.status} {self.deleted}/{self.total}>'
@@ -0,0 +1,23 @@
+from app import db
+
+class UserTaskStats(db.Model):
+    """Per-user task counters, kept in step with tasks by triggers (utils/counters.py).
+    
+    version grows on every change to the user's tasks and validates their
+    listings. Rows outlive their user, so the sum of all versions only ever
+    grows and validates admin-wide listings.
+    """
+    __tablename__ = 'user_task_stats'
+    
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    completed = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    last_modified = db.Column(db.DateTime, nullable=True)  # Latest task updated_at seen
+    
+    @property
+    def open(self):
+        return self.total - self.completed
+    
+    def __repr__(self):
+        return f'<UserTaskStats {self.user_id}: {self.completed}/{self.total}>'
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Task counter repair script
+Compares user_task_stats with the tasks table and rewrites drifted counters
+"""
+
+import argparse
+from app import create_app, db
+from utils.counters import find_counter_drift, repair_task_counters
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and repair the per-user task counters')
+    parser.add_argument('--config', default='default', help='Configuration name')
+    parser.add_argument('--check', action='store_true', help='Only report drift; exit 1 if any')
+    args = parser.parse_args()
+    
+    app = create_app(args.config)
+    
+    with app.app_context():
+        with db.engine.begin() as conn:
+            drift = find_counter_drift(conn) if args.check else repair_task_counters(conn)
+    
+    for user_id, (total, completed), actual in drift:
+        have = f'{actual[1]}/{actual[0]}' if actual else 'missing'
+        print(f"User {user_id}: counters {have}, tasks {completed}/{total} (completed/total)")
+    
+    if not drift:
+        print("Task counters are consistent!")
+    elif args.check:
+        raise SystemExit(1)
+    else:
+        print(f"Repaired counters of {len(drift)} users")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+from flask import request, jsonify
+from flask_jwt_extended import create_access_token, get_current_user
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from marshmallow import ValidationError
+from models.user import User
+from schemas.serializers import dump_user
+from utils.async_auth import async_jwt_required
+from utils.async_db import async_db
+from utils.provisioning import taken_query, duplicate_error
+from routes.auth import user_login_schema, user_register_schema
+
+# Coroutine counterparts of the auth blueprint views, swapped in by
+# create_app() when ASYNC_MODE is set. Password hashing is awaited on the
+# hasher's pool, so a login storm never blocks the event loop.
+
+async def register():
+    """Register a new user"""
+    try:
+        data = user_register_schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    session = async_db.session
+    taken = taken_query([data['username']], [data['email']])
+    
+    error = duplicate_error(data, (await session.execute(taken)).all())
+    if error:
+        return jsonify({'error': error}), 400
+    
+    user = User(
+        username=data['username'],
+        email=data['email']
+    )
+    await user.set_password_async(data['password'])
+    
+    session.add(user)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent registration took the username or email after the check
+        await session.rollback()
+        error = duplicate_error(data, (await session.execute(taken)).all())
+        return jsonify({'error': error or 'Username or email already exists'}), 400
+    
+    return jsonify({
+        'message': 'User created successfully',
+        'user': dump_user(user)
+    }), 201
+
+async def login():
+    """Login user and return JWT token"""
+    try:
+        data = user_login_schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    session = async_db.session
+    user = await session.scalar(select(User).filter_by(username=data['username']))
+    
+    if user and await user.check_password_async(data['password']):
+        if user.password_needs_rehash():
+            # Upgrade hashes made with an outdated method or cost
+            await user.set_password_async(data['password'])
+            await session.commit()
+        
+        access_token = create_access_token(identity=user)
+        return jsonify({
+            'message': 'Login successful',
+            'access_token': access_token,
+            'user': dump_user(user)
+        }), 200
+    
+    return jsonify({'error': 'Invalid credentials'}), 401
+
+@async_jwt_required
+async def get_profile():
+    """Get current user profile"""
+    user = await async_db.session.get(User, get_current_user().id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    return jsonify({'user': dump_user(user)}), 200
+
+@async_jwt_required
+async def logout():
+    """Revoke every access token issued to the current user"""
+    session = async_db.session
+    user = await session.get(User, get_current_user().id)
+    user.revoke_tokens()
+    await session.commit()
+    
+    return jsonify({'message': 'Logged out from all sessions'}), 200
+
+async_views = {
+    'auth.register': register,
+    'auth.login': login,
+    'auth.get_profile': get_profile,
+    'auth.logout': logout
+}
@@ -0,0 +1,103 @@
+from flask import request, jsonify, abort
+from sqlalchemy import select
+from marshmallow import ValidationError
+from models.task import Task
+from schemas.serializers import dump_task
+from utils.async_auth import async_jwt_required
+from utils.async_db import async_db
+from utils.cache import cached_response, invalidate_listings
+from routes.tasks import (
+    task_create_schema, task_update_schema, task_columns,
+    is_admin_or_owner, listing_cache_scope,
+    task_listing, task_detail, build_task, apply_task_changes
+)
+
+# Coroutine counterparts of the tasks blueprint views, swapped in by
+# create_app() when ASYNC_MODE is set. They share the sync views' helpers,
+# so responses are identical; only the database I/O is awaited.
+
+@async_jwt_required
+@cached_response(listing_cache_scope)
+async def get_tasks():
+    """Get all tasks with pagination and filtering"""
+    return await async_db.session.run_sync(task_listing)
+
+@async_jwt_required
+async def get_task(task_id):
+    """Get a specific task by ID"""
+    result = await async_db.session.execute(
+        select(*task_columns).where(Task.id == task_id)
+    )
+    return task_detail(result.first())
+
+@async_jwt_required
+async def create_task():
+    """Create a new task"""
+    try:
+        data = task_create_schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    session = async_db.session
+    task = build_task(data)
+    session.add(task)
+    await session.commit()
+    invalidate_listings([task.user_id])
+    
+    return jsonify({
+        'message': 'Task created successfully',
+        'task': dump_task(task)
+    }), 201
+
+@async_jwt_required
+async def update_task(task_id):
+    """Update a specific task"""
+    session = async_db.session
+    task = await session.get(Task, task_id)
+    
+    if task is None:
+        abort(404)
+    
+    if not is_admin_or_owner(task.user_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    try:
+        data = task_update_schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    apply_task_changes(task, data)
+    await session.commit()
+    invalidate_listings([task.user_id])
+    
+    return jsonify({
+        'message': 'Task updated successfully',
+        'task': dump_task(task)
+    }), 200
+
+@async_jwt_required
+async def delete_task(task_id):
+    """Delete a specific task"""
+    session = async_db.session
+    task = await session.get(Task, task_id)
+    
+    if task is None:
+        abort(404)
+    
+    if not is_admin_or_owner(task.user_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    owner_id = task.user_id
+    await session.delete(task)
+    await session.commit()
+    invalidate_listings([owner_id])
+    
+    return jsonify({'message': 'Task deleted successfully'}), 200
+
+async_views = {
+    'tasks.get_tasks': get_tasks,
+    'tasks.get_task': get_task,
+    'tasks.create_task': create_task,
+    'tasks.update_task': update_task,
+    'tasks.delete_task': delete_task
+}
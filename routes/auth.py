@@ -1,15 +1,31 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import create_access_token, jwt_required, get_current_user
+from sqlalchemy.exc import IntegrityError
 from app import db
 from models.user import User
-from schemas.user_schema import UserSchema, UserLoginSchema, UserRegisterSchema
+from models.user_deletion import UserDeletion
+from schemas.user_schema import UserLoginSchema, UserRegisterSchema, UserProvisionSchema
+from schemas.serializers import dump_user
 from marshmallow import ValidationError
+from utils.passwords import PasswordHashingBusy, get_password_hasher
+from utils.provisioning import taken_query, duplicate_error, provision_users
+from utils.deletion import request_user_deletion, run_user_deletion
+from utils.jobs import enqueue, requeue
+from utils.replicas import replica_reads
+from utils.batch import get_batch_items, validate_batch, batch_response
 
 auth_bp = Blueprint('auth', __name__)
 
-user_schema = UserSchema()
 user_login_schema = UserLoginSchema()
 user_register_schema = UserRegisterSchema()
+user_provision_schema = UserProvisionSchema(many=True)
+
+@auth_bp.errorhandler(PasswordHashingBusy)
+def handle_hashing_busy(err):
+    """Shed load when the password hashing queue is full"""
+    response = jsonify({'error': 'Service busy, please retry'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -19,11 +35,9 @@ def register():
     except ValidationError as err:
         return jsonify({'error': 'Validation error', 'details': err.messages}), 400
     
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
+    error = duplicate_error(data, find_taken(data))
+    if error:
+        return jsonify({'error': error}), 400
     
     user = User(
         username=data['username'],
@@ -32,13 +46,97 @@ def register():
     user.set_password(data['password'])
     
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent registration took the username or email after the check
+        db.session.rollback()
+        error = duplicate_error(data, find_taken(data))
+        return jsonify({'error': error or 'Username or email already exists'}), 400
     
     return jsonify({
         'message': 'User created successfully',
-        'user': user_schema.dump(user)
+        'user': dump_user(user)
     }), 201
 
+def find_taken(data):
+    return db.session.execute(taken_query([data['username']], [data['email']])).all()
+
+@auth_bp.route('/users/batch', methods=['POST'])
+@jwt_required()
+def provision_users_batch():
+    """Create many users in a single transaction (admin only)"""
+    if not get_current_user().is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    items, error = get_batch_items('users', current_app.config['USER_BATCH_MAX_CREATE'])
+    if error:
+        return error
+    
+    valid, failures = validate_batch(user_provision_schema, items)
+    results = []
+    if valid:
+        try:
+            results = provision_users(db.session, valid, get_password_hasher())
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Users were registered concurrently; retry the batch'}), 409
+    
+    return batch_response('Users created', failures + results, 201)
+
+@auth_bp.route('/users/<int:user_id>', methods=['DELETE'])
+@jwt_required()
+def delete_user(user_id):
+    """Delete a user and all their tasks (admin only).
+    
+    Users with up to USER_DELETE_INLINE_MAX tasks are deleted within the
+    request; larger ones by a background job, answered with 202 and a
+    deletion to poll. Repeating the request resumes an unfinished deletion.
+    """
+    current_user = get_current_user()
+    if not current_user.is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    if user_id == current_user.id:
+        return jsonify({'error': 'Cannot delete your own account'}), 400
+    
+    user = db.session.get(User, user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    config = current_app.config
+    deletion, created = request_user_deletion(db.session, user, current_user.id)
+    if created and deletion.total <= config['USER_DELETE_INLINE_MAX']:
+        run_user_deletion(db.session, deletion.id, config['USER_DELETE_CHUNK_SIZE'])
+        return jsonify({'message': 'User deleted', 'deletion': deletion.to_dict()}), 200
+    
+    # Repeats get the deletion's existing job, rerun if it had given up
+    job, _ = enqueue(
+        db.session, 'delete_user', {'deletion_id': deletion.id},
+        user_id=current_user.id, idempotency_key=f'delete_user:{deletion.id}'
+    )
+    if job.status == 'failed':
+        requeue(db.session, job)
+    return jsonify({
+        'message': 'User deletion started',
+        'deletion': deletion.to_dict(),
+        'job': job.to_dict()
+    }), 202
+
+@auth_bp.route('/users/deletions/<int:deletion_id>', methods=['GET'])
+@jwt_required()
+def get_user_deletion(deletion_id):
+    """Progress of a user deletion (admin only)"""
+    if not get_current_user().is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    deletion = db.session.get(UserDeletion, deletion_id)
+    if not deletion:
+        return jsonify({'error': 'Deletion not found'}), 404
+    
+    return jsonify({'deletion': deletion.to_dict()}), 200
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Login user and return JWT token"""
@@ -50,23 +148,38 @@ def login():
     user = User.query.filter_by(username=data['username']).first()
     
     if user and user.check_password(data['password']):
+        if user.password_needs_rehash():
+            # Upgrade hashes made with an outdated method or cost
+            user.set_password(data['password'])
+            db.session.commit()
+        
         access_token = create_access_token(identity=user)
         return jsonify({
             'message': 'Login successful',
             'access_token': access_token,
-            'user': user_schema.dump(user)
+            'user': dump_user(user)
         }), 200
     
     return jsonify({'error': 'Invalid credentials'}), 401
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_profile():
     """Get current user profile"""
-    user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))
+    user = db.session.get(User, get_current_user().id)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify({'user': user_schema.dump(user)}), 200
+    return jsonify({'user': dump_user(user)}), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """Revoke every access token issued to the current user"""
+    user = db.session.get(User, get_current_user().id)
+    user.revoke_tokens()
+    db.session.commit()
+    
+    return jsonify({'message': 'Logged out from all sessions'}), 200
@@ -0,0 +1,75 @@
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_current_user
+from app import db
+from models.job import Job
+from utils.export import EXPORT_FORMATS
+from utils.jobs import enqueue, export_path, IdempotencyConflict
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def queue_job(kind, payload):
+    """Enqueue a job for the current user and answer 202 with it.
+    
+    An Idempotency-Key header makes retries of the request return the job
+    queued the first time (flagged with Idempotent-Replayed) instead of
+    queueing another.
+    """
+    key = request.headers.get('Idempotency-Key')
+    if key is not None and not 0 < len(key) <= 255:
+        return jsonify({
+            'error': 'Validation error',
+            'details': {'Idempotency-Key': ['Length must be between 1 and 255.']}
+        }), 400
+    
+    try:
+        job, created = enqueue(db.session, kind, payload, user_id=get_current_user().id, idempotency_key=key)
+    except IdempotencyConflict:
+        return jsonify({'error': 'Idempotency key already used for a different request'}), 422
+    
+    response = jsonify({'message': 'Job queued', 'job': job.to_dict()})
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    if not created:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return response, 202
+
+def find_job(job_id):
+    """The job if the caller may see it (theirs, or any for admins), else an error response"""
+    job = db.session.get(Job, job_id)
+    if not job:
+        return None, (jsonify({'error': 'Job not found'}), 404)
+    
+    current_user = get_current_user()
+    if not current_user.is_admin() and job.user_id != current_user.id:
+        return None, (jsonify({'error': 'Access denied'}), 403)
+    return job, None
+
+@jobs_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Status, progress and result of a job"""
+    job, error = find_job(job_id)
+    if error:
+        return error
+    
+    return jsonify({'job': job.to_dict()}), 200
+
+@jobs_bp.route('/jobs/<int:job_id>/download', methods=['GET'])
+@jwt_required()
+def download_job_result(job_id):
+    """The file written by a finished export job"""
+    job, error = find_job(job_id)
+    if error:
+        return error
+    
+    if job.kind != 'export_tasks':
+        return jsonify({'error': 'Job has no file to download'}), 404
+    if job.status != 'succeeded':
+        return jsonify({'error': 'Export not finished', 'status': job.status}), 409
+    
+    export_format = job.result['format']
+    return send_file(
+        export_path(job.id, export_format),
+        mimetype=EXPORT_FORMATS[export_format][0],
+        as_attachment=True,
+        download_name=f'tasks.{export_format}'
+    )
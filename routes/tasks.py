@@ -1,65 +1,184 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_
+import os
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, abort
+from flask_jwt_extended import jwt_required, get_current_user
+from sqlalchemy import select, insert, update, delete, func, case
 from app import db
 from models.task import Task
-from models.user import User
-from schemas.task_schema import TaskSchema, TaskCreateSchema, TaskUpdateSchema
+from schemas.task_schema import (
+    TaskCreateSchema, TaskUpdateSchema,
+    TaskBatchUpdateSchema, TaskBatchDeleteSchema, TaskListArgsSchema,
+    TaskCompleteAllSchema, TaskExportJobSchema
+)
+from schemas.serializers import dump_task
 from marshmallow import ValidationError
+from utils.pagination import keyset_paginate, InvalidCursor
+from utils.search import apply_search
+from utils.export import EXPORT_FORMATS
+from utils.conditional import make_etag, is_not_modified, add_validators, not_modified_response
+from utils.cache import cached_response, get_response_cache, invalidate_listings
+from utils.replicas import replica_reads
+from utils.counters import read_task_counts
+from utils.events import get_event_hub, event_stream, TooManyStreams
+from utils.changes import change_log_available, compaction_horizon, read_changes, change_log_head
+from utils.jobs import job_handler, export_path
+from utils.batch import get_batch_items, validate_batch, batch_response
+from routes.jobs import queue_job
 
 tasks_bp = Blueprint('tasks', __name__)
 
-task_schema = TaskSchema()
 task_create_schema = TaskCreateSchema()
 task_update_schema = TaskUpdateSchema()
+task_batch_create_schema = TaskCreateSchema(many=True)
+task_batch_update_schema = TaskBatchUpdateSchema(many=True)
+task_batch_delete_schema = TaskBatchDeleteSchema()
+task_list_args_schema = TaskListArgsSchema()
+task_complete_all_schema = TaskCompleteAllSchema()
+task_export_job_schema = TaskExportJobSchema()
 
-def get_current_user():
-    """Get current authenticated user"""
-    user_id = get_jwt_identity()
-    return User.query.get(int(user_id))
+# Validation errors kept in an import job's result (the counts cover all)
+IMPORT_ERROR_LIMIT = 100
+
+# Listings select exactly the serialized columns as rows, skipping ORM objects
+task_columns = [getattr(Task, name) for name in dump_task.fields]
 
 def is_admin_or_owner(task_user_id):
-    """Check if current user is admin or task owner"""
+    """Check if current user is admin or task owner, using the token claims"""
     current_user = get_current_user()
     return current_user.is_admin() or current_user.id == task_user_id
 
+def listing_cache_scope():
+    """Admins share the 'all' scope; everyone else is scoped to their own tasks"""
+    current_user = get_current_user()
+    return 'all' if current_user.is_admin() else f'user:{current_user.id}'
+
+def listing_args():
+    """Validated filters and ordering from the query args; raises ValidationError"""
+    return task_list_args_schema.load(request.args.to_dict())
+
+def listing_owner(args):
+    """User whose tasks are listed: the caller, or for admins ?user_id= (None for everyone)"""
+    current_user = get_current_user()
+    return args['user_id'] if current_user.is_admin() else current_user.id
+
+def filtered_task_query(args, session=None):
+    """Tasks visible to the caller, narrowed by the filters in args and the search arg.
+    
+    Every filter combination is served by one of the task indexes. Returns
+    the query and the search rank column (None without full-text search).
+    """
+    session = session or db.session
+    search = request.args.get('search', type=str)
+    
+    query = session.query(Task)
+    owner_id = listing_owner(args)
+    if owner_id is not None:
+        query = query.filter(Task.user_id == owner_id)
+    
+    if args['completed'] is not None:
+        query = query.filter(Task.completed == args['completed'])
+    if args['created_after'] is not None:
+        query = query.filter(Task.created_at >= args['created_after'])
+    if args['created_before'] is not None:
+        query = query.filter(Task.created_at < args['created_before'])
+    if args['updated_after'] is not None:
+        query = query.filter(Task.updated_at >= args['updated_after'])
+    if args['updated_before'] is not None:
+        query = query.filter(Task.updated_at < args['updated_before'])
+    
+    rank = None
+    if search:
+        prefix = request.args.get('prefix', 'false').lower() == 'true'
+        query, rank = apply_search(query, Task, search, prefix=prefix)
+    
+    return query, rank
+
+def sort_column(args):
+    """Column listings are ordered by; relevance falls back to created_at without search"""
+    return Task.updated_at if args['sort'] == 'updated_at' else Task.created_at
+
+def ordered_task_query(query, args, rank=None):
+    """Order by the sort column, with id as tie-breaker, or by search rank"""
+    if rank is not None and args['sort'] == 'relevance':
+        return query.order_by(rank, Task.created_at.desc(), Task.id.desc())
+    
+    column = sort_column(args)
+    if args['order'] == 'asc':
+        return query.order_by(column.asc(), Task.id.asc())
+    return query.order_by(column.desc(), Task.id.desc())
+
+def listing_counts(session, args):
+    """(total, version, last_modified) of the caller's listing from the task counters.
+    
+    None when the listing is searched or date-filtered, or the database has
+    no counters; callers then aggregate over the filtered tasks instead.
+    """
+    date_filters = ('created_after', 'created_before', 'updated_after', 'updated_before')
+    if request.args.get('search') or any(args[key] is not None for key in date_filters):
+        return None
+    
+    counts = read_task_counts(session, listing_owner(args))
+    if counts is None:
+        return None
+    
+    total, completed, version, last_modified = counts
+    if args['completed'] is not None:
+        total = completed if args['completed'] else total - completed
+    return total, version, last_modified
+
 @tasks_bp.route('/tasks', methods=['GET'])
 @jwt_required()
+@cached_response(listing_cache_scope)
+@replica_reads
 def get_tasks():
     """Get all tasks with pagination and filtering"""
-    current_user = get_current_user()
+    return task_listing(db.session)
+
+def task_listing(session):
+    """Listing response for the request's query args, read through session.
     
+    Shared with the async view, which runs it via AsyncSession.run_sync().
+    """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
-    per_page = min(per_page, 100)  # Limit max per_page
+    per_page = max(1, min(per_page, 100))  # Negative limits mean no limit to SQLite
     
-    completed = request.args.get('completed', type=bool)
-    search = request.args.get('search', type=str)
+    try:
+        args = listing_args()
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
     
-    if current_user.is_admin():
-        query = Task.query
-    else:
-        query = Task.query.filter_by(user_id=current_user.id)
+    query, rank = filtered_task_query(args, session)
     
-    if completed is not None:
-        query = query.filter(Task.completed == completed)
+    if 'cursor' in request.args:
+        return get_tasks_by_cursor(query.with_entities(*task_columns), args, per_page)
     
-    if search:
-        query = query.filter(
-            or_(
-                Task.title.contains(search),
-                Task.description.contains(search)
-            )
-        )
+    # The task counters give the total and a version that changes with
+    # every write to the listed tasks, so paginate() needs no COUNT(*).
+    # Without them, one aggregate over the filtered set does both jobs.
+    # Deletes do not move max(updated_at), so listings only honor ETags.
+    counts = listing_counts(session, args)
+    if counts is not None:
+        total, version, last_modified = counts
+        etag = listing_etag('counters', version, total)
+    else:
+        last_modified, total = query.with_entities(
+            func.max(Task.updated_at), func.count(Task.id)
+        ).order_by(None).one()
+        etag = listing_etag(last_modified, total)
+    
+    if is_not_modified(etag):
+        return not_modified_response(etag, last_modified)
     
-    query = query.order_by(Task.created_at.desc())
+    query = ordered_task_query(query.with_entities(*task_columns), args, rank)
     
     paginated_tasks = query.paginate(
-        page=page, per_page=per_page, error_out=False
+        page=page, per_page=per_page, error_out=False, count=False
     )
+    paginated_tasks.total = total
     
-    return jsonify({
-        'tasks': [task_schema.dump(task) for task in paginated_tasks.items],
+    response = jsonify({
+        'tasks': [dump_task(row) for row in paginated_tasks.items],
         'pagination': {
             'page': page,
             'per_page': per_page,
@@ -68,18 +187,225 @@ def get_tasks():
             'has_next': paginated_tasks.has_next,
             'has_prev': paginated_tasks.has_prev
         }
+    })
+    return add_validators(response, etag, last_modified), 200
+
+def listing_etag(*state):
+    """ETag for a listing: caller, normalized query args and the data state"""
+    current_user = get_current_user()
+    args = sorted(request.args.items(multi=True))
+    return make_etag('tasks', current_user.id, current_user.role, args, *state)
+
+def get_tasks_by_cursor(query, args, per_page):
+    """Keyset-paginated listing; the total count is only computed on request"""
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+    total = None
+    if include_total:
+        counts = listing_counts(query.session, args)
+        total = counts[0] if counts is not None else query.order_by(None).count()
+    
+    try:
+        tasks, next_cursor, prev_cursor = keyset_paginate(
+            query, sort_column(args), Task.id, per_page,
+            cursor=request.args.get('cursor'),
+            descending=args['order'] == 'desc'
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    # A cursor page is validated by its own rows, which avoids a COUNT(*)
+    last_modified = max((row.updated_at for row in tasks if row.updated_at), default=None)
+    etag = listing_etag([(row.id, row.updated_at) for row in tasks], total)
+    
+    if is_not_modified(etag):
+        return not_modified_response(etag, last_modified)
+    
+    pagination = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'has_next': next_cursor is not None,
+        'has_prev': prev_cursor is not None
+    }
+    if include_total:
+        pagination['total'] = total
+    
+    response = jsonify({
+        'tasks': [dump_task(row) for row in tasks],
+        'pagination': pagination
+    })
+    return add_validators(response, etag, last_modified), 200
+
+@tasks_bp.route('/tasks/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    """Stream every matching task as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'error': 'Validation error',
+            'details': {'format': [f"Must be one of: {', '.join(EXPORT_FORMATS)}."]}
+        }), 400
+    
+    try:
+        args = listing_args()
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    mimetype, serialize = EXPORT_FORMATS[export_format]
+    query, _ = filtered_task_query(args)
+    # Plain column rows streamed from a server-side cursor: no ORM objects
+    # and no full result list are ever held in memory.
+    rows = (
+        ordered_task_query(query.with_entities(*task_columns), args)
+        .yield_per(current_app.config['TASK_EXPORT_CHUNK_SIZE'])
+    )
+    
+    chunks = serialize(
+        dump_task.fields, rows,
+        current_app.config['TASK_EXPORT_CHUNK_SIZE']
+    )
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=tasks.{export_format}'}
+    )
+
+@tasks_bp.route('/tasks/stats', methods=['GET'])
+@jwt_required()
+@replica_reads
+def get_task_stats():
+    """Task counts of the caller; admins get every user's, or one user's with ?user_id="""
+    current_user = get_current_user()
+    user_id = current_user.id
+    if current_user.is_admin():
+        user_id = request.args.get('user_id', type=int)
+    
+    counts = read_task_counts(db.session, user_id)
+    if counts is None:
+        query = db.session.query(Task)
+        if user_id is not None:
+            query = query.filter_by(user_id=user_id)
+        total, completed = query.with_entities(
+            func.count(Task.id), func.coalesce(func.sum(case((Task.completed, 1), else_=0)), 0)
+        ).one()
+    else:
+        total, completed = counts[:2]
+    
+    return jsonify({
+        'stats': {'total': total, 'completed': completed, 'open': total - completed}
+    }), 200
+
+@tasks_bp.route('/tasks/changes', methods=['GET'])
+@jwt_required()
+@replica_reads
+def get_task_changes():
+    """Tasks created, updated or deleted after the ?since= sync token, oldest first.
+    
+    since=0 (the default) starts a full sync: every live task, without
+    tombstones. Follow next_token while has_more is set, then keep it for
+    the next sync.
+    """
+    max_limit = current_app.config['TASK_CHANGES_MAX_PAGE_SIZE']
+    since = request.args.get('since', '0')
+    limit = request.args.get('limit', str(current_app.config['TASK_CHANGES_PAGE_SIZE']))
+    
+    errors = {}
+    if not since.isdigit():
+        errors['since'] = ['Must be a sync token returned by this endpoint']
+    if not limit.isdigit() or not 1 <= int(limit) <= max_limit:
+        errors['limit'] = [f'Must be between 1 and {max_limit}']
+    if errors:
+        return jsonify({'error': 'Validation error', 'details': errors}), 400
+    since, limit = int(since), int(limit)
+    
+    if not change_log_available(db.session):
+        return jsonify({'error': 'Change feed is not available on this database'}), 501
+    if 0 < since < compaction_horizon(db.session):
+        return jsonify({'error': 'Sync token expired; resync with since=0'}), 410
+    
+    current_user = get_current_user()
+    user_id = None if current_user.is_admin() else current_user.id
+    changes = read_changes(db.session, since, user_id, limit=limit + 1, upserts_only=since == 0)
+    has_more = len(changes) > limit
+    changes = [entry for _, entry in changes[:limit]]
+    next_token = changes[-1]['seq'] if changes else since
+    if since == 0 and not has_more:
+        # A full sync skips tombstones; its token must still cover them
+        next_token = change_log_head(db.session, user_id)
+    
+    return jsonify({
+        'changes': changes,
+        'next_token': str(next_token),
+        'has_more': has_more
     }), 200
 
+@tasks_bp.route('/tasks/stream', methods=['GET'])
+@jwt_required()
+def stream_task_events():
+    """Server-sent events for the caller's task changes (every user's for admins).
+    
+    Events are the entries of GET /api/tasks/changes: `upsert` with the task
+    or `delete` with its id, each with the change seq as its id. Reconnect
+    with Last-Event-ID (or ?last_event_id=) to resume.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    if last_event_id is not None and not last_event_id.isdigit():
+        return jsonify({'error': 'Validation error', 'details': {
+            'last_event_id': ['Must be an event id sent by this stream']
+        }}), 400
+    
+    hub = get_event_hub()
+    if hub is None or not change_log_available(db.session):
+        return jsonify({'error': 'Task events are not available on this server'}), 501
+    
+    current_user = get_current_user()
+    try:
+        subscription = hub.subscribe(None if current_user.is_admin() else current_user.id)
+    except TooManyStreams:
+        # Each stream holds a worker thread; refuse rather than starve other requests
+        response = jsonify({'error': 'Too many open event streams, please retry'})
+        response.headers['Retry-After'] = str(max(current_app.config['EVENTS_RETRY_MS'] // 1000, 1))
+        return response, 503
+    
+    events = event_stream(hub, subscription, int(last_event_id) if last_event_id is not None else None)
+    # The stream reads through the hub; don't pin a connection for its lifetime
+    db.session.close()
+    response = Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(lambda: hub.unsubscribe(subscription))
+    return response
+
 @tasks_bp.route('/tasks/<int:task_id>', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_task(task_id):
     """Get a specific task by ID"""
-    task = Task.query.get_or_404(task_id)
+    task = db.session.execute(
+        select(*task_columns).where(Task.id == task_id)
+    ).first()
+    
+    return task_detail(task)
+
+def task_detail(task):
+    """Conditional single-task response for a row of task_columns (or None)"""
+    if task is None:
+        abort(404)
     
     if not is_admin_or_owner(task.user_id):
         return jsonify({'error': 'Access denied'}), 403
     
-    return jsonify({'task': task_schema.dump(task)}), 200
+    # Last-Modified has one-second resolution, so an update within the same
+    # second would still match If-Modified-Since; only the ETag validates
+    etag = make_etag('task', task.id, task.updated_at)
+    if is_not_modified(etag):
+        return not_modified_response(etag, task.updated_at)
+    
+    response = jsonify({'task': dump_task(task)})
+    return add_validators(response, etag, task.updated_at), 200
 
 @tasks_bp.route('/tasks', methods=['POST'])
 @jwt_required()
@@ -90,23 +416,25 @@ def create_task():
     except ValidationError as err:
         return jsonify({'error': 'Validation error', 'details': err.messages}), 400
     
-    current_user = get_current_user()
-    
-    task = Task(
-        title=data['title'],
-        description=data.get('description'),
-        completed=data.get('completed', False),
-        user_id=current_user.id
-    )
-    
+    task = build_task(data)
     db.session.add(task)
     db.session.commit()
+    invalidate_listings([task.user_id])
     
     return jsonify({
         'message': 'Task created successfully',
-        'task': task_schema.dump(task)
+        'task': dump_task(task)
     }), 201
 
+def build_task(data):
+    """New task owned by the caller from validated create data"""
+    return Task(
+        title=data['title'],
+        description=data.get('description'),
+        completed=data.get('completed', False),
+        user_id=get_current_user().id
+    )
+
 @tasks_bp.route('/tasks/<int:task_id>', methods=['PUT'])
 @jwt_required()
 def update_task(task_id):
@@ -121,19 +449,23 @@ def update_task(task_id):
     except ValidationError as err:
         return jsonify({'error': 'Validation error', 'details': err.messages}), 400
     
+    apply_task_changes(task, data)
+    db.session.commit()
+    invalidate_listings([task.user_id])
+    
+    return jsonify({
+        'message': 'Task updated successfully',
+        'task': dump_task(task)
+    }), 200
+
+def apply_task_changes(task, data):
+    """Copy the fields present in validated update data onto task"""
     if 'title' in data:
         task.title = data['title']
     if 'description' in data:
         task.description = data['description']
     if 'completed' in data:
         task.completed = data['completed']
-    
-    db.session.commit()
-    
-    return jsonify({
-        'message': 'Task updated successfully',
-        'task': task_schema.dump(task)
-    }), 200
 
 @tasks_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @jwt_required()
@@ -144,7 +476,259 @@ def delete_task(task_id):
     if not is_admin_or_owner(task.user_id):
         return jsonify({'error': 'Access denied'}), 403
     
+    owner_id = task.user_id
     db.session.delete(task)
     db.session.commit()
+    invalidate_listings([owner_id])
     
     return jsonify({'message': 'Task deleted successfully'}), 200
+
+def authorize_batch(task_ids):
+    """Check existence and ownership of many tasks with a single query.
+    
+    Returns the authorized indexes, a failure result keyed by index for the
+    rest, and the owner of every task found.
+    """
+    owners = dict(
+        db.session.query(Task.id, Task.user_id).filter(Task.id.in_(set(task_ids))).all()
+    )
+    allowed, failures, seen = [], [], set()
+    
+    for index, task_id in enumerate(task_ids):
+        if task_id in seen:
+            failures.append({'index': index, 'status': 400, 'error': 'Duplicate task id'})
+        elif task_id not in owners:
+            failures.append({'index': index, 'status': 404, 'error': 'Task not found'})
+        elif not is_admin_or_owner(owners[task_id]):
+            failures.append({'index': index, 'status': 403, 'error': 'Access denied'})
+        else:
+            allowed.append(index)
+        seen.add(task_id)
+    
+    return allowed, failures, owners
+
+@tasks_bp.route('/tasks/batch', methods=['POST'])
+@jwt_required()
+def create_tasks_batch():
+    """Create many tasks in a single transaction"""
+    items, error = get_batch_items('tasks', current_app.config['TASK_BATCH_MAX_CREATE'])
+    if error:
+        return error
+    
+    valid, results = validate_batch(task_batch_create_schema, items)
+    
+    if valid:
+        user_id = get_current_user().id
+        rows = [{
+            'title': data['title'],
+            'description': data.get('description'),
+            'completed': data.get('completed', False),
+            'user_id': user_id
+        } for _, data in valid]
+        
+        tasks = db.session.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True), rows
+        ).all()
+        
+        # Serialize from the RETURNING rows before commit expires them
+        for (index, _), task in zip(valid, tasks):
+            results.append({'index': index, 'status': 201, 'task': dump_task(task)})
+        
+        db.session.commit()
+        invalidate_listings([user_id])
+    
+    return batch_response('Tasks created', results, 201)
+
+@tasks_bp.route('/tasks/batch', methods=['PATCH'])
+@jwt_required()
+def update_tasks_batch():
+    """Update many tasks in a single transaction"""
+    items, error = get_batch_items('tasks', current_app.config['TASK_BATCH_MAX_UPDATE'])
+    if error:
+        return error
+    
+    valid, results = validate_batch(task_batch_update_schema, items)
+    
+    allowed, failures, owners = authorize_batch([data['id'] for _, data in valid])
+    results.extend(dict(failure, index=valid[failure['index']][0]) for failure in failures)
+    updates = [valid[position] for position in allowed]
+    
+    if updates:
+        now = datetime.utcnow()
+        db.session.execute(update(Task), [dict(data, updated_at=now) for _, data in updates])
+        
+        tasks = {
+            task.id: task for task in Task.query
+            .filter(Task.id.in_([data['id'] for _, data in updates]))
+            .execution_options(populate_existing=True)
+        }
+        for index, data in updates:
+            results.append({'index': index, 'status': 200, 'task': dump_task(tasks[data['id']])})
+        
+        db.session.commit()
+        invalidate_listings(owners[data['id']] for _, data in updates)
+    
+    return batch_response('Tasks updated', results, 200)
+
+@tasks_bp.route('/tasks/batch', methods=['DELETE'])
+@jwt_required()
+def delete_tasks_batch():
+    """Delete many tasks in a single transaction"""
+    ids, error = get_batch_items('ids', current_app.config['TASK_BATCH_MAX_DELETE'])
+    if error:
+        return error
+    
+    try:
+        task_ids = task_batch_delete_schema.load({'ids': ids})['ids']
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    allowed, results, owners = authorize_batch(task_ids)
+    
+    if allowed:
+        deleted_ids = [task_ids[index] for index in allowed]
+        db.session.execute(delete(Task).where(Task.id.in_(deleted_ids)))
+        db.session.commit()
+        invalidate_listings(owners[task_id] for task_id in deleted_ids)
+        results.extend({'index': index, 'status': 200, 'id': task_ids[index]} for index in allowed)
+    
+    return batch_response('Tasks deleted', results, 200)
+
+# Background jobs: each endpoint queues a job and answers 202; the handlers
+# below run it on a job worker, one chunk per transaction with progress.
+
+@tasks_bp.route('/tasks/import', methods=['POST'])
+@jwt_required()
+def import_tasks():
+    """Queue a job creating up to TASK_IMPORT_MAX tasks; the job validates them"""
+    items, error = get_batch_items('tasks', current_app.config['TASK_IMPORT_MAX'])
+    if error:
+        return error
+    
+    return queue_job('import_tasks', {'user_id': get_current_user().id, 'tasks': items})
+
+@job_handler('import_tasks')
+def import_tasks_job(context):
+    """Insert the tasks chunk by chunk; invalid items are counted and reported, not fatal"""
+    items, user_id = context.payload['tasks'], context.payload['user_id']
+    chunk_size = current_app.config['TASK_JOB_CHUNK_SIZE']
+    previous = context.job.result or {}
+    summary = {
+        'created': previous.get('created', 0),
+        'failed': previous.get('failed', 0),
+        'errors': list(previous.get('errors', []))
+    }
+    
+    # A retry resumes after the last chunk committed with its progress
+    for start in range(context.job.progress, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        valid, failures = validate_batch(task_batch_create_schema, chunk)
+        if valid:
+            context.session.execute(insert(Task), [{
+                'title': data['title'],
+                'description': data.get('description'),
+                'completed': data.get('completed', False),
+                'user_id': user_id
+            } for _, data in valid])
+        summary['created'] += len(valid)
+        summary['failed'] += len(failures)
+        room = IMPORT_ERROR_LIMIT - len(summary['errors'])
+        summary['errors'].extend(
+            dict(failure, index=start + failure['index']) for failure in failures[:max(room, 0)])
+        context.progress(start + len(chunk), len(items), summary)
+        invalidate_listings([user_id])
+    
+    return summary
+
+@tasks_bp.route('/tasks/complete', methods=['POST'])
+@jwt_required()
+def complete_all_tasks():
+    """Queue a job marking all the caller's tasks completed (or open with {"completed": false})"""
+    try:
+        data = task_complete_all_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    return queue_job('complete_tasks', {'user_id': get_current_user().id, 'completed': data['completed']})
+
+@job_handler('complete_tasks')
+def complete_tasks_job(context):
+    """Set completed on the user's tasks that differ, chunk by chunk"""
+    user_id, completed = context.payload['user_id'], context.payload['completed']
+    chunk_size = current_app.config['TASK_JOB_CHUNK_SIZE']
+    session = context.session
+    pending = (Task.user_id == user_id) & (Task.completed != completed)
+    
+    updated = context.job.progress
+    total = updated + session.scalar(select(func.count(Task.id)).where(pending))
+    while ids := session.scalars(select(Task.id).where(pending).limit(chunk_size)).all():
+        updated += session.execute(
+            update(Task).where(Task.id.in_(ids), pending).values(completed=completed),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        context.progress(updated, total)
+        invalidate_listings([user_id])
+    
+    return {'updated': updated}
+
+@tasks_bp.route('/tasks/export', methods=['POST'])
+@jwt_required()
+def queue_task_export():
+    """Queue a job writing the caller's tasks (every task for admins) to a file"""
+    try:
+        data = task_export_job_schema.load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({'error': 'Validation error', 'details': err.messages}), 400
+    
+    current_user = get_current_user()
+    return queue_job('export_tasks', {
+        'user_id': None if current_user.is_admin() else current_user.id,
+        'format': data['format'],
+        'completed': data['completed']
+    })
+
+@job_handler('export_tasks')
+def export_tasks_job(context):
+    """Write the tasks in id order for GET /api/jobs/<id>/download.
+    
+    Rows are read in keyset chunks, so no cursor stays open across the
+    progress commits.
+    """
+    payload, session = context.payload, context.session
+    chunk_size = current_app.config['TASK_JOB_CHUNK_SIZE']
+    _, serialize = EXPORT_FORMATS[payload['format']]
+    
+    conditions = []
+    if payload['user_id'] is not None:
+        conditions.append(Task.user_id == payload['user_id'])
+    if payload['completed'] is not None:
+        conditions.append(Task.completed == payload['completed'])
+    total = session.scalar(select(func.count(Task.id)).where(*conditions))
+    written = 0
+    
+    def rows():
+        nonlocal written
+        last_id = 0
+        query = select(*task_columns).where(*conditions).order_by(Task.id).limit(chunk_size)
+        while chunk := session.execute(query.where(Task.id > last_id)).all():
+            yield from chunk
+            last_id = chunk[-1].id
+            written += len(chunk)
+            context.progress(written, total)
+    
+    path = export_path(context.job_id, payload['format'])
+    with open(f'{path}.part', 'w', newline='') as f:
+        for data in serialize(dump_task.fields, rows(), chunk_size):
+            f.write(data)
+    os.replace(f'{path}.part', path)
+    
+    return {'format': payload['format'], 'rows': written, 'size': os.path.getsize(path)}
+
+@tasks_bp.route('/tasks/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """Response cache hit/miss counters (admin only)"""
+    if not get_current_user().is_admin():
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return jsonify({'cache': get_response_cache().stats()}), 200
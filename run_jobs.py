@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Job worker script
+Runs queued background jobs outside the web processes (see utils/jobs.py)
+"""
+
+import argparse
+import signal
+import threading
+from app import create_app, db
+from utils.jobs import get_job_queue
+
+def main():
+    parser = argparse.ArgumentParser(description='Run queued background jobs')
+    parser.add_argument('--config', default='default', help='Configuration name')
+    parser.add_argument('--workers', type=int, help='Worker threads (default: JOBS_WORKERS)')
+    parser.add_argument('--once', action='store_true', help='Run the jobs ready now, then exit')
+    args = parser.parse_args()
+    
+    app = create_app(args.config, {'JOBS_WORKERS': args.workers} if args.workers else None)
+    
+    with app.app_context():
+        queue = get_job_queue()
+        if args.once:
+            print(f"Ran {queue.run_pending()} jobs")
+            print(f"Deleted {queue.expire(db.session)} expired jobs")
+            return
+    
+    if not queue.workers:
+        raise SystemExit('No workers configured; pass --workers')
+    
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+    
+    queue.start()
+    print(f"Running jobs with {queue.workers} workers")
+    stopping.wait()
+    print("Stopping after the current jobs finish")
+    queue.stop()
+
+if __name__ == '__main__':
+    main()
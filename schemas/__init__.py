@@ -1,7 +1,15 @@
+from .base import BaseSchema
 from .user_schema import UserSchema, UserLoginSchema, UserRegisterSchema
-from .task_schema import TaskSchema, TaskCreateSchema, TaskUpdateSchema
+from .task_schema import (
+    TaskSchema, TaskCreateSchema, TaskUpdateSchema,
+    TaskBatchUpdateSchema, TaskBatchDeleteSchema, TaskListArgsSchema
+)
+from .serializers import compile_serializer, dump_task, dump_user
 
 __all__ = [
+    'BaseSchema',
     'UserSchema', 'UserLoginSchema', 'UserRegisterSchema',
-    'TaskSchema', 'TaskCreateSchema', 'TaskUpdateSchema'
+    'TaskSchema', 'TaskCreateSchema', 'TaskUpdateSchema',
+    'TaskBatchUpdateSchema', 'TaskBatchDeleteSchema', 'TaskListArgsSchema',
+    'compile_serializer', 'dump_task', 'dump_user'
 ]
@@ -0,0 +1,9 @@
+from marshmallow import Schema
+from utils.metrics import timed
+
+class BaseSchema(Schema):
+    """Schema whose load() time is reported as the request's validation phase"""
+    
+    def load(self, data, **kwargs):
+        with timed('validation'):
+            return super().load(data, **kwargs)
@@ -0,0 +1,50 @@
+from marshmallow import fields
+from .task_schema import TaskSchema
+from .user_schema import UserSchema
+
+# Expression templates reproducing each field's marshmallow serialization
+_CONVERTERS = [
+    (fields.DateTime, '{v}.isoformat()'),
+    (fields.Boolean, 'bool({v})'),
+    (fields.Integer, 'int({v})'),
+    (fields.String, 'str({v})'),
+]
+
+def _converter_for(field):
+    for field_class, template in _CONVERTERS:
+        if isinstance(field, field_class):
+            if isinstance(field, fields.DateTime) and field.format not in (None, 'iso'):
+                break
+            return template
+    raise ValueError(f'Cannot compile {type(field).__name__} fields')
+
+def compile_serializer(schema):
+    """Compile a flat marshmallow schema into a plain row -> dict function.
+    
+    The function reads attributes, so it accepts ORM objects and Core/ORM
+    result rows alike, and produces the same dict as schema.dump(). The
+    attribute names it reads are exposed as ``serializer.fields`` so callers
+    can select exactly those columns.
+    """
+    reads, items = [], []
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        attribute = field.attribute or name
+        if not attribute.isidentifier():
+            raise ValueError(f'Cannot compile attribute {attribute!r}')
+        value = f'v{index}'
+        reads.append(f'    {value} = row.{attribute}')
+        converted = _converter_for(field).format(v=value)
+        items.append(f'{field.data_key or name!r}: None if {value} is None else {converted}')
+    
+    source = 'def serialize(row):\n{}\n    return {{{}}}\n'.format(
+        '\n'.join(reads), ', '.join(items)
+    )
+    namespace = {}
+    exec(compile(source, f'<serializer {type(schema).__name__}>', 'exec'), namespace)
+    
+    serializer = namespace['serialize']
+    serializer.fields = tuple(field.attribute or name for name, field in schema.dump_fields.items())
+    return serializer
+
+dump_task = compile_serializer(TaskSchema())
+dump_user = compile_serializer(UserSchema())
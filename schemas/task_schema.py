@@ -1,6 +1,8 @@
-from marshmallow import Schema, fields, validate
+from datetime import timezone
+from marshmallow import EXCLUDE, fields, validate, pre_load, post_load
+from schemas.base import BaseSchema
 
-class TaskSchema(Schema):
+class TaskSchema(BaseSchema):
     id = fields.Integer(dump_only=True)
     title = fields.String(required=True, validate=validate.Length(min=1, max=200))
     description = fields.String(allow_none=True)
@@ -9,12 +11,60 @@ class TaskSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
-class TaskCreateSchema(Schema):
+class TaskCreateSchema(BaseSchema):
     title = fields.String(required=True, validate=validate.Length(min=1, max=200))
     description = fields.String(allow_none=True)
     completed = fields.Boolean(load_default=False)
 
-class TaskUpdateSchema(Schema):
+class TaskUpdateSchema(BaseSchema):
     title = fields.String(validate=validate.Length(min=1, max=200))
     description = fields.String(allow_none=True)
     completed = fields.Boolean()
+
+class TaskBatchUpdateSchema(TaskUpdateSchema):
+    id = fields.Integer(required=True)
+
+class TaskBatchDeleteSchema(BaseSchema):
+    ids = fields.List(fields.Integer(), required=True)
+
+class TaskCompleteAllSchema(BaseSchema):
+    """Body of POST /api/tasks/complete"""
+    completed = fields.Boolean(load_default=True)
+
+class TaskExportJobSchema(BaseSchema):
+    """Body of POST /api/tasks/export"""
+    format = fields.String(load_default='ndjson', validate=validate.OneOf(('ndjson', 'csv')))
+    completed = fields.Boolean(load_default=None)
+
+TASK_SORT_FIELDS = ('created_at', 'updated_at')
+
+class TaskListArgsSchema(BaseSchema):
+    """Filters and ordering of task listings and exports, from the query args"""
+    
+    class Meta:
+        unknown = EXCLUDE  # page, per_page, search, cursor... are read by the view
+    
+    completed = fields.Boolean(load_default=None)
+    created_after = fields.DateTime(load_default=None)
+    created_before = fields.DateTime(load_default=None)
+    updated_after = fields.DateTime(load_default=None)
+    updated_before = fields.DateTime(load_default=None)
+    user_id = fields.Integer(load_default=None)  # Owner filter, admins only
+    sort = fields.String(
+        load_default='created_at', validate=validate.OneOf(TASK_SORT_FIELDS + ('relevance',))
+    )
+    order = fields.String(load_default='desc', validate=validate.OneOf(('asc', 'desc')))
+    
+    @pre_load
+    def drop_empty(self, data, **kwargs):
+        # ?completed= is the same as leaving the filter out
+        return {key: value for key, value in data.items() if value != ''}
+    
+    @post_load
+    def to_naive_utc(self, data, **kwargs):
+        # Task timestamps are stored as naive UTC
+        for key in ('created_after', 'created_before', 'updated_after', 'updated_before'):
+            value = data[key]
+            if value is not None and value.tzinfo is not None:
+                data[key] = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return data
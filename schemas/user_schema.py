@@ -1,6 +1,7 @@
-from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from marshmallow import fields, validate, validates_schema, ValidationError
+from schemas.base import BaseSchema
 
-class UserSchema(Schema):
+class UserSchema(BaseSchema):
     id = fields.Integer(dump_only=True)
     username = fields.String(required=True, validate=validate.Length(min=3, max=80))
     email = fields.Email(required=True)
@@ -8,7 +9,7 @@ class UserSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
-class UserRegisterSchema(Schema):
+class UserRegisterSchema(BaseSchema):
     username = fields.String(required=True, validate=validate.Length(min=3, max=80))
     email = fields.Email(required=True)
     password = fields.String(required=True, validate=validate.Length(min=6))
@@ -19,6 +20,13 @@ class UserRegisterSchema(Schema):
         if data['password'] != data['confirm_password']:
             raise ValidationError('Passwords do not match', 'confirm_password')
 
-class UserLoginSchema(Schema):
+class UserProvisionSchema(BaseSchema):
+    """A user created by an admin, with the role set directly"""
+    username = fields.String(required=True, validate=validate.Length(min=3, max=80))
+    email = fields.Email(required=True)
+    password = fields.String(required=True, validate=validate.Length(min=6))
+    role = fields.String(load_default='user', validate=validate.OneOf(['user', 'admin']))
+
+class UserLoginSchema(BaseSchema):
     username = fields.String(required=True)
     password = fields.String(required=True)
@@ -1,12 +1,90 @@
+import asyncio
 import pytest
+from sqlalchemy import event
+from werkzeug.test import EnvironBuilder
 from app import create_app, db
+from asgi import AsyncDispatcher
 from models.user import User
 from models.task import Task
+from utils.async_db import async_db
 
-@pytest.fixture
-def app():
-    """Create application for testing"""
-    app = create_app('testing')
+class ASGITestClient:
+    """Drive an AsyncDispatcher like Flask's test client.
+    
+    Requests run on one event loop for the client's lifetime, since pooled
+    async connections are bound to the loop that opened them.
+    """
+    
+    def __init__(self, app):
+        self.application = app
+        self.dispatcher = AsyncDispatcher(app)
+        self.loop = asyncio.new_event_loop()
+    
+    def open(self, path, method='GET', **kwargs):
+        request = EnvironBuilder(path=path, method=method, **kwargs).get_request()
+        body = request.get_data()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': request.path,
+            'root_path': '',
+            'query_string': request.query_string,
+            'headers': [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in request.headers.items()
+            ],
+            'client': ('127.0.0.1', 50000),
+            'server': ('localhost', 80)
+        }
+        messages = []
+        
+        async def receive():
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        
+        async def send(message):
+            messages.append(message)
+        
+        self.loop.run_until_complete(self.dispatcher(scope, receive, send))
+        start = messages[0]
+        return self.application.response_class(
+            b''.join(message.get('body', b'') for message in messages[1:]),
+            status=start['status'],
+            headers=[(name.decode('latin1'), value.decode('latin1')) for name, value in start['headers']]
+        )
+    
+    def get(self, path, **kwargs):
+        return self.open(path, 'GET', **kwargs)
+    
+    def post(self, path, **kwargs):
+        return self.open(path, 'POST', **kwargs)
+    
+    def put(self, path, **kwargs):
+        return self.open(path, 'PUT', **kwargs)
+    
+    def patch(self, path, **kwargs):
+        return self.open(path, 'PATCH', **kwargs)
+    
+    def delete(self, path, **kwargs):
+        return self.open(path, 'DELETE', **kwargs)
+    
+    def close(self):
+        self.loop.run_until_complete(async_db.dispose(self.application))
+        self.loop.close()
+
+@pytest.fixture(params=['sync', 'async'])
+def app(request, tmp_path):
+    """Create application for testing, once per deployment mode"""
+    if request.param == 'async':
+        # Both engines must see the same database, so use a file
+        app = create_app('testing', {
+            'ASYNC_MODE': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}"
+        })
+    else:
+        app = create_app('testing')
     
     with app.app_context():
         db.create_all()
@@ -15,8 +93,32 @@ def app():
 
 @pytest.fixture
 def client(app):
-    """Create test client"""
-    return app.test_client()
+    """Create test client (an ASGI one in async mode)"""
+    if not app.config['ASYNC_MODE']:
+        yield app.test_client()
+        return
+    
+    client = ASGITestClient(app)
+    yield client
+    client.close()
+
+@pytest.fixture
+def query_counter(app):
+    """Record SQL statements executed while the test runs"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engines = [db.engine]
+    if app.config['ASYNC_MODE']:
+        engines.append(async_db.engine.sync_engine)
+    
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    for engine in engines:
+        event.remove(engine, 'before_cursor_execute', record)
 
 @pytest.fixture
 def auth_headers(client):
@@ -0,0 +1,82 @@
+import asyncio
+import inspect
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from app import db
+from utils.async_db import async_database_url
+
+@pytest.mark.parametrize('app', ['async'], indirect=True)
+class TestAsyncMode:
+    """Test the ASGI deployment mode"""
+    
+    def test_views_are_coroutines(self, app):
+        """Test auth and task CRUD endpoints are served by coroutine views"""
+        for endpoint in ('auth.login', 'tasks.get_tasks', 'tasks.update_task'):
+            assert inspect.iscoroutinefunction(app.view_functions[endpoint])
+        assert not inspect.iscoroutinefunction(app.view_functions['tasks.create_tasks_batch'])
+    
+    def test_reads_go_through_async_engine(self, app, client, auth_headers, sample_task, query_counter):
+        """Test async views query through the async engine only"""
+        sync_statements = []
+        
+        def record(conn, cursor, statement, *args):
+            sync_statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        assert response.status_code == 200
+        assert query_counter
+        assert sync_statements == []
+    
+    def test_concurrent_requests_share_the_event_loop(self, client, auth_headers, sample_task):
+        """Test many in-flight requests are interleaved on one loop"""
+        response = client.get('/api/tasks', headers=auth_headers)
+        header = auth_headers['Authorization'].encode()
+        
+        async def fetch():
+            messages = []
+            
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            
+            async def send(message):
+                messages.append(message)
+            
+            await client.dispatcher({
+                'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+                'path': '/api/tasks', 'root_path': '', 'query_string': b'',
+                'headers': [(b'authorization', header)]
+            }, receive, send)
+            return messages[0]['status'], messages[1]['body']
+        
+        async def fetch_all():
+            return await asyncio.gather(*(fetch() for _ in range(50)))
+        
+        results = client.loop.run_until_complete(fetch_all())
+        
+        assert {status for status, _ in results} == {200}
+        assert {body for _, body in results} == {response.data}
+    
+    def test_sync_endpoints_still_served(self, client, auth_headers):
+        """Test endpoints without an async view fall back to the WSGI app"""
+        response = client.post('/api/tasks/batch', json={'tasks': [{'title': 'One'}]}, headers=auth_headers)
+        
+        assert response.status_code == 201
+        assert client.get('/api/tasks', headers=auth_headers).json['pagination']['total'] == 1
+
+class TestAsyncDatabaseUrl:
+    """Test deriving the async engine URL"""
+    
+    def test_sqlite_uses_aiosqlite(self):
+        url = async_database_url(make_url('sqlite:////tmp/tasks.db'))
+        assert url.drivername == 'sqlite+aiosqlite'
+        assert url.database == '/tmp/tasks.db'
+    
+    def test_in_memory_sqlite_rejected(self):
+        with pytest.raises(RuntimeError):
+            async_database_url(make_url('sqlite:///:memory:'))
@@ -1,5 +1,14 @@
 import pytest
 import json
+import threading
+import time
+from flask_jwt_extended import decode_token
+from app import db
+from models.user import User
+from utils.identity import identity_cache
+from utils.passwords import get_password_hasher
+from utils.provisioning import duplicate_error
+from werkzeug.security import generate_password_hash
 
 class TestAuth:
     """Test authentication endpoints"""
@@ -103,3 +112,245 @@ class TestAuth:
         response = client.get('/api/auth/profile')
         
         assert response.status_code == 401
+    
+    def test_identity_cache_invalidated_on_role_change(self, app, client, auth_headers, sample_task):
+        """Test that promoting a user evicts their cached role"""
+        app.config['IDENTITY_CACHE_ENABLED'] = True
+        client.get('/api/auth/profile', headers=auth_headers)
+        user_id = User.query.filter_by(username='testuser').first().id
+        
+        assert identity_cache.get(user_id) == ('user', 0)
+        
+        user = db.session.get(User, user_id)
+        user.role = 'admin'
+        db.session.commit()
+        
+        assert identity_cache.get(user_id) is None
+    
+    def test_profile_of_deleted_user_is_rejected(self, client, auth_headers):
+        """Test that a token for a removed user no longer authenticates"""
+        db.session.delete(User.query.filter_by(username='testuser').first())
+        db.session.commit()
+        
+        response = client.get('/api/auth/profile', headers=auth_headers)
+        
+        assert response.status_code == 401
+    
+    def test_login_token_carries_role_claims(self, client, auth_headers):
+        """Test that access tokens embed the role and token version"""
+        token = auth_headers['Authorization'].split()[1]
+        
+        with client.application.app_context():
+            claims = decode_token(token)
+        
+        assert claims['role'] == 'user'
+        assert claims['ver'] == 0
+    
+    def test_logout_revokes_tokens(self, client, auth_headers):
+        """Test that logging out invalidates previously issued tokens"""
+        response = client.post('/api/auth/logout', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert client.get('/api/auth/profile', headers=auth_headers).status_code == 401
+        
+        login_data = {'username': 'testuser', 'password': 'testpass123'}
+        token = client.post('/api/auth/login', json=login_data).json['access_token']
+        response = client.get('/api/auth/profile', headers={'Authorization': f'Bearer {token}'})
+        
+        assert response.status_code == 200
+    
+    def test_role_change_revokes_tokens(self, client, auth_headers):
+        """Test that tokens with a stale role claim stop working"""
+        user = User.query.filter_by(username='testuser').first()
+        user.role = 'admin'
+        db.session.commit()
+        
+        assert user.token_version == 1
+        assert client.get('/api/auth/profile', headers=auth_headers).status_code == 401
+    
+    def test_password_hashed_with_configured_bcrypt_cost(self, app, client, auth_headers):
+        """Test that new passwords use the configured algorithm and cost"""
+        user = User.query.filter_by(username='testuser').first()
+        
+        assert user.password_hash.startswith(f"$2b${app.config['PASSWORD_BCRYPT_ROUNDS']:02d}$")
+        assert not user.password_needs_rehash()
+    
+    def test_login_rehashes_outdated_password(self, client):
+        """Test transparent upgrade of hashes made with old parameters"""
+        user = User(username='legacy', email='legacy@example.com')
+        user.password_hash = generate_password_hash('password123', method='pbkdf2:sha256:1000')
+        db.session.add(user)
+        db.session.commit()
+        
+        response = client.post('/api/auth/login', json={'username': 'legacy', 'password': 'password123'})
+        
+        assert response.status_code == 200
+        db.session.refresh(user)
+        assert user.password_hash.startswith('$2b$')
+        assert client.post('/api/auth/login', json={'username': 'legacy', 'password': 'password123'}).status_code == 200
+    
+    @pytest.mark.parametrize('method', ['scrypt', 'pbkdf2', 'pbkdf2:sha256'])
+    def test_werkzeug_hashes_not_rehashed(self, client, auth_headers, method):
+        """Test hashes made with the configured werkzeug method are current, defaults included"""
+        hasher = get_password_hasher()
+        hasher.method = method
+        user = User.query.filter_by(username='testuser').first()
+        user.set_password('testpass123')
+        db.session.commit()
+        stored = user.password_hash
+        
+        response = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass123'})
+        
+        assert response.status_code == 200
+        assert not user.password_needs_rehash()
+        db.session.refresh(user)
+        assert user.password_hash == stored
+        assert len(stored) <= User.__table__.c.password_hash.type.length
+    
+    def test_login_sheds_load_when_hashing_queue_full(self, client, auth_headers):
+        """Test 503 backpressure from the bounded hashing pool"""
+        hasher = get_password_hasher()
+        hasher.max_pending = 0
+        
+        response = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass123'})
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    
+    @pytest.fixture
+    def slow_verify(self, monkeypatch):
+        """Make verification block until the returned event is set"""
+        done = threading.Event()
+        
+        def blocked(password, password_hash):
+            done.wait(5)
+            return True
+        
+        monkeypatch.setattr('utils.passwords._verify', blocked)
+        yield done
+        done.set()
+    
+    def test_login_times_out_with_503(self, client, auth_headers, slow_verify):
+        """Test a hash slower than the timeout sheds load instead of failing"""
+        get_password_hasher().timeout = 0.05
+        
+        response = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass123'})
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    
+    def test_timed_out_hash_keeps_its_slot(self, client, auth_headers, slow_verify):
+        """Test pending counts a hash until it finishes, not until its caller gave up"""
+        hasher = get_password_hasher()
+        hasher.timeout = 0.05
+        client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass123'})
+        
+        assert hasher.pending == 1
+        slow_verify.set()
+        for _ in range(100):
+            if hasher.pending == 0:
+                break
+            time.sleep(0.01)
+        assert hasher.pending == 0
+    
+    def test_inline_hashing(self, client, auth_headers):
+        """Test hashing on the request thread when the pool is disabled"""
+        get_password_hasher().workers = 0
+        
+        response = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass123'})
+        
+        assert response.status_code == 200
+    
+    def register(self, client, username, email):
+        return client.post('/api/auth/register', json={
+            'username': username,
+            'email': email,
+            'password': 'password123',
+            'confirm_password': 'password123'
+        })
+    
+    def test_register_duplicate_email(self, client):
+        self.register(client, 'first', 'same@example.com')
+        
+        response = self.register(client, 'second', 'same@example.com')
+        
+        assert response.status_code == 400
+        assert response.json['error'] == 'Email already exists'
+    
+    def test_register_checks_uniqueness_in_one_query(self, client, query_counter):
+        """Test username and email are looked up together before the insert"""
+        self.register(client, 'newuser', 'newuser@example.com')
+        
+        statements = [statement.lstrip().upper() for statement in query_counter]
+        insert = next(i for i, statement in enumerate(statements) if statement.startswith('INSERT INTO USERS'))
+        lookups = [statement for statement in statements[:insert]
+                   if statement.startswith('SELECT') and 'FROM USERS' in statement]
+        assert len(lookups) == 1
+    
+    def test_register_race_maps_to_400(self, client, monkeypatch):
+        """Test a unique violation from a concurrent registration is reported like the check"""
+        self.register(client, 'testuser', 'test@example.com')
+        checks = []
+        
+        def first_check_misses(data, taken):
+            checks.append(data)
+            return None if len(checks) == 1 else duplicate_error(data, taken)
+        
+        monkeypatch.setattr('routes.auth.duplicate_error', first_check_misses)
+        monkeypatch.setattr('routes.async_auth.duplicate_error', first_check_misses)
+        
+        response = self.register(client, 'testuser', 'other@example.com')
+        
+        assert response.status_code == 400
+        assert response.json['error'] == 'Username already exists'
+        assert len(checks) == 2
+        assert self.register(client, 'another', 'another@example.com').status_code == 201
+
+class TestUserProvisioning:
+    """Test bulk user creation by admins"""
+    
+    def test_provision_users(self, client, admin_headers, auth_headers):
+        """Test per-item results for created, duplicate and invalid users"""
+        response = client.post('/api/auth/users/batch', json={'users': [
+            {'username': 'alice', 'email': 'alice@example.com', 'password': 'secret123'},
+            {'username': 'testuser', 'email': 'new@example.com', 'password': 'secret123'},
+            {'username': 'bob', 'email': 'alice@example.com', 'password': 'secret123'},
+            {'username': 'carol', 'email': 'carol@example.com', 'password': 'secret123', 'role': 'admin'},
+            {'username': 'dave', 'email': 'dave@example.com', 'password': 'secret123', 'role': 'root'}
+        ]}, headers=admin_headers)
+        
+        assert response.status_code == 207
+        results = response.json['results']
+        assert [result['status'] for result in results] == [201, 400, 400, 201, 400]
+        assert results[1]['error'] == 'Username already exists'
+        assert results[2]['error'] == 'Email already exists'
+        assert results[3]['user']['role'] == 'admin'
+        assert 'role' in results[4]['details']
+        assert client.post('/api/auth/login', json={
+            'username': 'carol', 'password': 'secret123'
+        }).status_code == 200
+    
+    def test_provision_requires_admin(self, client, auth_headers):
+        response = client.post('/api/auth/users/batch', json={'users': [
+            {'username': 'alice', 'email': 'alice@example.com', 'password': 'secret123'}
+        ]}, headers=auth_headers)
+        
+        assert response.status_code == 403
+    
+    def test_provision_batch_limit(self, app, client, admin_headers):
+        app.config['USER_BATCH_MAX_CREATE'] = 1
+        response = client.post('/api/auth/users/batch', json={'users': [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'secret123'} for i in range(2)
+        ]}, headers=admin_headers)
+        
+        assert response.status_code == 413
+    
+    def test_hash_many(self, app):
+        """Test batch hashes verify and are salted independently"""
+        hasher = get_password_hasher()
+        
+        hashes = hasher.hash_many(['secret123', 'secret123', 'other123'], workers=2)
+        
+        assert len(set(hashes)) == 3
+        assert hasher.verify('secret123', hashes[1])
+        assert not hasher.verify('secret123', hashes[2])
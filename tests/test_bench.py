@@ -0,0 +1,76 @@
+import pytest
+from bench import runner, scenarios, startup
+from bench.data import seed
+from bench.stats import percentile, summarize
+from utils.ratelimit import RateLimiter
+
+class TestBenchSuite:
+    """Test the benchmark data generator, scenarios and baseline comparison"""
+    
+    def result(self, **values):
+        return dict({'requests': 100, 'errors': 0, 'throughput': 100.0, 'p95': 10.0}, **values)
+    
+    def test_percentile(self):
+        samples = list(range(100, 0, -1))
+        assert percentile(samples, 50) == 51
+        assert percentile(samples, 99) == 100
+        assert percentile([], 95) == 0
+    
+    def test_summarize(self):
+        summary = summarize([10.0, 20.0, 30.0], errors=1, duration=2.0)
+        assert summary['requests'] == 4
+        assert summary['throughput'] == 1.5
+        assert summary['p50'] == 20.0
+    
+    def test_scenarios_run_against_test_client(self, tmp_path):
+        app = runner.make_app(str(tmp_path / 'bench.db'), rounds=4)
+        user_names, admin_names = seed(app, users=3, tasks=60, admins=1)
+        
+        results = runner.run_suite(scenarios.TestClientTransport(app), user_names, admin_names,
+                                   list(scenarios.SCENARIOS), requests=4, concurrency=2)
+        
+        assert set(results) == set(scenarios.SCENARIOS)
+        for result in results.values():
+            assert result['requests'] == 4
+            assert result['errors'] == 0
+    
+    def test_rate_limited_run_aborts(self, tmp_path):
+        """Test a server answering 429 aborts the run instead of recording errors"""
+        app = runner.make_app(str(tmp_path / 'bench.db'), rounds=4)
+        user_names, admin_names = seed(app, users=2, tasks=10, admins=1)
+        app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_LIMITS={'default': '1000/second', 'tasks': '2/minute'})
+        app.extensions['rate_limiter'] = RateLimiter.from_config(app)
+        
+        with pytest.raises(scenarios.RateLimited, match='429'):
+            runner.run_suite(scenarios.TestClientTransport(app), user_names, admin_names,
+                             ['get_task'], requests=6, concurrency=1)
+    
+    def test_compare_flags_regressions(self):
+        baseline = {'scenarios': {'login': self.result(), 'get_task': self.result()}}
+        results = {
+            'login': self.result(p95=13.0, throughput=70.0),
+            'get_task': self.result(p95=11.0, throughput=95.0),
+            'crud_mix': self.result()
+        }
+        
+        regressions = runner.compare(results, baseline, threshold=0.2)
+        
+        assert len(regressions) == 2
+        assert all(regression.startswith('login') for regression in regressions)
+    
+    def test_compare_flags_new_errors(self):
+        baseline = {'scenarios': {'login': self.result()}}
+        assert runner.compare({'login': self.result(errors=3)}, baseline, threshold=0.2)
+    
+    def test_parse_importtime(self):
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     sqlalchemy.util\n'
+            'import time:       300 |        420 |   sqlalchemy\n'
+            'import time:        50 |        470 | app\n'
+        )
+        
+        modules = startup.parse_importtime(stderr)
+        
+        assert modules == {'sqlalchemy.util': (120, 120), 'sqlalchemy': (300, 420), 'app': (50, 470)}
+        assert startup.by_package(modules) == {'sqlalchemy': 420, 'app': 50}
@@ -0,0 +1,119 @@
+import pickle
+import pytest
+from utils.cache import CacheBackend, init_response_cache, get_response_cache
+
+class FakeSharedBackend(CacheBackend):
+    """Stand-in for a networked store: values only survive as serialized bytes"""
+    
+    name = 'fake-shared'
+    store = {}
+    
+    def get(self, key):
+        value = self.store.get(key)
+        return pickle.loads(value) if value is not None else None
+    
+    def set(self, key, value, ttl):
+        self.store[key] = pickle.dumps(value)
+    
+    def get_counter(self, key):
+        return self.get(key) or 0
+    
+    def incr(self, key):
+        value = self.get_counter(key) + 1
+        self.set(key, value, None)
+        return value
+
+@pytest.fixture
+def cache(app):
+    app.config['RESPONSE_CACHE_ENABLED'] = True
+    init_response_cache(app)
+    return get_response_cache()
+
+class TestResponseCache:
+    """Test the task listing response cache"""
+    
+    def test_listing_served_from_cache(self, client, auth_headers, sample_task, cache, query_counter):
+        """Test that a repeated listing is a hit that runs no task queries"""
+        first = client.get('/api/tasks', headers=auth_headers)
+        query_counter.clear()
+        
+        second = client.get('/api/tasks', headers=auth_headers)
+        
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.get_data() == first.get_data()
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert not any('FROM tasks' in statement for statement in query_counter)
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+    
+    def test_query_args_are_part_of_the_key(self, client, auth_headers, sample_task, cache):
+        """Test that different pages are cached separately"""
+        client.get('/api/tasks?per_page=5&page=1', headers=auth_headers)
+        
+        response = client.get('/api/tasks?page=1&per_page=5', headers=auth_headers)
+        
+        assert response.headers['X-Cache'] == 'HIT'
+        assert client.get('/api/tasks?page=2', headers=auth_headers).headers['X-Cache'] == 'MISS'
+    
+    def test_cached_hit_answers_conditional_request(self, client, auth_headers, sample_task, cache):
+        """Test that cached entries keep their validators"""
+        etag = client.get('/api/tasks', headers=auth_headers).headers['ETag']
+        
+        response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.headers['X-Cache'] == 'HIT'
+    
+    def test_writes_invalidate_owner_and_admin_listings(self, client, auth_headers, admin_headers, sample_task, cache):
+        """Test per-user generations and the admin-wide rule"""
+        client.get('/api/tasks', headers=auth_headers)
+        client.get('/api/tasks', headers=admin_headers)
+        client.post('/api/tasks', json={'title': 'Admin Task'}, headers=admin_headers)
+        
+        assert client.get('/api/tasks', headers=auth_headers).headers['X-Cache'] == 'HIT'
+        assert client.get('/api/tasks', headers=admin_headers).headers['X-Cache'] == 'MISS'
+        
+        client.put(f'/api/tasks/{sample_task["id"]}', json={'completed': True}, headers=admin_headers)
+        response = client.get('/api/tasks', headers=auth_headers)
+        
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.json['tasks'][0]['completed'] == True
+        
+        client.delete('/api/tasks/batch', json={'ids': [sample_task['id']]}, headers=auth_headers)
+        
+        assert client.get('/api/tasks', headers=auth_headers).json['tasks'] == []
+    
+    def test_user_deletion_invalidates_admin_listings(self, client, auth_headers, admin_headers, sample_task, cache):
+        client.get('/api/tasks', headers=admin_headers)
+        
+        client.delete(f"/api/auth/users/{sample_task['user_id']}", headers=admin_headers)
+        response = client.get('/api/tasks', headers=admin_headers)
+        
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.json['tasks'] == []
+    
+    def test_shared_backend_from_config(self, app, client, auth_headers, sample_task):
+        """Test plugging in a shared backend by import path"""
+        FakeSharedBackend.store.clear()
+        app.config['RESPONSE_CACHE_ENABLED'] = True
+        app.config['RESPONSE_CACHE_BACKEND'] = 'tests.test_cache:FakeSharedBackend'
+        init_response_cache(app)
+        
+        client.get('/api/tasks', headers=auth_headers)
+        
+        assert client.get('/api/tasks', headers=auth_headers).headers['X-Cache'] == 'HIT'
+        assert get_response_cache().stats()['backend'] == 'fake-shared'
+        
+        client.post('/api/tasks', json={'title': 'Another'}, headers=auth_headers)
+        
+        assert len(client.get('/api/tasks', headers=auth_headers).json['tasks']) == 2
+    
+    def test_cache_stats_admin_only(self, client, auth_headers, admin_headers, cache):
+        """Test that cache metrics are exposed to admins"""
+        assert client.get('/api/tasks/cache/stats', headers=auth_headers).status_code == 403
+        
+        response = client.get('/api/tasks/cache/stats', headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert set(response.json['cache']) >= {'hits', 'misses', 'hit_ratio', 'invalidations'}
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app import db
+from models.user import User
+from models.task_change import TaskChange
+from utils.changes import compact_change_log
+
+def sync(client, headers, since=0, **params):
+    """Follow next_token until has_more is unset; returns the changes and the final token"""
+    changes = []
+    while True:
+        response = client.get('/api/tasks/changes', query_string={'since': since, **params}, headers=headers)
+        assert response.status_code == 200
+        changes.extend(response.json['changes'])
+        since = response.json['next_token']
+        if not response.json['has_more']:
+            return changes, since
+
+class TestTaskChanges:
+    """Test the change feed at /api/tasks/changes"""
+    
+    def test_full_sync_lists_live_tasks(self, client, auth_headers):
+        """Test since=0 returns every task as an upsert, without tombstones"""
+        ids = [client.post('/api/tasks', json={'title': title}, headers=auth_headers).json['task']['id']
+               for title in ('One', 'Two', 'Three')]
+        client.delete(f'/api/tasks/{ids[1]}', headers=auth_headers)
+        
+        changes, _ = sync(client, auth_headers)
+        
+        assert [change['op'] for change in changes] == ['upsert', 'upsert']
+        assert [change['task']['id'] for change in changes] == [ids[0], ids[2]]
+        assert changes[0]['task']['title'] == 'One'
+    
+    def test_incremental_sync(self, client, auth_headers, sample_task):
+        """Test a token returns only later changes, with one entry per task"""
+        _, token = sync(client, auth_headers)
+        
+        created = client.post('/api/tasks', json={'title': 'New'}, headers=auth_headers).json['task']
+        client.put(f"/api/tasks/{sample_task['id']}", json={'title': 'Renamed'}, headers=auth_headers)
+        client.put(f"/api/tasks/{sample_task['id']}", json={'completed': True}, headers=auth_headers)
+        client.delete(f"/api/tasks/{created['id']}", headers=auth_headers)
+        
+        changes, next_token = sync(client, auth_headers, token)
+        
+        assert [(change['op'], change.get('id') or change['task']['id']) for change in changes] == [
+            ('upsert', sample_task['id']), ('delete', created['id'])
+        ]
+        assert changes[0]['task']['title'] == 'Renamed'
+        assert changes[0]['task']['completed'] is True
+        assert int(next_token) > int(token)
+        assert sync(client, auth_headers, next_token) == ([], next_token)
+    
+    def test_batch_writes_are_logged(self, client, auth_headers, sample_task):
+        """Test the bulk insert/update/delete paths reach the feed"""
+        _, token = sync(client, auth_headers)
+        response = client.post('/api/tasks/batch', json={
+            'tasks': [{'title': 'A'}, {'title': 'B'}]
+        }, headers=auth_headers)
+        ids = [result['task']['id'] for result in response.json['results']]
+        client.patch('/api/tasks/batch', json={
+            'tasks': [{'id': sample_task['id'], 'completed': True}]
+        }, headers=auth_headers)
+        client.delete('/api/tasks/batch', json={'ids': ids[:1]}, headers=auth_headers)
+        
+        changes, _ = sync(client, auth_headers, token)
+        
+        assert [(change['op'], change.get('id') or change['task']['id']) for change in changes] == [
+            ('upsert', ids[1]), ('upsert', sample_task['id']), ('delete', ids[0])
+        ]
+    
+    def test_pages_follow_next_token(self, client, auth_headers):
+        """Test limit pages through the changes in seq order"""
+        client.post('/api/tasks/batch', json={
+            'tasks': [{'title': f'Task {i}'} for i in range(5)]
+        }, headers=auth_headers)
+        
+        first = client.get('/api/tasks/changes?limit=2', headers=auth_headers).json
+        changes, _ = sync(client, auth_headers, limit=2)
+        
+        assert len(first['changes']) == 2 and first['has_more'] is True
+        assert len(changes) == 5
+        assert [change['seq'] for change in changes] == sorted(change['seq'] for change in changes)
+    
+    def test_scoped_to_owner(self, client, auth_headers, admin_headers, sample_task):
+        """Test users see their own changes and admins see everyone's"""
+        client.post('/api/tasks', json={'title': 'Admin task'}, headers=admin_headers)
+        
+        user_changes, _ = sync(client, auth_headers)
+        admin_changes, _ = sync(client, admin_headers)
+        
+        assert [change['task']['id'] for change in user_changes] == [sample_task['id']]
+        assert len(admin_changes) == 2
+    
+    def test_user_cascade_leaves_tombstones(self, client, admin_headers, sample_task):
+        """Test deleting a user logs a delete for each of their tasks"""
+        _, token = sync(client, admin_headers)
+        user = User.query.filter_by(username='testuser').one()
+        db.session.delete(user)
+        db.session.commit()
+        
+        changes, _ = sync(client, admin_headers, token)
+        
+        assert changes == [{'seq': changes[0]['seq'], 'op': 'delete', 'id': sample_task['id']}]
+    
+    def test_empty_full_sync_covers_tombstones(self, client, auth_headers, sample_task):
+        """Test a full sync that returns no tasks still yields a token past the deletes"""
+        client.delete(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        
+        changes, token = sync(client, auth_headers)
+        
+        assert changes == []
+        assert int(token) > 0
+    
+    def test_reused_id_keeps_tombstone(self, client, auth_headers, admin_headers, sample_task):
+        """Test a deleted task's id handed to another user's task does not hide the delete"""
+        _, token = sync(client, auth_headers)
+        client.delete(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        reused = client.post('/api/tasks', json={'title': 'Admin'}, headers=admin_headers).json['task']
+        assert reused['id'] == sample_task['id']
+        
+        changes, _ = sync(client, auth_headers, token)
+        
+        assert [(change['op'], change['id']) for change in changes] == [('delete', sample_task['id'])]
+    
+    def test_invalid_params(self, client, auth_headers):
+        """Test malformed tokens and limits are rejected"""
+        for query in ('since=abc', 'since=-1', 'limit=0', 'limit=100000'):
+            response = client.get(f'/api/tasks/changes?{query}', headers=auth_headers)
+            assert response.status_code == 400
+            assert response.json['error'] == 'Validation error'
+    
+    def test_compaction_expires_old_tokens(self, client, auth_headers, sample_task):
+        """Test pruning old tombstones makes older tokens resync with 410"""
+        _, token = sync(client, auth_headers)
+        kept = client.post('/api/tasks', json={'title': 'Kept'}, headers=auth_headers).json['task']
+        client.delete(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        db.session.execute(
+            update(TaskChange).where(TaskChange.op == 'delete')
+            .values(changed_at=datetime.utcnow() - timedelta(days=60))
+        )
+        db.session.commit()
+        
+        with db.engine.begin() as conn:
+            assert compact_change_log(conn, timedelta(days=30)) == 1
+        
+        assert client.get(f'/api/tasks/changes?since={token}', headers=auth_headers).status_code == 410
+        changes, _ = sync(client, auth_headers)
+        assert [change['task']['id'] for change in changes] == [kept['id']]
+    
+    def test_compaction_keeps_recent_tombstones(self, client, auth_headers, sample_task):
+        """Test tombstones within the retention survive compaction"""
+        _, token = sync(client, auth_headers)
+        client.delete(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        
+        with db.engine.begin() as conn:
+            assert compact_change_log(conn, timedelta(days=30)) == 0
+        
+        changes, _ = sync(client, auth_headers, token)
+        assert [change['op'] for change in changes] == ['delete']
@@ -0,0 +1,146 @@
+from app import db
+from models.user import User
+from models.task import Task
+from models.user_task_stats import UserTaskStats
+from utils.counters import find_counter_drift, repair_task_counters
+
+def counters(username='testuser'):
+    user_id = User.query.filter_by(username=username).one().id
+    stats = db.session.get(UserTaskStats, user_id, populate_existing=True)
+    return (stats.total, stats.completed) if stats else None
+
+class TestTaskCounters:
+    """Test the per-user task counters and the listings reading them"""
+    
+    def test_counters_follow_single_writes(self, client, auth_headers):
+        """Test create, update and delete adjust the owner's counters"""
+        task = client.post('/api/tasks', json={'title': 'One'}, headers=auth_headers).json['task']
+        client.post('/api/tasks', json={'title': 'Two', 'completed': True}, headers=auth_headers)
+        assert counters() == (2, 1)
+        
+        client.put(f"/api/tasks/{task['id']}", json={'completed': True}, headers=auth_headers)
+        assert counters() == (2, 2)
+        
+        client.delete(f"/api/tasks/{task['id']}", headers=auth_headers)
+        assert counters() == (1, 1)
+    
+    def test_counters_follow_batch_writes(self, client, auth_headers):
+        """Test the bulk insert/update/delete paths adjust the counters"""
+        response = client.post('/api/tasks/batch', json={
+            'tasks': [{'title': 'A'}, {'title': 'B'}, {'title': 'C'}]
+        }, headers=auth_headers)
+        ids = [result['task']['id'] for result in response.json['results']]
+        
+        client.patch('/api/tasks/batch', json={
+            'tasks': [{'id': ids[0], 'completed': True}]
+        }, headers=auth_headers)
+        assert counters() == (3, 1)
+        
+        client.delete('/api/tasks/batch', json={'ids': ids[:2]}, headers=auth_headers)
+        assert counters() == (1, 0)
+    
+    def test_user_cascade_clears_counters(self, app, client, auth_headers, sample_task):
+        """Test deleting a user (cascading to their tasks) zeroes their counters"""
+        user = User.query.filter_by(username='testuser').one()
+        db.session.delete(user)
+        db.session.commit()
+        
+        stats = db.session.get(UserTaskStats, user.id, populate_existing=True)
+        assert (stats.total, stats.completed) == (0, 0)
+    
+    def test_rolled_back_writes_leave_counters(self, client, auth_headers, sample_task):
+        """Test the counters change in the writing transaction only"""
+        user_id = sample_task['user_id']
+        db.session.add(Task(title='Discarded', user_id=user_id))
+        db.session.flush()
+        db.session.rollback()
+        
+        assert counters() == (1, 0)
+    
+    def test_listing_total_without_count(self, client, auth_headers, sample_task, query_counter):
+        """Test listings take the total from the counters instead of COUNT(*)"""
+        client.post('/api/tasks', json={'title': 'Done', 'completed': True}, headers=auth_headers)
+        query_counter.clear()
+        
+        response = client.get('/api/tasks', headers=auth_headers)
+        completed = client.get('/api/tasks?completed=true', headers=auth_headers)
+        
+        assert response.json['pagination']['total'] == 2
+        assert completed.json['pagination']['total'] == 1
+        assert [task['title'] for task in completed.json['tasks']] == ['Done']
+        assert not any('count(' in statement.lower() for statement in query_counter)
+    
+    def test_search_listing_counts_matches(self, client, auth_headers, sample_task):
+        client.post('/api/tasks', json={'title': 'Other'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks?search=Other', headers=auth_headers)
+        
+        assert response.json['pagination']['total'] == 1
+    
+    def test_cursor_listing_total(self, client, auth_headers, sample_task):
+        response = client.get('/api/tasks?cursor=&include_total=true', headers=auth_headers)
+        
+        assert response.json['pagination']['total'] == 1
+    
+    def test_admin_listing_total(self, client, auth_headers, admin_headers, sample_task):
+        client.post('/api/tasks', json={'title': 'Admin task'}, headers=admin_headers)
+        
+        response = client.get('/api/tasks', headers=admin_headers)
+        
+        assert response.json['pagination']['total'] == 2
+
+class TestTaskStats:
+    """Test GET /api/tasks/stats"""
+    
+    def test_own_stats(self, client, auth_headers, sample_task):
+        client.post('/api/tasks', json={'title': 'Done', 'completed': True}, headers=auth_headers)
+        
+        response = client.get('/api/tasks/stats', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json['stats'] == {'total': 2, 'completed': 1, 'open': 1}
+    
+    def test_stats_without_tasks(self, client, auth_headers):
+        response = client.get('/api/tasks/stats', headers=auth_headers)
+        
+        assert response.json['stats'] == {'total': 0, 'completed': 0, 'open': 0}
+    
+    def test_admin_stats(self, client, auth_headers, admin_headers, sample_task):
+        client.post('/api/tasks', json={'title': 'Admin task', 'completed': True}, headers=admin_headers)
+        
+        everyone = client.get('/api/tasks/stats', headers=admin_headers)
+        one_user = client.get(f"/api/tasks/stats?user_id={sample_task['user_id']}", headers=admin_headers)
+        
+        assert everyone.json['stats'] == {'total': 2, 'completed': 1, 'open': 1}
+        assert one_user.json['stats'] == {'total': 1, 'completed': 0, 'open': 1}
+    
+    def test_user_id_ignored_for_users(self, client, auth_headers, admin_headers, sample_task):
+        client.post('/api/tasks', json={'title': 'Admin task'}, headers=admin_headers)
+        
+        response = client.get('/api/tasks/stats?user_id=999', headers=auth_headers)
+        
+        assert response.json['stats']['total'] == 1
+
+class TestCounterRepair:
+    """Test detection and repair of drifted counters"""
+    
+    def test_repair_rewrites_drifted_counters(self, client, auth_headers, sample_task):
+        user_id = sample_task['user_id']
+        db.session.execute(UserTaskStats.__table__.update().values(total=7, completed=3))
+        db.session.commit()
+        
+        with db.engine.begin() as conn:
+            assert find_counter_drift(conn) == [(user_id, (1, 0), (7, 3))]
+            repair_task_counters(conn)
+        
+        with db.engine.begin() as conn:
+            assert find_counter_drift(conn) == []
+        assert counters() == (1, 0)
+    
+    def test_repair_restores_missing_rows(self, client, auth_headers, sample_task):
+        db.session.execute(UserTaskStats.__table__.delete())
+        db.session.commit()
+        
+        with db.engine.begin() as conn:
+            assert len(repair_task_counters(conn)) == 1
+        assert counters() == (1, 0)
@@ -0,0 +1,162 @@
+from app import db
+from models.user import User
+from models.task import Task
+from models.user_task_stats import UserTaskStats
+from models.user_deletion import UserDeletion
+from models.job import Job
+from utils.deletion import request_user_deletion, delete_task_chunk
+from utils.jobs import get_job_queue
+
+def user_id_of(username='testuser'):
+    return User.query.filter_by(username=username).one().id
+
+class TestUserDeletion:
+    """Test admin deletion of users and their tasks"""
+    
+    def create_tasks(self, client, headers, count):
+        client.post('/api/tasks/batch', json={
+            'tasks': [{'title': f'Task {i}', 'description': 'Quarterly report'} for i in range(count)]
+        }, headers=headers)
+    
+    def test_delete_user(self, client, auth_headers, admin_headers, sample_task):
+        """Test a small account is deleted within the request"""
+        user_id = user_id_of()
+        
+        response = client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        
+        assert response.status_code == 200
+        deletion = response.json['deletion']
+        assert (deletion['status'], deletion['total'], deletion['deleted']) == ('completed', 1, 1)
+        assert deletion['username'] == 'testuser'
+        assert db.session.get(User, user_id, populate_existing=True) is None
+        assert client.get('/api/auth/profile', headers=auth_headers).status_code == 401
+    
+    def test_derived_data_follows(self, client, auth_headers, admin_headers, sample_task):
+        """Test counters, the search index and the change log see the deleted tasks"""
+        user_id = user_id_of()
+        token = client.get('/api/tasks/changes', headers=admin_headers).json['next_token']
+        
+        client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        
+        stats = db.session.get(UserTaskStats, user_id, populate_existing=True)
+        assert (stats.total, stats.completed) == (0, 0)
+        assert client.get('/api/tasks?search=test', headers=admin_headers).json['tasks'] == []
+        changes = client.get(f'/api/tasks/changes?since={token}', headers=admin_headers).json['changes']
+        assert [(change['op'], change['id']) for change in changes] == [('delete', sample_task['id'])]
+    
+    def test_tasks_deleted_without_loading(self, client, auth_headers, admin_headers, query_counter):
+        """Test tasks go in chunked DELETEs rather than one statement per loaded row"""
+        self.create_tasks(client, auth_headers, 5)
+        client.application.config['USER_DELETE_CHUNK_SIZE'] = 2
+        query_counter.clear()
+        
+        client.delete(f'/api/auth/users/{user_id_of()}', headers=admin_headers)
+        
+        statements = [statement.lstrip().upper() for statement in query_counter]
+        assert not [statement for statement in statements if 'TASKS.TITLE' in statement]
+        assert len([statement for statement in statements if statement.startswith('DELETE FROM TASKS')]) == 4
+    
+    def test_large_account_in_background(self, client, auth_headers, admin_headers):
+        """Test accounts over the inline limit are deleted by a job that reports progress"""
+        self.create_tasks(client, auth_headers, 5)
+        client.application.config.update(USER_DELETE_INLINE_MAX=2, USER_DELETE_CHUNK_SIZE=2)
+        user_id = user_id_of()
+        db.session.remove()
+        
+        response = client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        get_job_queue().run_pending()
+        
+        assert response.status_code == 202
+        assert response.json['deletion']['total'] == 5
+        progress = client.get(f"/api/auth/users/deletions/{response.json['deletion']['id']}", headers=admin_headers)
+        assert progress.status_code == 200
+        assert (progress.json['deletion']['status'], progress.json['deletion']['deleted']) == ('completed', 5)
+        assert db.session.query(Task).filter_by(user_id=user_id).count() == 0
+        job = client.get(f"/api/jobs/{response.json['job']['id']}", headers=admin_headers).json['job']
+        assert (job['status'], job['progress'], job['total']) == ('succeeded', 5, 5)
+    
+    def test_repeat_resumes_unfinished(self, client, auth_headers, admin_headers):
+        """Test repeating the request picks up an interrupted deletion"""
+        self.create_tasks(client, auth_headers, 3)
+        user_id = user_id_of()
+        deletion, _ = request_user_deletion(db.session, db.session.get(User, user_id))
+        deletion_id = deletion.id
+        delete_task_chunk(db.session, user_id, 2)
+        db.session.commit()
+        db.session.remove()
+        
+        response = client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        get_job_queue().run_pending()
+        
+        assert response.status_code == 202
+        assert response.json['deletion']['id'] == deletion_id
+        finished = db.session.get(UserDeletion, deletion_id, populate_existing=True)
+        assert finished.status == 'completed'
+        assert db.session.query(Task).count() == 0
+    
+    def test_repeat_reuses_job(self, client, auth_headers, admin_headers, monkeypatch):
+        """Test repeated requests share one job, which is rerun once it has given up"""
+        self.create_tasks(client, auth_headers, 3)
+        client.application.config['USER_DELETE_INLINE_MAX'] = 2
+        user_id = user_id_of()
+        
+        first = client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        second = client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        
+        assert second.json['job']['id'] == first.json['job']['id']
+        assert db.session.query(Job).count() == 1
+        
+        def broken_chunk(session, user_id, chunk_size):
+            raise RuntimeError('disk full')
+        
+        monkeypatch.setattr('utils.deletion.delete_task_chunk', broken_chunk)
+        job = db.session.get(Job, first.json['job']['id'])
+        job.max_attempts = 1
+        db.session.commit()
+        get_job_queue().run_pending()
+        monkeypatch.undo()
+        
+        retry = client.delete(f'/api/auth/users/{user_id}', headers=admin_headers)
+        get_job_queue().run_pending()
+        
+        assert retry.json['job']['id'] == job.id
+        assert retry.json['job']['status'] == 'queued'
+        assert db.session.get(Job, job.id, populate_existing=True).status == 'succeeded'
+        assert db.session.query(Task).count() == 0
+    
+    def test_failure_is_recorded(self, client, auth_headers, admin_headers, sample_task, monkeypatch):
+        def broken_chunk(session, user_id, chunk_size):
+            raise RuntimeError('disk full')
+        
+        monkeypatch.setattr('utils.deletion.delete_task_chunk', broken_chunk)
+        client.application.config['PROPAGATE_EXCEPTIONS'] = False
+        
+        response = client.delete(f'/api/auth/users/{user_id_of()}', headers=admin_headers)
+        
+        assert response.status_code == 500
+        deletion = db.session.query(UserDeletion).one()
+        assert (deletion.status, deletion.error) == ('failed', 'disk full')
+        assert db.session.query(Task).count() == 1
+        
+        monkeypatch.undo()
+        retry = client.delete(f'/api/auth/users/{deletion.user_id}', headers=admin_headers)
+        get_job_queue().run_pending()
+        
+        assert retry.json['deletion']['id'] == deletion.id
+        assert db.session.get(UserDeletion, deletion.id, populate_existing=True).status == 'completed'
+    
+    def test_requires_admin(self, client, auth_headers):
+        response = client.delete(f'/api/auth/users/{user_id_of()}', headers=auth_headers)
+        
+        assert response.status_code == 403
+    
+    def test_cannot_delete_self(self, client, admin_headers):
+        admin_id = user_id_of('admin')
+        
+        response = client.delete(f'/api/auth/users/{admin_id}', headers=admin_headers)
+        
+        assert response.status_code == 400
+    
+    def test_unknown_user_and_deletion(self, client, admin_headers):
+        assert client.delete('/api/auth/users/999', headers=admin_headers).status_code == 404
+        assert client.get('/api/auth/users/deletions/999', headers=admin_headers).status_code == 404
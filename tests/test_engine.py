@@ -0,0 +1,63 @@
+import asyncio
+from sqlalchemy import text
+from app import create_app, db
+from config import ProductionConfig
+from utils.async_db import async_db
+from utils.engine import engine_options
+
+class TestEngineProfile:
+    """Test the pool presets and SQLite pragmas"""
+    
+    def config(self, **values):
+        return dict({
+            'SQLALCHEMY_DATABASE_URI': 'postgresql://db/tasks',
+            'DB_ENGINE_TUNING': True
+        }, **values)
+    
+    def test_production_enables_tuning(self):
+        assert ProductionConfig.DB_ENGINE_TUNING is True
+    
+    def test_driver_preset(self):
+        options = engine_options(self.config())
+        assert options['pool_size'] == 10
+        assert options['pool_pre_ping'] is True
+        assert options['pool_recycle'] == 1800
+    
+    def test_overrides_and_explicit_options(self):
+        options = engine_options(self.config(
+            DB_POOL_SIZE=3,
+            SQLALCHEMY_ENGINE_OPTIONS={'max_overflow': 0}
+        ))
+        assert options['pool_size'] == 3
+        assert options['max_overflow'] == 0
+    
+    def test_disabled_or_in_memory_keeps_defaults(self):
+        assert engine_options(self.config(DB_ENGINE_TUNING=False)) == {}
+        assert engine_options(self.config(SQLALCHEMY_DATABASE_URI='sqlite:///:memory:')) == {}
+    
+    def test_sqlite_pragmas_applied(self, tmp_path):
+        """Test new connections of the sync and async engines get WAL and busy_timeout"""
+        app = create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'tuned.db'}",
+            'DB_ENGINE_TUNING': True,
+            'ASYNC_MODE': True
+        })
+        
+        async def async_pragmas(engine):
+            try:
+                async with engine.connect() as connection:
+                    return [
+                        (await connection.execute(text('PRAGMA journal_mode'))).scalar(),
+                        (await connection.execute(text('PRAGMA busy_timeout'))).scalar()
+                    ]
+            finally:
+                await engine.dispose()
+        
+        with app.app_context():
+            assert db.engine.pool.size() == 5
+            with db.engine.connect() as connection:
+                assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+                assert connection.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+            db.engine.dispose()
+            
+            assert asyncio.run(async_pragmas(async_db.engine)) == ['wal', 5000]
@@ -0,0 +1,329 @@
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from werkzeug.serving import BaseWSGIServer
+from app import create_app, db
+from config import WORKER_THREADS
+from models.task import Task
+from models.task_change import TaskChange
+from models.user import User
+from utils.changes import compact_change_log
+from utils.events import EventBackend, get_event_hub
+
+def parse(chunk):
+    """Fields of one SSE message, or {'comment': ...} for heartbeats"""
+    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+    if text.startswith(':'):
+        return {'comment': text[1:].strip()}
+    fields = {}
+    for line in text.strip().splitlines():
+        name, _, value = line.partition(': ')
+        fields[name] = value
+    return fields
+
+class PooledServer(BaseWSGIServer):
+    """Serves requests on a fixed pool of threads, like a gunicorn gthread worker"""
+    
+    def __init__(self, app, threads):
+        super().__init__('127.0.0.1', 0, app)
+        self.pool = ThreadPoolExecutor(threads)
+    
+    def process_request(self, request, client_address):
+        self.pool.submit(self.handle_on_pool, request, client_address)
+    
+    def handle_on_pool(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+class TestTaskStream:
+    """Test the server-sent events stream at /api/tasks/stream"""
+    
+    @pytest.fixture
+    def app(self, tmp_path):
+        """A file database, so the hub reads on connections of its own"""
+        app = create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'events.db'}",
+            'EVENTS_HEARTBEAT_INTERVAL': 0.05,
+            'EVENTS_STREAM_TIMEOUT': 5,
+            'EVENTS_QUEUE_SIZE': 3
+        })
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.engine.dispose()
+    
+    @pytest.fixture
+    def open_stream(self, client):
+        responses = []
+        
+        def open_stream(headers, **kwargs):
+            response = client.get('/api/tasks/stream', headers=headers, buffered=False, **kwargs)
+            assert response.status_code == 200
+            assert response.mimetype == 'text/event-stream'
+            responses.append(response)
+            chunks = iter(response.response)
+            assert parse(next(chunks)) == {'retry': '3000'}
+            return chunks
+        
+        yield open_stream
+        for response in reversed(responses):  # Streams hold request contexts; unwind in order
+            response.close()
+    
+    def next_event(self, chunks):
+        """Skip heartbeats up to the next event"""
+        while True:
+            message = parse(next(chunks))
+            if 'comment' not in message:
+                return message
+    
+    def test_pushes_task_changes(self, client, auth_headers, open_stream):
+        """Test creates, updates and deletes arrive as upsert/delete events"""
+        chunks = open_stream(auth_headers)
+        task = client.post('/api/tasks', json={'title': 'Live'}, headers=auth_headers).json['task']
+        
+        created = self.next_event(chunks)
+        assert created['event'] == 'upsert'
+        assert client.application.json.loads(created['data'])['task'] == task
+        
+        client.put(f"/api/tasks/{task['id']}", json={'completed': True}, headers=auth_headers)
+        updated = self.next_event(chunks)
+        assert client.application.json.loads(updated['data'])['task']['completed'] is True
+        assert int(updated['id']) > int(created['id'])
+        
+        client.delete(f"/api/tasks/{task['id']}", headers=auth_headers)
+        deleted = self.next_event(chunks)
+        assert deleted['event'] == 'delete'
+        assert client.application.json.loads(deleted['data']) == {
+            'seq': int(deleted['id']), 'op': 'delete', 'id': task['id']
+        }
+    
+    def test_heartbeat_while_idle(self, auth_headers, open_stream):
+        """Test comments keep an idle stream alive"""
+        chunks = open_stream(auth_headers)
+        
+        assert parse(next(chunks)) == {'comment': 'keep-alive'}
+    
+    def test_scoped_to_owner(self, client, auth_headers, admin_headers, open_stream):
+        """Test users only hear their own tasks while admins hear everyone's"""
+        user_chunks = open_stream(auth_headers)
+        admin_chunks = open_stream(admin_headers)
+        client.post('/api/tasks', json={'title': 'Admin'}, headers=admin_headers)
+        client.post('/api/tasks', json={'title': 'User'}, headers=auth_headers)
+        
+        user_event = client.application.json.loads(self.next_event(user_chunks)['data'])
+        admin_titles = [
+            client.application.json.loads(self.next_event(admin_chunks)['data'])['task']['title']
+            for _ in range(2)
+        ]
+        
+        assert user_event['task']['title'] == 'User'
+        assert admin_titles == ['Admin', 'User']
+    
+    def test_resumes_from_last_event_id(self, client, auth_headers, open_stream):
+        """Test a reconnect replays what was missed, then continues live"""
+        first = client.post('/api/tasks', json={'title': 'Seen'}, headers=auth_headers).json['task']
+        last_id = db.session.scalar(db.select(TaskChange.seq).filter_by(task_id=first['id']))
+        client.post('/api/tasks', json={'title': 'Missed'}, headers=auth_headers)
+        
+        chunks = open_stream({**auth_headers, 'Last-Event-ID': str(last_id)})
+        missed = self.next_event(chunks)
+        client.post('/api/tasks', json={'title': 'Live'}, headers=auth_headers)
+        live = self.next_event(chunks)
+        
+        assert client.application.json.loads(missed['data'])['task']['title'] == 'Missed'
+        assert client.application.json.loads(live['data'])['task']['title'] == 'Live'
+    
+    def test_reset_after_compaction(self, client, auth_headers, sample_task, open_stream):
+        """Test a Last-Event-ID older than the compacted range asks for a resync"""
+        other = client.post('/api/tasks', json={'title': 'Other'}, headers=auth_headers).json['task']
+        client.delete(f"/api/tasks/{other['id']}", headers=auth_headers)
+        db.session.execute(
+            update(TaskChange).where(TaskChange.op == 'delete')
+            .values(changed_at=datetime.utcnow() - timedelta(days=60))
+        )
+        db.session.commit()
+        with db.engine.begin() as conn:
+            compact_change_log(conn, timedelta(days=30))
+        
+        chunks = open_stream(auth_headers, query_string={'last_event_id': 1})
+        
+        assert self.next_event(chunks) == {'event': 'reset', 'data': '{}'}
+    
+    def test_overflow_catches_up_from_log(self, client, auth_headers, open_stream):
+        """Test a stream whose queue fills still delivers every change, in order"""
+        chunks = open_stream(auth_headers)
+        client.post('/api/tasks/batch', json={
+            'tasks': [{'title': f'Task {i}'} for i in range(6)]
+        }, headers=auth_headers)
+        
+        titles = [client.application.json.loads(self.next_event(chunks)['data'])['task']['title']
+                  for _ in range(6)]
+        
+        assert titles == [f'Task {i}' for i in range(6)]
+        assert get_event_hub().stats()['dropped'] == 3
+    
+    def test_stream_limit(self, client, auth_headers, admin_headers, open_stream):
+        """Test streams past EVENTS_MAX_STREAMS are refused until one closes"""
+        get_event_hub().max_streams = 1
+        open_stream(auth_headers)
+        
+        response = client.get('/api/tasks/stream', headers=admin_headers)
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '3'
+        assert get_event_hub().stats()['subscribers'] == 1
+    
+    def test_streams_leave_a_thread_free(self, app, auth_headers):
+        """Test the default cap keeps one of a worker's threads for other requests"""
+        server = PooledServer(app, WORKER_THREADS)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        connections = []
+        
+        def get(path):
+            conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+            connections.append(conn)
+            conn.request('GET', path, headers=auth_headers)
+            response = conn.getresponse()
+            connections.append(response)  # Holds the socket open too
+            return response
+        
+        try:
+            streams = [get('/api/tasks/stream') for _ in range(WORKER_THREADS - 1)]
+            for stream in streams:
+                assert stream.fp.readline().startswith(b'retry:')
+            refused = get('/api/tasks/stream')
+            listing = get('/api/tasks')
+            
+            assert refused.status == 503
+            assert listing.status == 200
+        finally:
+            for connection in connections:
+                connection.close()
+            server.shutdown()
+            server.server_close()
+            server.pool.shutdown()
+    
+    def test_invalid_last_event_id(self, client, auth_headers):
+        response = client.get('/api/tasks/stream', headers={**auth_headers, 'Last-Event-ID': 'abc'})
+        assert response.status_code == 400
+    
+    def test_requires_auth(self, client):
+        assert client.get('/api/tasks/stream').status_code == 401
+
+class TestEventHub:
+    """Test commits notify the hub on every write path"""
+    
+    @pytest.fixture(params=['sync', 'async'])
+    def app(self, request, tmp_path):
+        """File databases, so the delivery thread reads on connections of its own"""
+        app = create_app('testing', {
+            'ASYNC_MODE': request.param == 'async',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'events.db'}"
+        })
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.engine.dispose()
+    
+    @pytest.fixture
+    def subscription(self, app):
+        hub = get_event_hub()
+        subscription = hub.subscribe(None)
+        yield subscription
+        hub.unsubscribe(subscription)
+    
+    def drain(self, subscription):
+        get_event_hub().flush()
+        entries = []
+        while (entry := subscription.get(0)) is not None:
+            entries.append(entry)
+        return entries
+    
+    def test_view_writes_notify(self, client, auth_headers, subscription):
+        """Test single writes through the sync and async views reach subscribers"""
+        task = client.post('/api/tasks', json={'title': 'One'}, headers=auth_headers).json['task']
+        client.put(f"/api/tasks/{task['id']}", json={'title': 'Two'}, headers=auth_headers)
+        client.delete(f"/api/tasks/{task['id']}", headers=auth_headers)
+        
+        entries = self.drain(subscription)
+        
+        assert [entry['op'] for entry in entries] == ['upsert', 'upsert', 'delete']
+        assert entries[1]['task']['title'] == 'Two'
+    
+    def test_bulk_writes_notify(self, client, auth_headers, subscription):
+        """Test bulk statements reach subscribers"""
+        response = client.post('/api/tasks/batch', json={
+            'tasks': [{'title': 'A'}, {'title': 'B'}]
+        }, headers=auth_headers)
+        ids = [result['task']['id'] for result in response.json['results']]
+        client.delete('/api/tasks/batch', json={'ids': ids}, headers=auth_headers)
+        
+        entries = self.drain(subscription)
+        
+        assert [entry['op'] for entry in entries] == ['upsert', 'upsert', 'delete', 'delete']
+    
+    def test_user_cascade_notifies(self, client, auth_headers, sample_task, subscription):
+        """Test deleting a user publishes deletes of their tasks"""
+        self.drain(subscription)
+        db.session.delete(User.query.filter_by(username='testuser').one())
+        db.session.commit()
+        
+        entries = self.drain(subscription)
+        assert [(entry['op'], entry['id']) for entry in entries] == [('delete', sample_task['id'])]
+    
+    def test_rollback_does_not_notify(self, client, auth_headers, sample_task, subscription):
+        """Test uncommitted writes publish nothing"""
+        self.drain(subscription)
+        db.session.add(Task(title='Discarded', user_id=sample_task['user_id']))
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        
+        assert self.drain(subscription) == []
+    
+    def test_commit_does_not_wait_for_delivery(self, client, auth_headers, subscription, monkeypatch):
+        """Test a write returns while the delivery thread is still busy"""
+        hub = get_event_hub()
+        release = threading.Event()
+        read_new = hub._read_new
+        
+        def blocked_read():
+            release.wait(5)
+            read_new()
+        
+        monkeypatch.setattr(hub, '_read_new', blocked_read)
+        response = client.post('/api/tasks', json={'title': 'Queued'}, headers=auth_headers)
+        
+        assert response.status_code == 201
+        assert subscription.get(0) is None
+        release.set()
+        assert [entry['task']['title'] for entry in self.drain(subscription)] == ['Queued']
+    
+    def test_pluggable_backend(self):
+        """Test EVENTS_BACKEND accepts an import path"""
+        app = create_app('testing', {'EVENTS_BACKEND': f'{__name__}.RecordingBackend'})
+        
+        hub = app.extensions['event_hub']
+        hub.publish()
+        
+        assert hub.backend.messages == [{'type': 'tasks'}]
+        assert hub.stats()['backend'] == 'recording'
+
+class RecordingBackend(EventBackend):
+    name = 'recording'
+    
+    def __init__(self):
+        self.messages = []
+    
+    def start(self, deliver):
+        self.deliver = deliver
+    
+    def publish(self, message):
+        self.messages.append(message)
@@ -0,0 +1,182 @@
+import re
+from datetime import datetime
+import pytest
+from sqlalchemy import event, update
+from app import db
+from models.task import Task
+from utils.async_db import async_db
+
+def set_timestamps(task_id, **values):
+    db.session.execute(update(Task).where(Task.id == task_id).values(**values))
+    db.session.commit()
+
+@pytest.fixture
+def tasks(client, auth_headers):
+    """Three tasks with distinct created_at/updated_at; the middle one completed"""
+    created = []
+    for day, (title, completed) in enumerate((('Old', False), ('Middle', True), ('New', False)), start=1):
+        task = client.post('/api/tasks', json={'title': title, 'completed': completed}, headers=auth_headers).json['task']
+        set_timestamps(
+            task['id'],
+            created_at=datetime(2024, 1, day),
+            updated_at=datetime(2024, 3, 4 - day)  # Updated in the reverse order
+        )
+        created.append(task)
+    return created
+
+def titles(response):
+    return [task['title'] for task in response.json['tasks']]
+
+class TestCompletedFilter:
+    """Test strict tri-state parsing of ?completed="""
+    
+    @pytest.mark.parametrize('value', ['false', 'False', '0'])
+    def test_false_lists_open_tasks(self, client, auth_headers, tasks, value):
+        response = client.get(f'/api/tasks?completed={value}', headers=auth_headers)
+        
+        assert titles(response) == ['New', 'Old']
+        assert response.json['pagination']['total'] == 2
+    
+    @pytest.mark.parametrize('value', ['true', 'True', '1'])
+    def test_true_lists_completed_tasks(self, client, auth_headers, tasks, value):
+        response = client.get(f'/api/tasks?completed={value}', headers=auth_headers)
+        
+        assert titles(response) == ['Middle']
+    
+    def test_empty_value_means_unfiltered(self, client, auth_headers, tasks):
+        response = client.get('/api/tasks?completed=', headers=auth_headers)
+        
+        assert response.json['pagination']['total'] == 3
+    
+    def test_invalid_value_rejected(self, client, auth_headers, tasks):
+        response = client.get('/api/tasks?completed=maybe', headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert 'completed' in response.json['details']
+    
+    def test_export_filter(self, client, auth_headers, tasks):
+        response = client.get('/api/tasks/export?format=csv&completed=false', headers=auth_headers)
+        
+        assert 'Middle' not in response.get_data(as_text=True)
+        assert 'Old' in response.get_data(as_text=True)
+
+class TestListingFilters:
+    """Test date ranges, the owner filter and sort options"""
+    
+    def test_created_range(self, client, auth_headers, tasks):
+        response = client.get(
+            '/api/tasks?created_after=2024-01-02T00:00:00&created_before=2024-01-03T00:00:00',
+            headers=auth_headers
+        )
+        
+        assert titles(response) == ['Middle']
+        assert response.json['pagination']['total'] == 1
+    
+    def test_updated_range_with_timezone(self, client, auth_headers, tasks):
+        response = client.get('/api/tasks?updated_after=2024-03-02T01:00:00%2B01:00', headers=auth_headers)
+        
+        assert titles(response) == ['Middle', 'Old']
+    
+    def test_invalid_date_rejected(self, client, auth_headers):
+        response = client.get('/api/tasks?created_after=yesterday', headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert 'created_after' in response.json['details']
+    
+    def test_sort_by_updated_at(self, client, auth_headers, tasks):
+        descending = client.get('/api/tasks?sort=updated_at', headers=auth_headers)
+        ascending = client.get('/api/tasks?sort=updated_at&order=asc', headers=auth_headers)
+        
+        assert titles(descending) == ['Old', 'Middle', 'New']
+        assert titles(ascending) == ['New', 'Middle', 'Old']
+    
+    def test_ascending_creation_order(self, client, auth_headers, tasks):
+        response = client.get('/api/tasks?order=asc', headers=auth_headers)
+        
+        assert titles(response) == ['Old', 'Middle', 'New']
+    
+    def test_invalid_sort_rejected(self, client, auth_headers):
+        response = client.get('/api/tasks?sort=title&order=sideways', headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert set(response.json['details']) == {'sort', 'order'}
+    
+    def test_cursor_pages_follow_sort(self, client, auth_headers, tasks):
+        """Test keyset pagination over updated_at ascending, forwards and back"""
+        url = '/api/tasks?sort=updated_at&order=asc&per_page=2&cursor='
+        first = client.get(url, headers=auth_headers)
+        second = client.get(url + first.json['pagination']['next_cursor'], headers=auth_headers)
+        back = client.get(url + second.json['pagination']['prev_cursor'], headers=auth_headers)
+        
+        assert titles(first) == ['New', 'Middle']
+        assert titles(second) == ['Old']
+        assert titles(back) == ['New', 'Middle']
+    
+    def test_owner_filter_for_admins(self, client, auth_headers, admin_headers, tasks):
+        client.post('/api/tasks', json={'title': 'Admin task'}, headers=admin_headers)
+        
+        everyone = client.get('/api/tasks', headers=admin_headers)
+        owned = client.get(f"/api/tasks?user_id={tasks[0]['user_id']}&completed=false", headers=admin_headers)
+        
+        assert everyone.json['pagination']['total'] == 4
+        assert titles(owned) == ['New', 'Old']
+        assert owned.json['pagination']['total'] == 2
+    
+    def test_owner_filter_ignored_for_users(self, client, auth_headers, admin_headers, tasks):
+        client.post('/api/tasks', json={'title': 'Admin task'}, headers=admin_headers)
+        
+        response = client.get('/api/tasks?user_id=999', headers=auth_headers)
+        
+        assert response.json['pagination']['total'] == 3
+
+LISTINGS = [
+    '',
+    'completed=false',
+    'sort=updated_at',
+    'sort=updated_at&order=asc',
+    'completed=true&sort=updated_at',
+    'created_after=2024-01-01T00:00:00',
+    'created_after=2024-01-01T00:00:00&completed=false',
+    'updated_after=2024-01-01T00:00:00&sort=updated_at',
+    'cursor=&sort=updated_at',
+    'user_id=1&completed=true&sort=updated_at',
+]
+
+class TestListingQueryPlans:
+    """Test every filter and sort is served by an index, in index order"""
+    
+    @pytest.fixture
+    def listing_statements(self, app):
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'FROM tasks' in statement and 'LIMIT' in statement and not statement.startswith('EXPLAIN'):
+                statements.append((statement, parameters))
+        
+        engines = [db.engine]
+        if app.config['ASYNC_MODE']:
+            engines.append(async_db.engine.sync_engine)
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', record)
+        yield statements
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+    
+    def query_plan(self, statement, parameters):
+        rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return [row[3] for row in rows]
+    
+    @pytest.mark.parametrize('args', LISTINGS)
+    @pytest.mark.parametrize('role', ['user', 'admin'])
+    def test_no_full_scan_or_sort(self, client, auth_headers, admin_headers, tasks,
+                                  listing_statements, role, args):
+        headers = admin_headers if role == 'admin' else auth_headers
+        response = client.get(f'/api/tasks?{args}', headers=headers)
+        assert response.status_code == 200
+        
+        plans = [self.query_plan(*statement) for statement in list(listing_statements)]
+        assert plans
+        for plan in plans:
+            assert any('USING INDEX' in step for step in plan), plan
+            assert not any(re.fullmatch(r'SCAN tasks', step) for step in plan), plan
+            assert not any('TEMP B-TREE' in step for step in plan), plan
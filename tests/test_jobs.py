@@ -0,0 +1,264 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app import db
+from models.job import Job
+from models.task import Task
+from utils.jobs import JOB_HANDLERS, JobQueue, enqueue, get_job_queue, job_handler
+
+@pytest.fixture
+def failing_job():
+    """Register a 'flaky' job type that fails until its third attempt"""
+    @job_handler('flaky')
+    def flaky(context):
+        if context.job.attempts < 3:
+            raise RuntimeError(f'attempt {context.job.attempts} failed')
+        return {'attempts': context.job.attempts}
+    
+    yield flaky
+    del JOB_HANDLERS['flaky']
+
+def run_jobs():
+    return get_job_queue().run_pending()
+
+class TestTaskJobs:
+    """Test the task import, complete and export jobs"""
+    
+    def poll(self, client, headers, response):
+        return client.get(response.headers['Location'], headers=headers).json['job']
+    
+    def test_import_tasks(self, client, auth_headers):
+        """Test an import creates the valid tasks and reports the invalid ones"""
+        client.application.config['TASK_JOB_CHUNK_SIZE'] = 2
+        tasks = [{'title': f'Task {i}'} for i in range(4)] + [{'title': ''}]
+        
+        response = client.post('/api/tasks/import', json={'tasks': tasks}, headers=auth_headers)
+        
+        assert response.status_code == 202
+        assert response.json['job']['status'] == 'queued'
+        assert run_jobs() == 1
+        job = self.poll(client, auth_headers, response)
+        assert (job['status'], job['progress'], job['total']) == ('succeeded', 5, 5)
+        assert (job['result']['created'], job['result']['failed']) == (4, 1)
+        assert job['result']['errors'][0]['index'] == 4
+        listing = client.get('/api/tasks', headers=auth_headers).json
+        assert listing['pagination']['total'] == 4
+    
+    def test_import_validates_batch(self, client, auth_headers):
+        client.application.config['TASK_IMPORT_MAX'] = 2
+        
+        response = client.post('/api/tasks/import', json={'tasks': [{'title': 'Task'}] * 3}, headers=auth_headers)
+        
+        assert response.status_code == 413
+        assert db.session.query(Job).count() == 0
+    
+    def test_complete_tasks(self, client, auth_headers):
+        """Test every open task of the caller is completed, in chunks"""
+        client.application.config['TASK_JOB_CHUNK_SIZE'] = 2
+        client.post('/api/tasks/batch', json={'tasks': [{'title': f'Task {i}'} for i in range(5)]}, headers=auth_headers)
+        
+        response = client.post('/api/tasks/complete', json={}, headers=auth_headers)
+        run_jobs()
+        
+        job = self.poll(client, auth_headers, response)
+        assert (job['status'], job['result']) == ('succeeded', {'updated': 5})
+        assert db.session.query(Task).filter_by(completed=False).count() == 0
+        listing = client.get('/api/tasks?completed=false', headers=auth_headers).json
+        assert listing['tasks'] == []
+    
+    def test_complete_rejects_bad_body(self, client, auth_headers):
+        response = client.post('/api/tasks/complete', json={'completed': 'maybe'}, headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_export_ndjson(self, client, auth_headers, sample_task, tmp_path):
+        """Test an export writes a file served once the job has run"""
+        client.application.config['JOBS_EXPORT_DIR'] = str(tmp_path)
+        
+        response = client.post('/api/tasks/export', json={}, headers=auth_headers)
+        download = f"/api/jobs/{response.json['job']['id']}/download"
+        
+        assert client.get(download, headers=auth_headers).status_code == 409
+        run_jobs()
+        job = self.poll(client, auth_headers, response)
+        assert job['result']['rows'] == 1
+        exported = client.get(download, headers=auth_headers)
+        assert exported.status_code == 200
+        rows = [json.loads(line) for line in exported.data.decode().splitlines()]
+        assert [row['id'] for row in rows] == [sample_task['id']]
+        assert not list(tmp_path.glob('*.part'))
+    
+    def test_export_csv_filtered(self, client, auth_headers, tmp_path):
+        client.application.config.update(JOBS_EXPORT_DIR=str(tmp_path), TASK_JOB_CHUNK_SIZE=2)
+        client.post('/api/tasks/batch', json={'tasks': [
+            {'title': f'Task {i}', 'completed': i % 2 == 0} for i in range(5)
+        ]}, headers=auth_headers)
+        
+        response = client.post('/api/tasks/export', json={'format': 'csv', 'completed': True}, headers=auth_headers)
+        run_jobs()
+        
+        exported = client.get(f"/api/jobs/{response.json['job']['id']}/download", headers=auth_headers)
+        rows = list(csv.DictReader(io.StringIO(exported.data.decode())))
+        assert [row['title'] for row in rows] == ['Task 0', 'Task 2', 'Task 4']
+        assert exported.mimetype == 'text/csv'
+    
+    def test_expired_export_deleted(self, client, auth_headers, sample_task, tmp_path):
+        """Test jobs past JOBS_RETENTION_DAYS are deleted along with their files"""
+        exports = tmp_path / 'exports'
+        client.application.config['JOBS_EXPORT_DIR'] = str(exports)
+        old = client.post('/api/tasks/export', json={}, headers=auth_headers).json['job']
+        recent = client.post('/api/tasks/export', json={'format': 'csv'}, headers=auth_headers).json['job']
+        run_jobs()
+        db.session.execute(update(Job).where(Job.id == old['id']).values(
+            finished_at=datetime.utcnow() - timedelta(days=8)))
+        db.session.commit()
+        
+        assert get_job_queue().expire(db.session) == 1
+        
+        assert client.get(f"/api/jobs/{old['id']}", headers=auth_headers).status_code == 404
+        assert client.get(f"/api/jobs/{recent['id']}/download", headers=auth_headers).status_code == 200
+        assert [path.name for path in exports.iterdir()] == [f"job-{recent['id']}.csv"]
+    
+    def test_export_rejects_unknown_format(self, client, auth_headers):
+        response = client.post('/api/tasks/export', json={'format': 'xml'}, headers=auth_headers)
+        
+        assert response.status_code == 400
+
+class TestJobRequests:
+    """Test idempotency keys and job access"""
+    
+    def test_idempotency_key_replays(self, client, auth_headers):
+        """Test a retried request returns the job it queued the first time"""
+        headers = dict(auth_headers, **{'Idempotency-Key': 'import-1'})
+        body = {'tasks': [{'title': 'Task'}]}
+        
+        first = client.post('/api/tasks/import', json=body, headers=headers)
+        run_jobs()
+        second = client.post('/api/tasks/import', json=body, headers=headers)
+        
+        assert second.status_code == 202
+        assert second.json['job']['id'] == first.json['job']['id']
+        assert second.json['job']['status'] == 'succeeded'
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        assert 'Idempotent-Replayed' not in first.headers
+        assert db.session.query(Task).count() == 1
+    
+    def test_idempotency_key_conflict(self, client, auth_headers):
+        headers = dict(auth_headers, **{'Idempotency-Key': 'import-1'})
+        client.post('/api/tasks/import', json={'tasks': [{'title': 'Task'}]}, headers=headers)
+        
+        response = client.post('/api/tasks/import', json={'tasks': [{'title': 'Other'}]}, headers=headers)
+        
+        assert response.status_code == 422
+        assert db.session.query(Job).count() == 1
+    
+    def test_idempotency_key_length(self, client, auth_headers):
+        headers = dict(auth_headers, **{'Idempotency-Key': 'k' * 256})
+        
+        response = client.post('/api/tasks/complete', json={}, headers=headers)
+        
+        assert response.status_code == 400
+    
+    def test_job_access(self, client, auth_headers, admin_headers):
+        """Test jobs are visible to their owner and admins only"""
+        response = client.post('/api/tasks/complete', json={}, headers=admin_headers)
+        location = response.headers['Location']
+        
+        assert client.get(location, headers=auth_headers).status_code == 403
+        assert client.get(location, headers=admin_headers).status_code == 200
+        assert client.get('/api/jobs/999', headers=auth_headers).status_code == 404
+        assert client.get(f'{location}/download', headers=admin_headers).status_code == 404
+
+class TestJobQueue:
+    """Test claiming, retries and leases"""
+    
+    def test_retries_with_backoff(self, app, failing_job):
+        """Test a failed attempt is retried after the backoff, until it succeeds"""
+        job, _ = enqueue(db.session, 'flaky', {})
+        queue = get_job_queue()
+        
+        assert queue.run_pending() == 1
+        db.session.refresh(job)
+        assert (job.status, job.attempts, job.error) == ('queued', 1, 'attempt 1 failed')
+        assert job.run_after > datetime.utcnow() + timedelta(seconds=4)
+        assert queue.run_pending() == 0
+        
+        queue.retry_backoff = 0
+        job.run_after = datetime.utcnow()
+        db.session.commit()
+        queue.run_pending()
+        db.session.refresh(job)
+        assert (job.status, job.attempts, job.result) == ('succeeded', 3, {'attempts': 3})
+    
+    def test_fails_after_max_attempts(self, app, failing_job):
+        job, _ = enqueue(db.session, 'flaky', {}, max_attempts=2)
+        get_job_queue().retry_backoff = 0
+        
+        get_job_queue().run_pending()
+        
+        db.session.refresh(job)
+        assert (job.status, job.attempts, job.error) == ('failed', 2, 'attempt 2 failed')
+        assert job.finished_at is not None
+    
+    def test_unknown_type_fails(self, app):
+        job, _ = enqueue(db.session, 'no-such-job', {})
+        
+        get_job_queue().run_pending()
+        
+        db.session.refresh(job)
+        assert (job.status, job.attempts) == ('failed', 1)
+        assert 'no-such-job' in job.error
+    
+    def test_expired_lease_is_retried(self, app, failing_job):
+        """Test a job whose worker went silent is claimed again"""
+        job, _ = enqueue(db.session, 'flaky', {})
+        job.status, job.attempts, job.locked_by = 'running', 2, 'gone:1:0'
+        job.locked_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        
+        get_job_queue().run_pending()
+        
+        db.session.refresh(job)
+        assert (job.status, job.attempts, job.locked_by) == ('succeeded', 3, None)
+    
+    def test_lost_lease_stops_handler(self, app):
+        """Test progress from a worker whose job was taken over is refused"""
+        @job_handler('hijacked')
+        def hijacked(context):
+            db.session.execute(update(Job).values(locked_by='other'))
+            db.session.commit()
+            context.progress(1, 2)
+            return {'done': True}
+        
+        try:
+            job, _ = enqueue(db.session, 'hijacked', {})
+            get_job_queue().run_pending()
+        finally:
+            del JOB_HANDLERS['hijacked']
+        
+        db.session.refresh(job)
+        assert (job.status, job.locked_by, job.result) == ('running', 'other', None)
+    
+    def test_worker_threads(self, app, client, auth_headers):
+        """Test the worker threads run jobs queued through the API"""
+        if app.config['ASYNC_MODE']:
+            pytest.skip('Worker threads share the sync engine')
+        queue = JobQueue(app, workers=1, poll_interval=0.05)
+        app.extensions['job_queue'] = queue
+        queue.start()
+        try:
+            response = client.post('/api/tasks/complete', json={}, headers=auth_headers)
+            job_id = response.json['job']['id']
+            for _ in range(100):
+                job = client.get(f'/api/jobs/{job_id}', headers=auth_headers).json['job']
+                if job['status'] == 'succeeded':
+                    break
+                queue._wakeup.wait(0.05)
+        finally:
+            queue.stop(timeout=5)
+        
+        assert job['status'] == 'succeeded'
+        assert not queue.running
@@ -0,0 +1,90 @@
+import logging
+from utils.metrics import Histogram, RequestMetrics, check_query_patterns, get_metrics
+
+class TestMetrics:
+    """Test per-request instrumentation and the /metrics endpoint"""
+    
+    def test_counts_queries_per_endpoint(self, app, client, auth_headers, sample_task):
+        """Test the statements of a request are attributed to its endpoint"""
+        client.get(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        client.get(f"/api/tasks/{sample_task['id']}", headers=auth_headers)
+        
+        metrics = get_metrics()
+        assert metrics.queries.count('tasks.get_task') == 2
+        assert metrics.queries.sum('tasks.get_task') >= 2
+        assert metrics.requests.get('tasks.get_task', 'GET', '200') == 2
+    
+    def test_records_phases(self, client, auth_headers):
+        """Test JWT decode, validation, SQL and serialization are each timed"""
+        client.post('/api/tasks', json={'title': 'Timed'}, headers=auth_headers)
+        
+        phases = get_metrics().phases
+        for phase in ('jwt', 'validation', 'db', 'serialization'):
+            assert phases.count('tasks.create_task', phase) == 1
+            assert phases.sum('tasks.create_task', phase) > 0
+    
+    def test_prometheus_endpoint(self, client, auth_headers):
+        """Test /metrics serves the registry in the Prometheus text format"""
+        client.get('/api/tasks', headers=auth_headers)
+        response = client.get('/metrics')
+        body = response.get_data(as_text=True)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert '# TYPE http_requests_total counter' in body
+        assert 'http_requests_total{endpoint="tasks.get_tasks",method="GET",status="200"} 1' in body
+        assert 'http_request_duration_seconds_bucket{endpoint="tasks.get_tasks",method="GET",le="+Inf"} 1' in body
+        assert 'http_request_phase_seconds_count{endpoint="tasks.get_tasks",phase="jwt"} 1' in body
+    
+    def test_access_token(self, app, client):
+        """Test METRICS_ACCESS_TOKEN protects the endpoint"""
+        app.config['METRICS_ACCESS_TOKEN'] = 'scrape-secret'
+        
+        assert client.get('/metrics').status_code == 401
+        response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+        assert response.status_code == 200
+    
+    def test_unmatched_routes_share_a_label(self, client):
+        """Test 404s do not create one series per path"""
+        client.get('/api/nope/1')
+        client.get('/api/nope/2')
+        
+        assert get_metrics().requests.get('unmatched', 'GET', '404') == 2
+
+class TestQueryGuard:
+    """Test the development guard for N+1 patterns and slow queries"""
+    
+    def test_slow_queries_logged(self, app, client, auth_headers, caplog):
+        app.config.update(QUERY_GUARD_ENABLED=True, SLOW_QUERY_THRESHOLD=0)
+        
+        with caplog.at_level(logging.WARNING):
+            client.get('/api/tasks', headers=auth_headers)
+        
+        assert 'Slow query' in caplog.text
+        assert get_metrics().slow_queries.get('tasks.get_tasks') >= 1
+    
+    def test_repeated_statements_flagged(self, app, caplog):
+        request_metrics = RequestMetrics(slow_threshold=1, track_statements=True)
+        for _ in range(5):
+            request_metrics.record_query('SELECT * FROM users WHERE users.id = ?', 0.001)
+        
+        with caplog.at_level(logging.WARNING):
+            check_query_patterns('tasks.get_tasks', request_metrics)
+        
+        assert 'Possible N+1 in tasks.get_tasks: statement ran 5 times' in caplog.text
+    
+    def test_guard_off_by_default_in_testing(self, app):
+        assert app.config['QUERY_GUARD_ENABLED'] is False
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('latency', 'Latency', ('endpoint',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, 'x')
+        
+        lines = histogram.render()
+        
+        assert 'latency_bucket{endpoint="x",le="0.1"} 1' in lines
+        assert 'latency_bucket{endpoint="x",le="1.0"} 2' in lines
+        assert 'latency_bucket{endpoint="x",le="+Inf"} 3' in lines
+        assert 'latency_count{endpoint="x"} 3' in lines
@@ -0,0 +1,82 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, inspect
+from bench.listing_indexes import BASELINE_SCHEMA
+from migrate_db import upgrade, current_version, MIGRATIONS
+
+class TestMigrations:
+    """Test versioned schema migrations"""
+    
+    @pytest.fixture
+    def legacy_engine(self, tmp_path):
+        """Engine bound to a database created before any migrations existed"""
+        path = tmp_path / 'legacy.db'
+        conn = sqlite3.connect(path)
+        conn.executescript(BASELINE_SCHEMA)
+        conn.execute("INSERT INTO users VALUES (1, 'u', 'u@example.com', 'x', 'user', NULL, NULL)")
+        conn.execute("INSERT INTO tasks VALUES (1, 'Kept', NULL, 0, NULL, NULL, 1)")
+        conn.commit()
+        conn.close()
+        
+        engine = create_engine(f'sqlite:///{path}')
+        yield engine
+        engine.dispose()
+    
+    def test_upgrade_adds_task_indexes(self, legacy_engine):
+        """Test that upgrading a legacy database adds the listing indexes in place"""
+        applied = upgrade(legacy_engine)
+        
+        assert [version for version, _ in applied] == [m[0] for m in MIGRATIONS]
+        index_names = {ix['name'] for ix in inspect(legacy_engine).get_indexes('tasks')}
+        assert {
+            'ix_tasks_user_id_created_at_id',
+            'ix_tasks_user_id_completed_created_at',
+            'ix_tasks_created_at_id'
+        } <= index_names
+        
+        with legacy_engine.connect() as conn:
+            assert current_version(conn) == MIGRATIONS[-1][0]
+            assert conn.exec_driver_sql('SELECT title FROM tasks').scalar() == 'Kept'
+    
+    def test_upgrade_is_idempotent(self, legacy_engine):
+        """Test that a second upgrade applies nothing"""
+        upgrade(legacy_engine)
+        
+        assert upgrade(legacy_engine) == []
+    
+    def test_upgrade_stops_at_target(self, legacy_engine):
+        """Test upgrading to an explicit target version"""
+        assert upgrade(legacy_engine, target=0) == []
+        
+        with legacy_engine.connect() as conn:
+            assert current_version(conn) == 0
+    
+    def test_upgrade_builds_task_counters(self, legacy_engine):
+        """Test that the counter migration backfills existing tasks and installs the triggers"""
+        upgrade(legacy_engine)
+        
+        with legacy_engine.begin() as conn:
+            assert conn.exec_driver_sql('SELECT total, completed FROM user_task_stats').all() == [(1, 0)]
+            conn.exec_driver_sql("INSERT INTO tasks (title, completed, user_id) VALUES ('New', 1, 1)")
+            assert conn.exec_driver_sql('SELECT total, completed FROM user_task_stats').all() == [(2, 1)]
+    
+    def test_upgrade_builds_change_log(self, legacy_engine):
+        """Test that the change log migration logs existing tasks and installs the triggers"""
+        upgrade(legacy_engine)
+        
+        with legacy_engine.begin() as conn:
+            assert conn.exec_driver_sql('SELECT task_id, op FROM task_changes').all() == [(1, 'upsert')]
+            conn.exec_driver_sql('DELETE FROM tasks WHERE id = 1')
+            assert conn.exec_driver_sql('SELECT task_id, op FROM task_changes').all() == [(1, 'delete')]
+    
+    def test_upgrade_adds_user_deletions(self, legacy_engine):
+        """Test that upgrading creates the user deletion progress table"""
+        upgrade(legacy_engine)
+        
+        assert 'user_deletions' in inspect(legacy_engine).get_table_names()
+    
+    def test_upgrade_adds_jobs(self, legacy_engine):
+        """Test that upgrading creates the background job queue table"""
+        upgrade(legacy_engine)
+        
+        assert 'jobs' in inspect(legacy_engine).get_table_names()
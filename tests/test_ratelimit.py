@@ -0,0 +1,165 @@
+import pytest
+from utils.ratelimit import MemoryBackend, RateLimitBackend, RateLimiter, parse_limit
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+class CountingBackend(MemoryBackend):
+    """Stand-in for a shared backend loaded from an import path"""
+    
+    name = 'counting'
+
+@pytest.fixture
+def limiter(app):
+    """Enable rate limiting with small limits"""
+    app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_LIMITS={
+        'default': '100/minute',
+        'auth.login': '2/minute',
+        'tasks': '3/minute',
+        'metrics': None
+    })
+    limiter = app.extensions['rate_limiter'] = RateLimiter.from_config(app)
+    return limiter
+
+def login(client, username='testuser', password='testpass123'):
+    return client.post('/api/auth/login', json={'username': username, 'password': password})
+
+class TestRateLimiting:
+    """Test requests are throttled per client and limit"""
+    
+    def test_login_limited(self, client, auth_headers, limiter, query_counter):
+        """Test requests over the limit get 429 with Retry-After before any SQL"""
+        responses = [login(client) for _ in range(2)]
+        query_counter.clear()
+        
+        response = login(client)
+        
+        assert [r.status_code for r in responses] == [200, 200]
+        assert response.status_code == 429
+        assert response.json['error'] == 'Too many requests'
+        assert 1 <= int(response.headers['Retry-After']) <= 30
+        assert response.json['retry_after'] == int(response.headers['Retry-After'])
+        assert query_counter == []
+    
+    def test_remaining_headers(self, client, auth_headers, limiter):
+        first = client.get('/api/tasks', headers=auth_headers)
+        second = client.get('/api/tasks/stats', headers=auth_headers)
+        
+        assert (first.headers['X-RateLimit-Limit'], first.headers['X-RateLimit-Remaining']) == ('3', '2')
+        assert second.headers['X-RateLimit-Remaining'] == '1'
+    
+    def test_keyed_by_identity(self, client, auth_headers, admin_headers, limiter):
+        """Test each user has their own bucket even from the same address"""
+        for _ in range(3):
+            client.get('/api/tasks', headers=auth_headers)
+        
+        assert client.get('/api/tasks', headers=auth_headers).status_code == 429
+        assert client.get('/api/tasks', headers=admin_headers).status_code == 200
+    
+    def test_invalid_token_keyed_by_address(self, client, limiter):
+        headers = {'Authorization': 'Bearer not-a-token'}
+        statuses = [client.get('/api/tasks', headers=headers).status_code for _ in range(4)]
+        
+        assert statuses[:3] == [422, 422, 422]
+        assert statuses[3] == 429
+        assert client.get('/api/tasks').status_code == 429
+    
+    def test_limits_are_separate(self, client, auth_headers, limiter):
+        """Test exhausting one limit leaves the others alone"""
+        for _ in range(3):
+            client.get('/api/tasks', headers=auth_headers)
+        
+        assert client.get('/api/auth/profile', headers=auth_headers).status_code == 200
+        assert client.get('/metrics').status_code == 200
+        assert 'X-RateLimit-Limit' not in client.get('/metrics').headers
+    
+    def test_disabled(self, client, auth_headers):
+        responses = [login(client) for _ in range(15)]
+        
+        assert {response.status_code for response in responses} == {200}
+        assert 'X-RateLimit-Limit' not in responses[0].headers
+    
+    def test_resolve(self, limiter):
+        assert limiter.resolve('auth.login') == ('auth.login', (2, 30.0))
+        assert limiter.resolve('tasks.get_task') == ('tasks', (3, 20.0))
+        assert limiter.resolve('auth.register') == ('default', (100, 0.6))
+        assert limiter.resolve(None) == ('default', (100, 0.6))
+        assert limiter.resolve('metrics') == ('metrics', None)
+    
+    def test_backend_import_path(self, app):
+        app.config['RATELIMIT_BACKEND'] = 'tests.test_ratelimit:CountingBackend'
+        
+        limiter = RateLimiter.from_config(app)
+        
+        assert isinstance(limiter.backend, CountingBackend)
+        assert isinstance(limiter.backend, RateLimitBackend)
+    
+    def test_token_subjects_cached(self, limiter, monkeypatch):
+        """Test a token is verified once, then found in the bounded cache"""
+        calls = []
+        
+        def counting_decode(token, **kwargs):
+            calls.append(token)
+            return {'sub': 'cached'}
+        
+        monkeypatch.setattr('utils.ratelimit.decode_token', counting_decode)
+        limiter.token_cache_size = 1
+        
+        subjects = [limiter.token_subject(token) for token in ('a', 'a', 'b', 'a')]
+        
+        assert subjects == ['cached'] * 4
+        assert calls == ['a', 'b', 'a']
+
+class TestMemoryBackend:
+    """Test the token bucket arithmetic and eviction"""
+    
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+        
+        results = [backend.consume('k', 3, 10.0) for _ in range(4)]
+        
+        assert [result[:2] for result in results] == [(True, 2), (True, 1), (True, 0), (False, 0)]
+        assert results[3][2] == pytest.approx(10.0)
+        clock.now += 10
+        assert backend.consume('k', 3, 10.0) == (True, 0, 0.0)
+        assert backend.consume('k', 3, 10.0)[0] is False
+        clock.now += 30
+        assert backend.consume('k', 3, 10.0)[:2] == (True, 2)
+    
+    def test_refused_requests_do_not_drain(self):
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+        backend.consume('k', 1, 5.0)
+        
+        for _ in range(10):
+            backend.consume('k', 1, 5.0)
+        clock.now += 5
+        
+        assert backend.consume('k', 1, 5.0)[0] is True
+    
+    def test_sweep_drops_full_buckets(self):
+        clock = FakeClock()
+        backend = MemoryBackend(sweep_interval=60, clock=clock)
+        backend.consume('idle', 10, 1.0)
+        clock.now += 55
+        backend.consume('busy', 1, 100.0)
+        
+        clock.now += 5
+        backend.consume('new', 10, 1.0)
+        
+        assert len(backend) == 2
+        assert backend.consume('idle', 10, 1.0)[:2] == (True, 9)
+    
+    def test_parse_limit(self):
+        assert parse_limit('10/minute') == (10, 6.0)
+        assert parse_limit('5/2.5') == (5, 0.5)
+        assert parse_limit(None) is None
+        with pytest.raises(ValueError):
+            parse_limit('0/second')
+        with pytest.raises(ValueError):
+            parse_limit('10/fortnight')
@@ -0,0 +1,140 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine
+from app import create_app, db
+from models.user import User
+from utils.replicas import ReplicaRouter, get_replica_router
+
+def replicate(source, target):
+    """Bring a replica up to date; until called, it lags behind the primary"""
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+class TestReadReplicas:
+    """Test read-only views served from lagging SQLite replicas"""
+    
+    @pytest.fixture
+    def paths(self, tmp_path):
+        return {name: str(tmp_path / f'{name}.db') for name in ('primary', 'replica')}
+    
+    @pytest.fixture
+    def replica_app(self, paths):
+        app = create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{paths['primary']}",
+            'SQLALCHEMY_REPLICA_URIS': [f"sqlite:///{paths['replica']}"],
+            'REPLICA_READ_YOUR_WRITES_WINDOW': 30
+        })
+        
+        with app.app_context():
+            admin = User(username='admin', email='admin@example.com', role='admin')
+            admin.set_password('adminpass123')
+            db.session.add(admin)
+            db.session.commit()
+            yield app
+            db.session.remove()
+            get_replica_router().dispose()
+            db.engine.dispose()
+    
+    def login(self, client, username, password):
+        token = client.post('/api/auth/login', json={
+            'username': username, 'password': password
+        }).json['access_token']
+        return {'Authorization': f'Bearer {token}'}
+    
+    @pytest.fixture
+    def clients(self, replica_app, paths):
+        """A user and an admin client, with the replica caught up after setup"""
+        client = replica_app.test_client()
+        client.post('/api/auth/register', json={
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'password': 'testpass123',
+            'confirm_password': 'testpass123'
+        })
+        user_headers = self.login(client, 'testuser', 'testpass123')
+        admin_headers = self.login(client, 'admin', 'adminpass123')
+        replicate(paths['primary'], paths['replica'])
+        return client, user_headers, admin_headers
+    
+    def test_reads_lag_until_replicated(self, clients, paths):
+        """Test other users read the replica and see new tasks once it catches up"""
+        client, user_headers, admin_headers = clients
+        task = client.post('/api/tasks', json={'title': 'Fresh'}, headers=user_headers).json['task']
+        
+        assert client.get('/api/tasks', headers=admin_headers).json['pagination']['total'] == 0
+        assert client.get(f"/api/tasks/{task['id']}", headers=admin_headers).status_code == 404
+        
+        replicate(paths['primary'], paths['replica'])
+        
+        assert client.get('/api/tasks', headers=admin_headers).json['pagination']['total'] == 1
+        assert client.get(f"/api/tasks/{task['id']}", headers=admin_headers).status_code == 200
+    
+    def test_writer_reads_own_writes(self, clients):
+        """Test a user's reads stay on the primary within the window after a write"""
+        client, user_headers, _ = clients
+        task = client.post('/api/tasks', json={'title': 'Mine'}, headers=user_headers).json['task']
+        
+        assert client.get('/api/tasks', headers=user_headers).json['pagination']['total'] == 1
+        assert client.get(f"/api/tasks/{task['id']}", headers=user_headers).status_code == 200
+    
+    def test_writer_reads_replica_after_window(self, replica_app, clients):
+        """Test the read-your-writes window expires"""
+        client, user_headers, _ = clients
+        get_replica_router().window = 0
+        client.post('/api/tasks', json={'title': 'Mine'}, headers=user_headers)
+        
+        assert client.get('/api/tasks', headers=user_headers).json['pagination']['total'] == 0
+    
+    def test_bulk_writes_count_as_writes(self, clients):
+        """Test batch endpoints also pin the writer to the primary"""
+        client, user_headers, _ = clients
+        client.post('/api/tasks/batch', json={'tasks': [{'title': 'One'}, {'title': 'Two'}]}, headers=user_headers)
+        
+        assert client.get('/api/tasks', headers=user_headers).json['pagination']['total'] == 2
+    
+    def test_revocation_checked_on_primary(self, clients):
+        """Test a logout takes effect at once even though the replica lags"""
+        client, user_headers, _ = clients
+        client.post('/api/auth/logout', headers=user_headers)
+        get_replica_router().window = 0
+        
+        response = client.get('/api/auth/profile', headers=user_headers)
+        
+        assert response.status_code == 401
+
+    def test_feature_checks_probe_replica(self, clients, paths):
+        """Test a replica without the change log gets 501, not a failed query"""
+        client, user_headers, _ = clients
+        get_replica_router().window = 0
+        with sqlite3.connect(paths['replica']) as replica:
+            replica.execute('DROP TABLE task_changes')
+            replica.execute('DROP TRIGGER task_changes_ai')
+        
+        response = client.get('/api/tasks/changes', headers=user_headers)
+        
+        assert response.status_code == 501
+
+class TestReplicaRouter:
+    """Test replica selection strategies"""
+    
+    @pytest.fixture
+    def engines(self, tmp_path):
+        engines = [create_engine(f"sqlite:///{tmp_path / f'replica{i}.db'}") for i in range(2)]
+        yield engines
+        for engine in engines:
+            engine.dispose()
+    
+    def test_round_robin(self, engines):
+        router = ReplicaRouter(engines)
+        assert [router.choose() for _ in range(4)] == engines * 2
+    
+    def test_least_loaded(self, engines):
+        router = ReplicaRouter(engines, strategy='least_loaded')
+        with engines[0].connect():
+            assert router.in_use(engines[0]) == 1
+            assert router.choose() is engines[1]
+        assert router.in_use(engines[0]) == 0
+    
+    def test_unknown_strategy(self, engines):
+        with pytest.raises(ValueError):
+            ReplicaRouter(engines, strategy='random')
@@ -0,0 +1,67 @@
+import json
+import pytest
+from datetime import datetime
+from sqlalchemy import select
+from app import db
+from models.task import Task
+from models.user import User
+from schemas.task_schema import TaskSchema
+from schemas.user_schema import UserSchema
+from schemas.serializers import dump_task, dump_user
+from flask.json.provider import DefaultJSONProvider
+from utils.json_provider import OrjsonProvider, orjson
+
+def encode(data):
+    """Encode the way the default Flask JSON provider does for responses"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+class TestSerializers:
+    """Test compiled serializers against the marshmallow schemas"""
+    
+    @pytest.fixture
+    def records(self, app):
+        user = User(username='serial', email='serial@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.flush()
+        
+        db.session.add_all([
+            Task(title='Plain', user_id=user.id),
+            Task(title='Ünïcødé ✓', description='line\nbreak "quoted"', completed=True, user_id=user.id),
+            Task(title='Explicit times', description=None, user_id=user.id,
+                 created_at=datetime(2024, 1, 2, 3, 4, 5), updated_at=datetime(2024, 1, 2, 3, 4, 5, 678)),
+        ])
+        db.session.commit()
+        return user
+    
+    def test_task_matches_schema(self, records):
+        """Test byte-identical output for ORM objects and column rows"""
+        schema = TaskSchema()
+        rows = db.session.execute(select(*[getattr(Task, f) for f in dump_task.fields])).all()
+        
+        for task, row in zip(Task.query.order_by(Task.id), rows):
+            expected = schema.dump(task)
+            assert list(dump_task(task)) == list(expected)
+            assert encode(dump_task(task)) == encode(expected)
+            assert encode(dump_task(row)) == encode(expected)
+    
+    def test_user_matches_schema(self, records):
+        """Test byte-identical output for users"""
+        assert encode(dump_user(records)) == encode(UserSchema().dump(records))
+    
+    def test_none_values_match_schema(self):
+        """Test that unset values serialize as null like marshmallow"""
+        task = Task(title='Transient')
+        
+        assert dump_task(task) == TaskSchema().dump(task)
+    
+    def test_orjson_provider_matches_default(self, app, client, auth_headers, sample_task):
+        """Test that the orjson provider produces the default provider's payload"""
+        if orjson is None:
+            pytest.skip('orjson is not installed')
+        
+        app.json = DefaultJSONProvider(app)
+        expected = client.get('/api/tasks', headers=auth_headers).get_data()
+        app.json = OrjsonProvider(app)
+        
+        assert client.get('/api/tasks', headers=auth_headers).get_data() == expected
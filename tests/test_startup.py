@@ -0,0 +1,55 @@
+import gc
+from sqlalchemy import inspect
+from app import create_app, db
+from utils.passwords import get_password_hasher
+from utils.prefork import prepare_for_fork, after_fork
+
+class TestStartup:
+    """Test startup options and the pre-fork hooks"""
+    
+    def test_production_skips_create_all(self, tmp_path):
+        """Test production startup leaves the schema to init_db.py"""
+        app = create_app('production', {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'prod.db'}"})
+        
+        with app.app_context():
+            assert inspect(db.engine).get_table_names() == []
+            db.engine.dispose()
+    
+    def test_create_all_by_default(self, app):
+        with app.app_context():
+            assert 'tasks' in inspect(db.engine).get_table_names()
+    
+    def test_docs_only_when_enabled(self):
+        enabled = create_app('testing')
+        disabled = create_app('testing', {'API_DOCS_ENABLED': False})
+        
+        assert enabled.test_client().get('/api/docs/').status_code == 200
+        assert disabled.test_client().get('/api/docs/').status_code == 404
+        assert 'swagger_ui' not in disabled.blueprints
+    
+    def test_prefork_hooks(self, tmp_path):
+        """Test an app prepared in a master and reset in a worker keeps serving"""
+        app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'prefork.db'}"})
+        client = app.test_client()
+        client.post('/api/auth/register', json={
+            'username': 'testuser',
+            'email': 'test@example.com',
+            'password': 'testpass123',
+            'confirm_password': 'testpass123'
+        })
+        try:
+            prepare_for_fork(app)
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+        
+        after_fork(app)
+        
+        with app.app_context():
+            assert get_password_hasher()._executor is None
+        response = client.post('/api/auth/login', json={'username': 'testuser', 'password': 'testpass123'})
+        assert response.status_code == 200
+        headers = {'Authorization': f"Bearer {response.json['access_token']}"}
+        assert client.get('/api/tasks', headers=headers).status_code == 200
+        with app.app_context():
+            db.engine.dispose()
@@ -232,3 +232,318 @@ class TestTasks:
         
         assert response.status_code == 200
         assert response.json['task']['title'] == 'User Task'
+    
+    def test_get_tasks_with_cursor_pagination(self, client, auth_headers):
+        """Test walking task pages forwards and backwards with cursors"""
+        
+        for i in range(7):
+            client.post('/api/tasks', json={'title': f'Task {i}'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks?cursor=&per_page=3', headers=auth_headers)
+        
+        assert response.status_code == 200
+        data = response.json
+        assert [t['title'] for t in data['tasks']] == ['Task 6', 'Task 5', 'Task 4']
+        assert data['pagination']['has_prev'] == False
+        assert data['pagination']['prev_cursor'] is None
+        assert 'total' not in data['pagination']
+        
+        titles = [t['title'] for t in data['tasks']]
+        cursor = data['pagination']['next_cursor']
+        while cursor:
+            response = client.get(f'/api/tasks?cursor={cursor}&per_page=3', headers=auth_headers)
+            titles += [t['title'] for t in response.json['tasks']]
+            cursor = response.json['pagination']['next_cursor']
+        
+        assert titles == [f'Task {i}' for i in range(6, -1, -1)]
+        assert response.json['pagination']['has_next'] == False
+        
+        prev_cursor = response.json['pagination']['prev_cursor']
+        response = client.get(f'/api/tasks?cursor={prev_cursor}&per_page=3', headers=auth_headers)
+        
+        assert [t['title'] for t in response.json['tasks']] == ['Task 3', 'Task 2', 'Task 1']
+        assert response.json['pagination']['has_next'] == True
+        assert response.json['pagination']['has_prev'] == True
+    
+    def test_get_tasks_cursor_include_total(self, client, auth_headers):
+        """Test that cursor mode only counts when asked to"""
+        
+        for i in range(3):
+            client.post('/api/tasks', json={'title': f'Task {i}'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks?cursor=&include_total=true', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json['pagination']['total'] == 3
+    
+    @pytest.mark.parametrize('per_page', [-5, 0])
+    def test_get_tasks_per_page_clamped(self, client, auth_headers, per_page):
+        """Test a non-positive per_page still returns one bounded page in either mode"""
+        for i in range(3):
+            client.post('/api/tasks', json={'title': f'Task {i}'}, headers=auth_headers)
+        
+        cursor_page = client.get(f'/api/tasks?cursor=&per_page={per_page}', headers=auth_headers).json
+        offset_page = client.get(f'/api/tasks?per_page={per_page}', headers=auth_headers).json
+        
+        assert [t['title'] for t in cursor_page['tasks']] == ['Task 2']
+        assert cursor_page['pagination']['has_next'] == True
+        assert len(offset_page['tasks']) == 1
+        assert offset_page['pagination']['per_page'] == 1
+    
+    def test_get_tasks_invalid_cursor(self, client, auth_headers):
+        """Test that a malformed cursor is rejected"""
+        response = client.get('/api/tasks?cursor=not-a-cursor', headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert 'Invalid cursor' in response.json['error']
+    
+    def test_search_uses_full_text_index(self, client, auth_headers):
+        """Test ranked and prefix search through the FTS index"""
+        
+        client.post('/api/tasks', json={'title': 'Groceries', 'description': 'Buy milk'}, headers=auth_headers)
+        client.post('/api/tasks', json={'title': 'Milk the cow', 'description': 'Milk milk milk'}, headers=auth_headers)
+        client.post('/api/tasks', json={'title': 'Laundry'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks?search=milk&sort=relevance', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert [t['title'] for t in response.json['tasks']] == ['Milk the cow', 'Groceries']
+        assert response.json['pagination']['total'] == 2
+        
+        response = client.get('/api/tasks?search=laund&prefix=true', headers=auth_headers)
+        
+        assert [t['title'] for t in response.json['tasks']] == ['Laundry']
+    
+    def test_search_index_follows_updates_and_deletes(self, client, auth_headers, sample_task):
+        """Test that the FTS index stays in sync with task writes"""
+        task_id = sample_task['id']
+        
+        client.put(f'/api/tasks/{task_id}', json={'title': 'Renamed', 'description': 'Other'}, headers=auth_headers)
+        
+        assert client.get('/api/tasks?search=test', headers=auth_headers).json['tasks'] == []
+        assert len(client.get('/api/tasks?search=renamed', headers=auth_headers).json['tasks']) == 1
+        
+        client.delete(f'/api/tasks/{task_id}', headers=auth_headers)
+        
+        assert client.get('/api/tasks?search=renamed', headers=auth_headers).json['tasks'] == []
+    
+    def test_search_falls_back_to_like(self, app, client, auth_headers):
+        """Test substring search when full-text search is disabled"""
+        app.config['SEARCH_FULL_TEXT'] = False
+        
+        client.post('/api/tasks', json={'title': 'Python Task'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks?search=ytho', headers=auth_headers)
+        
+        assert len(response.json['tasks']) == 1
+    
+    def test_get_task_loads_user_once(self, app, client, auth_headers, sample_task, query_counter):
+        """Test that authorization reuses the user loaded for the request"""
+        app.config['IDENTITY_CACHE_ENABLED'] = False
+        query_counter.clear()
+        
+        response = client.get(f'/api/tasks/{sample_task["id"]}', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert sum('FROM users' in s for s in query_counter) == 1
+        assert len(query_counter) == 2
+    
+    def test_get_task_with_identity_cache(self, app, client, auth_headers, sample_task, query_counter):
+        """Test that a cached identity (the default) removes the user query entirely"""
+        client.get(f'/api/tasks/{sample_task["id"]}', headers=auth_headers)
+        query_counter.clear()
+        
+        response = client.get(f'/api/tasks/{sample_task["id"]}', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert not any('FROM users' in s for s in query_counter)
+    
+    def test_export_ndjson(self, app, client, auth_headers):
+        """Test streaming tasks as newline-delimited JSON"""
+        app.config['TASK_EXPORT_CHUNK_SIZE'] = 2
+        for i in range(5):
+            client.post('/api/tasks', json={'title': f'Task {i}', 'completed': i < 2}, headers=auth_headers)
+        
+        response = client.get('/api/tasks/export?format=ndjson', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [row['title'] for row in rows] == [f'Task {i}' for i in range(4, -1, -1)]
+        assert set(rows[0]) == {'id', 'title', 'description', 'completed', 'user_id', 'created_at', 'updated_at'}
+        
+        response = client.get('/api/tasks/export?completed=true', headers=auth_headers)
+        
+        assert len(response.get_data(as_text=True).splitlines()) == 2
+    
+    def test_export_csv(self, client, auth_headers, sample_task):
+        """Test streaming tasks as CSV"""
+        response = client.get('/api/tasks/export?format=csv', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == 'id,title,description,completed,user_id,created_at,updated_at'
+        assert lines[1].startswith(f'{sample_task["id"]},Test Task,This is a test task,False,')
+    
+    def test_export_invalid_format(self, client, auth_headers):
+        """Test that unknown export formats are rejected"""
+        response = client.get('/api/tasks/export?format=xml', headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_get_task_conditional(self, client, auth_headers, sample_task):
+        """Test ETag revalidation of a single task"""
+        url = f'/api/tasks/{sample_task["id"]}'
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers['ETag']
+        
+        assert response.headers['Last-Modified']
+        assert 'no-cache' in response.headers['Cache-Control']
+        
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.get_data() == b''
+        assert response.headers['ETag'] == etag
+        
+        client.put(url, json={'title': 'Changed'}, headers=auth_headers)
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.json['task']['title'] == 'Changed'
+    
+    def test_get_task_update_within_same_second(self, client, auth_headers, sample_task):
+        """Test If-Modified-Since alone never hides an update made in the same second"""
+        url = f'/api/tasks/{sample_task["id"]}'
+        last_modified = client.get(url, headers=auth_headers).headers['Last-Modified']
+        
+        client.put(url, json={'title': 'Changed'}, headers=auth_headers)
+        response = client.get(url, headers={**auth_headers, 'If-Modified-Since': last_modified})
+        
+        assert response.status_code == 200
+        assert response.json['task']['title'] == 'Changed'
+    
+    def test_get_tasks_conditional(self, client, auth_headers, sample_task, query_counter):
+        """Test that unchanged listings are answered with 304 from the aggregate alone"""
+        etag = client.get('/api/tasks', headers=auth_headers).headers['ETag']
+        query_counter.clear()
+        
+        response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert not any('FROM tasks' in s and 'LIMIT' in s for s in query_counter)
+        
+        other = client.get('/api/tasks?per_page=5', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert other.status_code == 200
+        
+        client.delete(f'/api/tasks/{sample_task["id"]}', headers=auth_headers)
+        response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.json['tasks'] == []
+    
+    def test_get_tasks_cursor_conditional(self, client, auth_headers, sample_task):
+        """Test revalidation of a cursor page"""
+        response = client.get('/api/tasks?cursor=', headers=auth_headers)
+        etag = response.headers['ETag']
+        
+        response = client.get('/api/tasks?cursor=', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        
+        client.put(f'/api/tasks/{sample_task["id"]}', json={'completed': True}, headers=auth_headers)
+        response = client.get('/api/tasks?cursor=', headers={**auth_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+
+class TestTaskBatch:
+    """Test batch task endpoints"""
+    
+    def other_user_task(self, client):
+        """Create a task owned by a second user and return its id"""
+        user_data = {
+            'username': 'otheruser',
+            'email': 'other@example.com',
+            'password': 'password123',
+            'confirm_password': 'password123'
+        }
+        client.post('/api/auth/register', json=user_data)
+        login_data = {'username': 'otheruser', 'password': 'password123'}
+        token = client.post('/api/auth/login', json=login_data).json['access_token']
+        other_headers = {'Authorization': f'Bearer {token}'}
+        
+        response = client.post('/api/tasks', json={'title': 'Other Task'}, headers=other_headers)
+        return response.json['task']['id']
+    
+    def test_batch_create_success(self, client, auth_headers):
+        """Test creating several tasks in one request"""
+        tasks = [{'title': f'Task {i}', 'completed': i % 2 == 0} for i in range(5)]
+        
+        response = client.post('/api/tasks/batch', json={'tasks': tasks}, headers=auth_headers)
+        
+        assert response.status_code == 201
+        data = response.json
+        assert data['succeeded'] == 5
+        assert [r['task']['title'] for r in data['results']] == [f'Task {i}' for i in range(5)]
+        assert client.get('/api/tasks', headers=auth_headers).json['pagination']['total'] == 5
+    
+    def test_batch_create_partial_failure(self, client, auth_headers):
+        """Test that invalid items are reported without rejecting the batch"""
+        tasks = [{'title': 'Good'}, {'title': ''}, {'description': 'No title'}]
+        
+        response = client.post('/api/tasks/batch', json={'tasks': tasks}, headers=auth_headers)
+        
+        assert response.status_code == 207
+        results = response.json['results']
+        assert [r['status'] for r in results] == [201, 400, 400]
+        assert 'title' in results[2]['details']
+    
+    def test_batch_create_too_large(self, app, client, auth_headers):
+        """Test the configurable batch size limit"""
+        app.config['TASK_BATCH_MAX_CREATE'] = 2
+        tasks = [{'title': f'Task {i}'} for i in range(3)]
+        
+        response = client.post('/api/tasks/batch', json={'tasks': tasks}, headers=auth_headers)
+        
+        assert response.status_code == 413
+        assert response.json['max_size'] == 2
+    
+    def test_batch_create_requires_list(self, client, auth_headers):
+        """Test that the tasks key must hold a non-empty list"""
+        response = client.post('/api/tasks/batch', json={'tasks': []}, headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_batch_update(self, client, auth_headers, sample_task):
+        """Test updating own tasks while others are refused"""
+        other_id = self.other_user_task(client)
+        updates = [
+            {'id': sample_task['id'], 'completed': True},
+            {'id': other_id, 'title': 'Hacked'},
+            {'id': 999, 'title': 'Missing'}
+        ]
+        
+        response = client.patch('/api/tasks/batch', json={'tasks': updates}, headers=auth_headers)
+        
+        assert response.status_code == 207
+        results = response.json['results']
+        assert [r['status'] for r in results] == [200, 403, 404]
+        assert results[0]['task']['completed'] == True
+        assert results[0]['task']['title'] == 'Test Task'
+    
+    def test_batch_delete(self, client, auth_headers, admin_headers, sample_task):
+        """Test deleting tasks, with admins allowed to delete any task"""
+        other_id = self.other_user_task(client)
+        
+        response = client.delete('/api/tasks/batch', json={'ids': [sample_task['id'], other_id]}, headers=auth_headers)
+        
+        assert response.status_code == 207
+        assert [r['status'] for r in response.json['results']] == [200, 403]
+        assert client.get(f'/api/tasks/{sample_task["id"]}', headers=auth_headers).status_code == 404
+        
+        response = client.delete('/api/tasks/batch', json={'ids': [other_id]}, headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert response.json['succeeded'] == 1
@@ -0,0 +1,27 @@
+from functools import wraps
+from flask import g
+from flask_jwt_extended import verify_jwt_in_request
+from utils.async_db import async_db
+
+def _verify_with_session(session):
+    # The revocation and user lookup callbacks read through this session
+    g.identity_session = session
+    try:
+        verify_jwt_in_request()
+    finally:
+        g.pop('identity_session', None)
+
+def async_jwt_required(view):
+    """jwt_required() for coroutine views.
+    
+    flask_jwt_extended's decorator wraps views in a sync function, which
+    would push them back onto a worker thread. This one awaits the view and
+    runs the same verification (header parsing, revocation check, identity
+    lookup) on the request's async session, so get_current_user() and the
+    JWT error responses behave exactly as in sync mode.
+    """
+    @wraps(view)
+    async def wrapper(*args, **kwargs):
+        await async_db.session.run_sync(_verify_with_session)
+        return await view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,61 @@
+from flask import current_app, g
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app import db
+from utils.engine import engine_options, tune_engine
+
+# Async driver used for each sync backend when ASYNC_DATABASE_URI is unset
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql'
+}
+
+def async_database_url(url):
+    """Async counterpart of the sync engine URL (same database, async driver)"""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No async driver known for {backend!r}; set ASYNC_DATABASE_URI')
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise RuntimeError('ASYNC_MODE needs a file or server database, not an in-memory SQLite one')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+class AsyncDatabase:
+    """SQLAlchemy async engine and request-scoped AsyncSession for async views.
+    
+    Uses the same models and database as the sync `db`. Sessions keep their
+    attributes after commit, since lazy refreshes are not allowed under asyncio.
+    """
+    
+    def init_app(self, app):
+        url = app.config.get('ASYNC_DATABASE_URI')
+        if not url:
+            with app.app_context():
+                url = async_database_url(db.engine.url)
+        engine = create_async_engine(url, **engine_options(app.config, url))
+        tune_engine(engine.sync_engine, app.config)
+        app.extensions['async_db'] = {
+            'engine': engine,
+            'sessionmaker': async_sessionmaker(engine, expire_on_commit=False, query_cls=db.Query)
+        }
+    
+    @property
+    def engine(self):
+        return current_app.extensions['async_db']['engine']
+    
+    @property
+    def session(self):
+        """The AsyncSession of the current request, opened on first use"""
+        if 'async_session' not in g:
+            g.async_session = current_app.extensions['async_db']['sessionmaker']()
+        return g.async_session
+    
+    async def remove(self):
+        """Close the current request's session, rolling back anything uncommitted"""
+        session = g.pop('async_session', None)
+        if session is not None:
+            await session.close()
+    
+    async def dispose(self, app):
+        await app.extensions['async_db']['engine'].dispose()
+
+async_db = AsyncDatabase()
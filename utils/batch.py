@@ -0,0 +1,56 @@
+from flask import request, jsonify
+from marshmallow import ValidationError
+
+def get_batch_items(key, max_size):
+    """Extract the list under key from the JSON body, enforcing the batch size limit"""
+    payload = request.get_json(silent=True)
+    items = payload.get(key) if isinstance(payload, dict) else None
+    
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({
+            'error': 'Validation error',
+            'details': {key: ['Must be a non-empty list.']}
+        }), 400)
+    
+    if len(items) > max_size:
+        return None, (jsonify({'error': 'Batch too large', 'max_size': max_size}), 413)
+    
+    return items, None
+
+def validate_batch(schema, items):
+    """Validate items with a many=True schema.
+    
+    Returns the valid (index, data) pairs and a failure result for every
+    invalid item, so one bad item does not reject the whole batch.
+    """
+    try:
+        return list(enumerate(schema.load(items))), []
+    except ValidationError as err:
+        valid = [
+            (index, data) for index, data in enumerate(err.valid_data)
+            if index not in err.messages
+        ]
+        failures = [
+            {'index': index, 'status': 400, 'error': 'Validation error', 'details': messages}
+            for index, messages in err.messages.items()
+        ]
+        return valid, failures
+
+def batch_response(message, results, success_status):
+    """Per-item results; 207 on partial failure, 400 when every item failed"""
+    results.sort(key=lambda result: result['index'])
+    failed = sum(1 for result in results if result['status'] >= 400)
+    
+    if failed == 0:
+        status = success_status
+    elif failed == len(results):
+        status = 400
+    else:
+        status = 207
+    
+    return jsonify({
+        'message': message,
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'results': results
+    }), status
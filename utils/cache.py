@@ -0,0 +1,205 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+from werkzeug.utils import import_string
+from utils.conditional import make_etag, is_not_modified, not_modified_response
+
+class CacheBackend:
+    """Storage interface for the response cache.
+    
+    Shared backends (e.g. Redis or memcached) implement these methods so
+    every worker process sees the same entries and generation counters.
+    Counters must never be evicted while entries keyed by them may live.
+    """
+    
+    name = 'base'
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+    
+    def get(self, key):
+        raise NotImplementedError
+    
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+    
+    def get_counter(self, key):
+        raise NotImplementedError
+    
+    def incr(self, key):
+        raise NotImplementedError
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU with per-entry TTL; counters are kept outside the LRU"""
+    
+    name = 'memory'
+    
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(maxsize=config['RESPONSE_CACHE_SIZE'])
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+    
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+BACKENDS = {'memory': MemoryBackend}
+
+class ResponseCache:
+    """Caches rendered responses under generation-versioned keys.
+    
+    Each scope (one user's tasks, or 'all' for admin-wide listings) has a
+    generation counter that is part of every key. Writes bump the counter,
+    which orphans the old entries instead of having to find and delete them.
+    """
+    
+    def __init__(self, backend, ttl, enabled=True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+        self._lock = threading.Lock()
+    
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+    
+    def key(self, scope, *parts):
+        generation = self.backend.get_counter(f'gen:{scope}')
+        return f'resp:{scope}:{generation}:{make_etag(*parts)}'
+    
+    def get(self, key):
+        entry = self.backend.get(key)
+        self._count('hits' if entry is not None else 'misses')
+        return entry
+    
+    def set(self, key, entry):
+        self.backend.set(key, entry, self.ttl)
+        self._count('stores')
+    
+    def invalidate(self, *scopes):
+        for scope in scopes:
+            self.backend.incr(f'gen:{scope}')
+        self._count('invalidations')
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        stats['enabled'] = self.enabled
+        stats['backend'] = self.backend.name
+        return stats
+
+def init_response_cache(app):
+    backend_name = app.config['RESPONSE_CACHE_BACKEND']
+    backend_class = BACKENDS.get(backend_name) or import_string(backend_name)
+    app.extensions['response_cache'] = ResponseCache(
+        backend_class.from_config(app.config),
+        ttl=app.config['RESPONSE_CACHE_TTL'],
+        enabled=app.config['RESPONSE_CACHE_ENABLED']
+    )
+
+def get_response_cache():
+    return current_app.extensions['response_cache']
+
+def invalidate_listings(user_ids):
+    """Bump the cache generations of the task owners and of admin-wide listings"""
+    get_response_cache().invalidate('all', *(f'user:{user_id}' for user_id in set(user_ids)))
+
+def cached_response(scope_func):
+    """Serve a GET view from the response cache.
+    
+    scope_func names the invalidation scope of the current request; the key
+    also covers the normalized query string. Only 200 responses are stored,
+    together with their ETag so cached hits still answer 304s. Coroutine
+    views get a coroutine wrapper.
+    """
+    def lookup():
+        cache = get_response_cache()
+        key = cache.key(scope_func(), request.path, sorted(request.args.items(multi=True)))
+        entry = cache.get(key)
+        
+        if entry is None:
+            return cache, key, None
+        
+        if is_not_modified(entry['etag']):
+            response = not_modified_response(entry['etag'], entry['last_modified'])
+        else:
+            response = current_app.response_class(entry['body'], mimetype=entry['mimetype'])
+            response.headers.update(entry['headers'])
+        response.headers['X-Cache'] = 'HIT'
+        return cache, key, response
+    
+    def store(cache, key, rv):
+        response = make_response(rv)
+        if response.status_code == 200:
+            cache.set(key, {
+                'body': response.get_data(),
+                'mimetype': response.mimetype,
+                'headers': {
+                    name: response.headers[name]
+                    for name in ('ETag', 'Last-Modified', 'Cache-Control')
+                    if name in response.headers
+                },
+                'etag': response.get_etag()[0],
+                'last_modified': response.last_modified
+            })
+        response.headers['X-Cache'] = 'MISS'
+        return response
+    
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                if not get_response_cache().enabled:
+                    return await view(*args, **kwargs)
+                cache, key, hit = lookup()
+                if hit is not None:
+                    return hit
+                return store(cache, key, await view(*args, **kwargs))
+            return async_wrapper
+        
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not get_response_cache().enabled:
+                return view(*args, **kwargs)
+            cache, key, hit = lookup()
+            if hit is not None:
+                return hit
+            return store(cache, key, view(*args, **kwargs))
+        return wrapper
+    return decorator
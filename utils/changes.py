@@ -0,0 +1,117 @@
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select
+from utils.engine import sqlite_object_exists
+
+CHANGE_TRIGGER = 'task_changes_ai'
+
+# Like the counters, the change log is written by triggers so bulk writes,
+# the async views and cascade deletes are all recorded, in the writing
+# transaction. Every change replaces the task's previous entry for the same
+# owner, so the log holds one upsert per live task plus tombstones. Entries
+# are per owner because SQLite may hand a deleted task's id to a new task
+# of another user, whose upsert must not erase the first owner's tombstone.
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+CHANGE_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ai AFTER INSERT ON tasks BEGIN "
+    "DELETE FROM task_changes WHERE task_id = new.id AND user_id = new.user_id; "
+    "INSERT INTO task_changes (task_id, user_id, op, changed_at) "
+    f"VALUES (new.id, new.user_id, 'upsert', {_NOW}); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_au AFTER UPDATE ON tasks BEGIN "
+    "DELETE FROM task_changes WHERE task_id = new.id AND user_id IN (old.user_id, new.user_id); "
+    "INSERT INTO task_changes (task_id, user_id, op, changed_at) "
+    f"SELECT old.id, old.user_id, 'delete', {_NOW} WHERE old.user_id != new.user_id; "
+    "INSERT INTO task_changes (task_id, user_id, op, changed_at) "
+    f"VALUES (new.id, new.user_id, 'upsert', {_NOW}); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ad AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM task_changes WHERE task_id = old.id AND user_id = old.user_id; "
+    "INSERT INTO task_changes (task_id, user_id, op, changed_at) "
+    f"VALUES (old.id, old.user_id, 'delete', {_NOW}); END",
+]
+
+def install_change_log(conn, backfill=True):
+    """Create the change log triggers (the table must exist); a no-op off SQLite.
+    
+    backfill logs an upsert for every existing task, so a first sync sees them.
+    """
+    if conn.dialect.name != 'sqlite':
+        return False
+    for statement in CHANGE_DDL:
+        conn.exec_driver_sql(statement)
+    if backfill:
+        conn.exec_driver_sql(
+            "INSERT INTO task_changes (task_id, user_id, op, changed_at) "
+            f"SELECT id, user_id, 'upsert', {_NOW} FROM tasks WHERE NOT EXISTS ("
+            "SELECT 1 FROM task_changes WHERE task_id = tasks.id AND user_id = tasks.user_id"
+            ") ORDER BY id"
+        )
+    return True
+
+def change_log_available(session):
+    """Whether the database serving the session's reads records task changes"""
+    return sqlite_object_exists(session, 'trigger', CHANGE_TRIGGER)
+
+def compaction_horizon(session):
+    """Highest seq pruned so far; sync tokens below it may have missed deletes"""
+    from models.task_change import TaskChangeCompaction
+    
+    return session.scalar(select(func.coalesce(func.max(TaskChangeCompaction.seq), 0)))
+
+def compact_change_log(conn, retention):
+    """Prune tombstones older than retention (a timedelta); returns how many went.
+    
+    Upserts are never pruned: there is one per live task, and a full sync
+    reads them.
+    """
+    from models.task_change import TaskChange, TaskChangeCompaction
+    
+    now = datetime.utcnow()
+    expired = (TaskChange.op == 'delete') & (TaskChange.changed_at < now - retention)
+    horizon = conn.scalar(select(func.max(TaskChange.seq)).where(expired))
+    if horizon is None:
+        return 0
+    
+    pruned = conn.execute(delete(TaskChange).where(expired, TaskChange.seq <= horizon)).rowcount
+    conn.execute(insert(TaskChangeCompaction).values(seq=horizon, compacted_at=now, pruned=pruned))
+    return pruned
+
+def read_changes(conn, after, user_id=None, limit=None, upserts_only=False):
+    """Log entries past seq `after` (of one user, or everyone's), oldest first.
+    
+    Returns (user_id, entry) pairs; entries are {'seq', 'op': 'upsert', 'task'}
+    or {'seq', 'op': 'delete', 'id'}. conn may be a connection or a session.
+    """
+    from models.task import Task
+    from models.task_change import TaskChange
+    from schemas.serializers import dump_task
+    
+    query = (
+        select(TaskChange.seq, TaskChange.task_id, TaskChange.user_id.label('owner_id'), TaskChange.op,
+               *(getattr(Task, name) for name in dump_task.fields))
+        .outerjoin(Task, (Task.id == TaskChange.task_id) & (Task.user_id == TaskChange.user_id))
+        .where(TaskChange.seq > after)
+        .order_by(TaskChange.seq)
+    )
+    if user_id is not None:
+        query = query.where(TaskChange.user_id == user_id)
+    if upserts_only:
+        query = query.where(TaskChange.op == 'upsert')
+    if limit is not None:
+        query = query.limit(limit)
+    
+    changes = []
+    for row in conn.execute(query):
+        if row.op == 'delete' or row.id is None:
+            entry = {'seq': row.seq, 'op': 'delete', 'id': row.task_id}
+        else:
+            entry = {'seq': row.seq, 'op': 'upsert', 'task': dump_task(row)}
+        changes.append((row.owner_id, entry))
+    return changes
+
+def change_log_head(conn, user_id=None):
+    """Highest seq logged (for one user, or overall); 0 for an empty log"""
+    from models.task_change import TaskChange
+    
+    query = select(func.coalesce(func.max(TaskChange.seq), 0))
+    if user_id is not None:
+        query = query.where(TaskChange.user_id == user_id)
+    return conn.scalar(query)
@@ -0,0 +1,25 @@
+import hashlib
+from flask import request, current_app
+from werkzeug.http import is_resource_modified
+
+def make_etag(*parts):
+    """Opaque validator derived from the values that determine a response"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+def is_not_modified(etag, last_modified=None):
+    """Whether the request's If-None-Match / If-Modified-Since match the validators"""
+    if not request.if_none_match and not (last_modified and request.if_modified_since):
+        return False
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+def add_validators(response, etag, last_modified=None):
+    """Attach validators and ask clients to revalidate before reusing the body"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified_response(etag, last_modified=None):
+    return add_validators(current_app.response_class(status=304), etag, last_modified)
@@ -0,0 +1,130 @@
+from sqlalchemy import case, func, select
+from utils.engine import sqlite_object_exists
+
+COUNTER_TRIGGER = 'user_task_stats_ai'
+
+# Triggers keep user_task_stats in step with every write path: ORM and bulk
+# writes, the async views and the cascade delete of a user's tasks. They
+# run in the writing transaction, so counters commit or roll back with it.
+_ENSURE_ROW = (
+    "INSERT OR IGNORE INTO user_task_stats (user_id, total, completed, version) "
+    "VALUES (new.user_id, 0, 0, 0); "
+)
+_ADD_NEW = (
+    "UPDATE user_task_stats SET total = total + 1, completed = completed + new.completed, "
+    "version = version + 1, "
+    "last_modified = max(coalesce(last_modified, new.updated_at), new.updated_at) "
+    "WHERE user_id = new.user_id; "
+)
+_REMOVE_OLD = (
+    "UPDATE user_task_stats SET total = total - 1, completed = completed - old.completed, "
+    "version = version + 1 WHERE user_id = old.user_id; "
+)
+COUNTER_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS user_task_stats_ai AFTER INSERT ON tasks BEGIN "
+    f"{_ENSURE_ROW}{_ADD_NEW}END",
+    f"CREATE TRIGGER IF NOT EXISTS user_task_stats_ad AFTER DELETE ON tasks BEGIN "
+    f"{_REMOVE_OLD}END",
+    f"CREATE TRIGGER IF NOT EXISTS user_task_stats_au AFTER UPDATE ON tasks BEGIN "
+    f"{_ENSURE_ROW}{_REMOVE_OLD}{_ADD_NEW}END",
+]
+
+def install_task_counters(conn, rebuild=True):
+    """Create the counter triggers (the table must exist); a no-op off SQLite"""
+    if conn.dialect.name != 'sqlite':
+        return False
+    for statement in COUNTER_DDL:
+        conn.exec_driver_sql(statement)
+    if rebuild:
+        repair_task_counters(conn)
+    return True
+
+def counters_available(session):
+    """Whether the database serving the session's reads maintains the counters"""
+    return sqlite_object_exists(session, 'trigger', COUNTER_TRIGGER)
+
+def read_task_counts(session, user_id=None):
+    """(total, completed, version, last_modified) for one user, or summed over all users.
+    
+    Returns None when the database does not maintain the counters.
+    """
+    from models.user_task_stats import UserTaskStats
+    
+    if not counters_available(session):
+        return None
+    
+    if user_id is not None:
+        row = session.execute(
+            select(UserTaskStats.total, UserTaskStats.completed,
+                   UserTaskStats.version, UserTaskStats.last_modified)
+            .where(UserTaskStats.user_id == user_id)
+        ).first()
+    else:
+        row = session.execute(select(
+            func.coalesce(func.sum(UserTaskStats.total), 0),
+            func.coalesce(func.sum(UserTaskStats.completed), 0),
+            func.coalesce(func.sum(UserTaskStats.version), 0),
+            func.max(UserTaskStats.last_modified)
+        )).first()
+    return tuple(row) if row is not None else (0, 0, 0, None)
+
+def expected_task_counts(conn):
+    """{user_id: (total, completed, last_modified)} computed from the tasks table"""
+    from models.task import Task
+    
+    rows = conn.execute(
+        select(
+            Task.user_id,
+            func.count(Task.id),
+            func.coalesce(func.sum(case((Task.completed, 1), else_=0)), 0),
+            func.max(Task.updated_at)
+        ).group_by(Task.user_id)
+    )
+    return {user_id: (total, completed, last_modified) for user_id, total, completed, last_modified in rows}
+
+def find_counter_drift(conn, expected=None):
+    """Users whose counters disagree with their tasks: [(user_id, expected, actual)]"""
+    from models.user_task_stats import UserTaskStats
+    
+    if expected is None:
+        expected = expected_task_counts(conn)
+    actual = {
+        user_id: (total, completed)
+        for user_id, total, completed in conn.execute(
+            select(UserTaskStats.user_id, UserTaskStats.total, UserTaskStats.completed)
+        )
+    }
+    drift = []
+    for user_id in sorted(expected.keys() | actual.keys()):
+        want = expected.get(user_id, (0, 0, None))[:2]
+        have = actual.get(user_id)
+        if have != want and not (have is None and want == (0, 0)):
+            drift.append((user_id, want, have))
+    return drift
+
+def repair_task_counters(conn):
+    """Rewrite the counters that drifted from the tasks table; returns the drift found.
+    
+    Repaired rows get a new version, so cached listing validators change.
+    """
+    from models.user_task_stats import UserTaskStats
+    
+    expected = expected_task_counts(conn)
+    drift = find_counter_drift(conn, expected)
+    table = UserTaskStats.__table__
+    
+    for user_id, (total, completed), have in drift:
+        values = {
+            'total': total,
+            'completed': completed,
+            'last_modified': expected.get(user_id, (0, 0, None))[2]
+        }
+        if have is None:
+            conn.execute(table.insert().values(user_id=user_id, version=1, **values))
+        else:
+            conn.execute(
+                table.update()
+                .where(table.c.user_id == user_id)
+                .values(version=table.c.version + 1, **values)
+            )
+    return drift
@@ -0,0 +1,108 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, func, select
+from utils.cache import invalidate_listings
+from utils.counters import read_task_counts
+from utils.jobs import job_handler
+
+# Deleting a user removes their tasks in chunks of set-based DELETEs, each
+# in its own short transaction, so other writers interleave and progress is
+# visible while it runs. The tasks triggers keep the counters, search index
+# and change log in step with every chunk. The user row goes last, together
+# with any task created since the last chunk. Large accounts are deleted by
+# a 'delete_user' job.
+
+def count_user_tasks(session, user_id):
+    counts = read_task_counts(session, user_id)
+    if counts is not None:
+        return counts[0]
+    from models.task import Task
+    return session.scalar(select(func.count()).select_from(Task).where(Task.user_id == user_id))
+
+def delete_task_chunk(session, user_id, chunk_size):
+    """Delete up to chunk_size of the user's tasks; returns how many went"""
+    from models.task import Task
+    
+    ids = session.scalars(select(Task.id).where(Task.user_id == user_id).limit(chunk_size)).all()
+    if not ids:
+        return 0
+    return session.execute(
+        delete(Task).where(Task.id.in_(ids), Task.user_id == user_id),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+
+def request_user_deletion(session, user, requested_by=None):
+    """Record a deletion of user and revoke their tokens; commits.
+    
+    Returns (deletion, created). An unfinished or failed deletion of the
+    same user is returned as is, so it can be resumed.
+    """
+    from models.user_deletion import UserDeletion
+    
+    deletion = session.scalars(
+        select(UserDeletion)
+        .where(UserDeletion.user_id == user.id, UserDeletion.status != 'completed')
+        .order_by(UserDeletion.id)
+    ).first()
+    if deletion is not None:
+        return deletion, False
+    
+    deletion = UserDeletion(
+        user_id=user.id,
+        username=user.username,
+        requested_by=requested_by,
+        total=count_user_tasks(session, user.id)
+    )
+    user.revoke_tokens()
+    session.add(deletion)
+    session.commit()
+    return deletion, True
+
+def run_user_deletion(session, deletion_id, chunk_size, on_progress=None):
+    """Delete the user's tasks chunk by chunk, then the user; returns the deletion.
+    
+    Safe to re-run after a crash or failure: it carries on from the tasks
+    left. on_progress(deleted, total) is called after each chunk.
+    """
+    from models.user import User
+    from models.user_deletion import UserDeletion
+    
+    deletion = session.get(UserDeletion, deletion_id)
+    if deletion is None or deletion.status == 'completed':
+        return deletion
+    deletion.status = 'running'
+    deletion.error = None
+    session.commit()
+    
+    try:
+        while deleted := delete_task_chunk(session, deletion.user_id, chunk_size):
+            deletion.deleted = UserDeletion.deleted + deleted
+            session.commit()
+            invalidate_listings([deletion.user_id])
+            if on_progress is not None:
+                on_progress(deletion.deleted, deletion.total)
+        
+        user = session.get(User, deletion.user_id)
+        if user is not None:
+            session.delete(user)
+        deletion.status = 'completed'
+        deletion.finished_at = datetime.utcnow()
+        session.commit()
+        invalidate_listings([deletion.user_id])
+    except Exception as err:
+        session.rollback()
+        deletion.status = 'failed'
+        deletion.error = str(err)
+        deletion.finished_at = datetime.utcnow()
+        session.commit()
+        raise
+    return deletion
+
+@job_handler('delete_user')
+def delete_user_job(context):
+    """Job body for deletions too large to run within the request"""
+    deletion = run_user_deletion(
+        context.session, context.payload['deletion_id'], current_app.config['USER_DELETE_CHUNK_SIZE'],
+        on_progress=context.progress
+    )
+    return {'deletion_id': deletion.id, 'deleted': deletion.deleted} if deletion is not None else None
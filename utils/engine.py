@@ -0,0 +1,100 @@
+import weakref
+from sqlalchemy import column, event, select, table
+from sqlalchemy.engine import make_url
+
+# Pool settings per backend, applied when DB_ENGINE_TUNING is enabled.
+# Server databases are pre-pinged and recycled before common idle cutoffs
+# (load balancers, MySQL's wait_timeout) can drop pooled connections.
+DRIVER_PRESETS = {
+    'sqlite': {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 30
+    },
+    'postgresql': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True
+    },
+    'mysql': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 280,
+        'pool_pre_ping': True
+    }
+}
+
+# Config keys that override a single preset value when set
+POOL_OVERRIDES = {
+    'DB_POOL_SIZE': 'pool_size',
+    'DB_MAX_OVERFLOW': 'max_overflow',
+    'DB_POOL_TIMEOUT': 'pool_timeout',
+    'DB_POOL_RECYCLE': 'pool_recycle'
+}
+
+_sqlite_master = table('sqlite_master', column('type'), column('name'))
+_schema_objects = weakref.WeakKeyDictionary()  # engine -> {(type, name): present}
+
+def is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(config, url=None):
+    """create_engine() keyword arguments for the configured engine profile.
+    
+    Starts from the driver preset, applies the DB_POOL_* overrides and
+    finally any explicit SQLALCHEMY_ENGINE_OPTIONS. Without DB_ENGINE_TUNING
+    only the explicit options are returned.
+    """
+    explicit = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if not config.get('DB_ENGINE_TUNING'):
+        return explicit
+    
+    url = make_url(url or config['SQLALCHEMY_DATABASE_URI'])
+    if is_memory_sqlite(url):
+        return explicit  # A single shared connection (StaticPool); nothing to size
+    
+    options = dict(DRIVER_PRESETS.get(url.get_backend_name(), {}))
+    for key, option in POOL_OVERRIDES.items():
+        if config.get(key) is not None:
+            options[option] = config[key]
+    options.update(explicit)
+    return options
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run PRAGMA statements on every new connection of a SQLite engine.
+    
+    Works for async engines too when given their sync_engine.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+def tune_engine(engine, config):
+    """Apply the per-connection part of the engine profile"""
+    if config.get('DB_ENGINE_TUNING'):
+        install_sqlite_pragmas(engine, config.get('SQLITE_PRAGMAS'))
+
+def sqlite_object_exists(session, type_, name):
+    """Whether the database serving the session's reads has the SQLite table or trigger.
+    
+    Checked once per engine. Reads may be routed to a replica (see
+    utils/replicas.py), so the engine a SELECT would use is probed, not
+    the primary. Always False off SQLite.
+    """
+    query = select(_sqlite_master.c.name).where(_sqlite_master.c.type == type_, _sqlite_master.c.name == name)
+    engine = session.get_bind(clause=query)
+    present = _schema_objects.setdefault(engine, {})
+    if (type_, name) not in present:
+        present[(type_, name)] = engine.dialect.name == 'sqlite' and session.execute(
+            query, bind_arguments={'bind': engine}
+        ).first() is not None
+    return present[(type_, name)]
@@ -0,0 +1,309 @@
+import queue
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.utils import import_string
+from app import db
+from utils.changes import change_log_head, compaction_horizon, read_changes
+
+class EventBackend:
+    """Carries "the task change log moved" notices between worker processes.
+    
+    Shared backends (e.g. Redis pub/sub or PostgreSQL LISTEN/NOTIFY) deliver
+    every published message to each process, the sender included, by
+    calling the callback given to start() from their listener thread.
+    Messages carry no task data: each hub reads new entries from the log.
+    """
+    
+    name = 'base'
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+    
+    def start(self, deliver):
+        raise NotImplementedError
+    
+    def publish(self, message):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+class LocalBackend(EventBackend):
+    """Hands notices straight to this process's hub, so only streams of the writing process hear it"""
+    
+    name = 'local'
+    
+    def __init__(self):
+        self._deliver = None
+    
+    def start(self, deliver):
+        self._deliver = deliver
+    
+    def publish(self, message):
+        if self._deliver is not None:
+            self._deliver(message)
+
+BACKENDS = {'local': LocalBackend}
+
+class TooManyStreams(Exception):
+    """Raised when EVENTS_MAX_STREAMS streams are open; surfaced to clients as 503"""
+
+class Subscription:
+    """One stream's bounded queue of change log entries.
+    
+    A stream that falls behind does not hold events without limit: once its
+    queue is full, further entries are dropped and `overflowed` is set, and
+    the stream catches up from the change log instead.
+    """
+    
+    def __init__(self, user_id, last_seq, maxsize):
+        self.user_id = user_id  # None follows every user's tasks
+        self.last_seq = last_seq
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize)
+    
+    def matches(self, owner_id):
+        return self.user_id is None or self.user_id == owner_id
+    
+    def put(self, entry):
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+    
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def clear(self):
+        self.overflowed = False
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+class EventHub:
+    """Fans task change log entries out to this process's streams.
+    
+    Notices only wake the hub's delivery thread, which reads the entries
+    logged since the last one it delivered, once for all of its
+    subscribers; notices arriving meanwhile are served by that one read.
+    Committing sessions never wait on it. SQLite serializes writers, so
+    seqs are assigned in commit order and a notice never finds a gap that
+    a slower transaction fills in later.
+    """
+    
+    def __init__(self, app, backend, queue_size, max_streams=None):
+        self.app = app
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_streams = max_streams
+        self.delivered_seq = None  # Unknown until someone subscribes
+        self._engine = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._notices = queue.Queue()
+        self._thread = None
+        self._stats = {'notices': 0, 'delivered': 0, 'dropped': 0}
+        backend.start(self.deliver)
+    
+    def _connect(self):
+        if self._engine is None:
+            with self.app.app_context():
+                self._engine = db.engine
+        return self._engine.connect()
+    
+    def subscribe(self, user_id):
+        """Register a stream; raises TooManyStreams once max_streams are open"""
+        with self._lock:
+            if self.max_streams is not None and len(self._subscribers) >= self.max_streams:
+                raise TooManyStreams()
+            if self._thread is None:
+                # Started here rather than at init, to stay out of pre-fork masters
+                self._thread = threading.Thread(target=self._work, name='event-hub', daemon=True)
+                self._thread.start()
+            if self.delivered_seq is None:
+                with self._connect() as conn:
+                    self.delivered_seq = change_log_head(conn)
+            subscription = Subscription(user_id, self.delivered_seq, self.queue_size)
+            self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            if not self._subscribers:
+                self.delivered_seq = None
+    
+    def publish(self):
+        """Notify every process's hub that task writes were committed"""
+        self.backend.publish({'type': 'tasks'})
+    
+    def deliver(self, message):
+        """Backend callback: queue the notice for the delivery thread"""
+        with self._lock:
+            self._stats['notices'] += 1
+            if not self._subscribers:
+                return
+        self._notices.put(message)
+    
+    def flush(self):
+        """Wait until every notice queued so far has been delivered"""
+        self._notices.join()
+    
+    def _work(self):
+        while True:
+            pending = [self._notices.get()]
+            while True:
+                try:
+                    pending.append(self._notices.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._read_new()
+            except Exception:
+                self.app.logger.exception('Event delivery failed')
+            finally:
+                for _ in pending:
+                    self._notices.task_done()
+    
+    def _read_new(self):
+        with self._lock:
+            after = self.delivered_seq
+        if after is None:
+            return
+        with self._connect() as conn:
+            changes = read_changes(conn, after)
+        with self._lock:
+            for owner_id, entry in changes:
+                for subscription in self._subscribers:
+                    if subscription.matches(owner_id):
+                        self._stats['delivered' if subscription.put(entry) else 'dropped'] += 1
+            if changes and self.delivered_seq is not None:
+                self.delivered_seq = max(self.delivered_seq, changes[-1][1]['seq'])
+    
+    def replay(self, user_id, after, page_size=500):
+        """Yield entries logged after seq `after` in pages, without holding a read transaction"""
+        while True:
+            with self._connect() as conn:
+                changes = read_changes(conn, after, user_id, limit=page_size)
+            for _, entry in changes:
+                yield entry
+            if len(changes) < page_size:
+                return
+            after = changes[-1][1]['seq']
+    
+    def expired(self, seq):
+        """Whether compaction pruned entries after seq, so a replay would miss deletes"""
+        with self._connect() as conn:
+            return 0 < seq < compaction_horizon(conn)
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['subscribers'] = len(self._subscribers)
+        stats['backend'] = self.backend.name
+        return stats
+
+def format_event(entry):
+    return f"id: {entry['seq']}\nevent: {entry['op']}\ndata: {current_app.json.dumps(entry)}\n\n"
+
+def event_stream(hub, subscription, last_event_id=None):
+    """Server-sent events for one subscription until EVENTS_STREAM_TIMEOUT.
+    
+    With last_event_id the stream first replays what the client missed
+    (or sends a `reset` event when compaction pruned it). Comments are
+    sent as heartbeats while idle. The caller unsubscribes once the
+    response closes.
+    """
+    config = current_app.config
+    user_id = subscription.user_id
+    yield f"retry: {config['EVENTS_RETRY_MS']}\n\n"
+    
+    def catch_up(after):
+        for entry in hub.replay(user_id, after):
+            subscription.last_seq = max(subscription.last_seq, entry['seq'])
+            yield format_event(entry)
+    
+    if last_event_id is not None:
+        if hub.expired(last_event_id):
+            yield 'event: reset\ndata: {}\n\n'
+        else:
+            subscription.last_seq = max(subscription.last_seq, last_event_id)
+            yield from catch_up(last_event_id)
+    
+    deadline = time.monotonic() + config['EVENTS_STREAM_TIMEOUT']
+    while (remaining := deadline - time.monotonic()) > 0:
+        if subscription.overflowed:
+            subscription.clear()
+            yield from catch_up(subscription.last_seq)
+            continue
+        entry = subscription.get(min(config['EVENTS_HEARTBEAT_INTERVAL'], remaining))
+        if entry is None:
+            yield ': keep-alive\n\n'
+        elif entry['seq'] > subscription.last_seq:
+            subscription.last_seq = entry['seq']
+            yield format_event(entry)
+
+def get_event_hub():
+    return current_app.extensions.get('event_hub')
+
+# Sessions flag transactions that wrote tasks, through the unit of work or
+# bulk statements, and notify the hub once they commit. The listeners are
+# on the Session class, so sync and async sessions are both covered.
+
+def _is_task(obj):
+    from models.task import Task
+    return isinstance(obj, Task)
+
+def _is_user(obj):
+    from models.user import User
+    return isinstance(obj, User)
+
+def _after_flush(session, flush_context):
+    if any(_is_task(obj) for objects in (session.new, session.dirty, session.deleted) for obj in objects):
+        session.info['task_writes'] = True
+    elif any(_is_user(obj) for obj in session.deleted):
+        # Its tasks were deleted in SQL, without loading them
+        session.info['task_writes'] = True
+
+def _do_orm_execute(state):
+    from models.task import Task
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is Task:
+        state.session.info['task_writes'] = True
+
+def _after_commit(session):
+    if session.info.pop('task_writes', False) and has_app_context():
+        hub = get_event_hub()
+        if hub is not None:
+            hub.publish()
+
+def _after_rollback(session):
+    session.info.pop('task_writes', None)
+
+def init_events(app):
+    """Create the event hub behind GET /api/tasks/stream"""
+    if not app.config['EVENTS_ENABLED']:
+        return
+    
+    backend_name = app.config['EVENTS_BACKEND']
+    backend_class = BACKENDS.get(backend_name) or import_string(backend_name)
+    app.extensions['event_hub'] = EventHub(
+        app, backend_class.from_config(app.config), app.config['EVENTS_QUEUE_SIZE'],
+        max_streams=app.config['EVENTS_MAX_STREAMS'])
+    
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
@@ -0,0 +1,41 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def ndjson_chunks(fields, rows, chunk_size):
+    """Yield newline-delimited JSON, one object per row, chunk_size rows at a time"""
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    buffer = []
+    for row in rows:
+        buffer.append(encode(dict(zip(fields, map(_plain, row)))))
+        if len(buffer) >= chunk_size:
+            yield '\n'.join(buffer) + '\n'
+            buffer.clear()
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+def csv_chunks(fields, rows, chunk_size):
+    """Yield CSV with a header line, chunk_size rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    pending = 0
+    for row in rows:
+        writer.writerow(map(_plain, row))
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+# format -> (mimetype, chunk generator)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', ndjson_chunks),
+    'csv': ('text/csv', csv_chunks),
+}
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app import db
+from models.user import User
+
+class Identity:
+    """Lightweight view of the authenticated user used for authorization"""
+    
+    __slots__ = ('id', 'role')
+    
+    def __init__(self, id, role):
+        self.id = id
+        self.role = role
+    
+    def is_admin(self):
+        return self.role == 'admin'
+    
+    def __repr__(self):
+        return f'<Identity {self.id} ({self.role})>'
+
+class IdentityCache:
+    """Thread-safe LRU of user id -> (role, token_version) with a time-to-live per entry"""
+    
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            state, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return state
+    
+    def set(self, user_id, state):
+        with self._lock:
+            self._entries[user_id] = (state, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def configure(self, maxsize, ttl):
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._entries.clear()
+
+identity_cache = IdentityCache()
+
+def get_user_state(user_id):
+    """Return (role, token_version) for user_id, or None if the user is gone.
+    
+    Served from the process-wide cache when IDENTITY_CACHE_ENABLED is set.
+    Async views point g.identity_session at their own session.
+    """
+    use_cache = current_app.config.get('IDENTITY_CACHE_ENABLED', False)
+    state = identity_cache.get(user_id) if use_cache else None
+    if state is None:
+        session = g.get('identity_session') or db.session
+        row = session.query(User.role, User.token_version).filter(User.id == user_id).first()
+        state = (row.role, row.token_version) if row else None
+        if state is not None and use_cache:
+            identity_cache.set(user_id, state)
+    return state
+
+def is_token_revoked(jwt_data):
+    """A token is revoked once its user is deleted or its version is bumped"""
+    if not current_app.config.get('JWT_REVOCATION_CHECK', True):
+        return False
+    state = get_user_state(int(jwt_data['sub']))
+    return state is None or jwt_data.get('ver', 0) != state[1]
+
+def load_identity(jwt_data):
+    """Build the caller's Identity from the token claims.
+    
+    Tokens issued before role claims existed fall back to the stored role.
+    """
+    user_id = int(jwt_data['sub'])
+    role = jwt_data.get('role')
+    if role is None:
+        state = get_user_state(user_id)
+        if state is None:
+            return None
+        role = state[0]
+    return Identity(user_id, role)
+
+def _pending_invalidations(target):
+    return object_session(target).info.setdefault('identity_invalidations', set())
+
+@event.listens_for(User, 'before_update')
+def _revoke_tokens_on_role_change(mapper, connection, target):
+    # Outstanding tokens carry the old role claim, so they must stop working
+    if inspect(target).attrs.role.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
+
+@event.listens_for(User, 'after_update')
+def _track_role_change(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.role.history.has_changes() or attrs.token_version.history.has_changes():
+        _pending_invalidations(target).add(target.id)
+
+@event.listens_for(User, 'after_delete')
+def _track_user_delete(mapper, connection, target):
+    _pending_invalidations(target).add(target.id)
+
+# Registered on every Session so async sessions evict identities too
+@event.listens_for(Session, 'after_commit')
+def _evict_changed_identities(session):
+    # Evict only once the change is visible to other sessions, so a
+    # concurrent request cannot re-cache the old role.
+    for user_id in session.info.pop('identity_invalidations', ()):
+        identity_cache.invalidate(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_invalidations(session):
+    session.info.pop('identity_invalidations', None)
@@ -0,0 +1,357 @@
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from utils.export import EXPORT_FORMATS
+
+# Job kind -> handler(context), registered with @job_handler next to the
+# code that enqueues them. A handler returns the job's (JSON) result.
+# Failed attempts are retried, so handlers must be safe to run again:
+# they pick up from context.job.progress or redo their work from scratch.
+JOB_HANDLERS = {}
+
+EXPIRY_INTERVAL = 3600  # Seconds between sweeps for expired jobs in each process
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a different request"""
+
+class JobLeaseLost(Exception):
+    """The job's lease expired and another worker took it over"""
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+def fingerprint(kind, payload):
+    canonical = json.dumps([kind, payload], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def find_idempotent_job(session, user_id, idempotency_key):
+    from models.job import Job
+    
+    return session.scalars(
+        select(Job).where(Job.user_id == user_id, Job.idempotency_key == idempotency_key)
+    ).first()
+
+def enqueue(session, kind, payload, user_id=None, idempotency_key=None, max_attempts=None):
+    """Queue a job and commit; returns (job, created).
+    
+    With an idempotency key, the job this user queued under the same key is
+    returned instead, or IdempotencyConflict raised if it was for a
+    different request.
+    """
+    from models.job import Job
+    
+    digest = fingerprint(kind, payload)
+    if idempotency_key is not None:
+        job = find_idempotent_job(session, user_id, idempotency_key)
+        if job is not None:
+            if job.fingerprint != digest:
+                raise IdempotencyConflict(idempotency_key)
+            return job, False
+    
+    job = Job(
+        kind=kind,
+        payload=payload,
+        fingerprint=digest,
+        user_id=user_id,
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts or current_app.config['JOBS_MAX_ATTEMPTS']
+    )
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won the insert
+        session.rollback()
+        if idempotency_key is None:
+            raise
+        job = find_idempotent_job(session, user_id, idempotency_key)
+        if job.fingerprint != digest:
+            raise IdempotencyConflict(idempotency_key)
+        return job, False
+    
+    get_job_queue().notify()
+    return job, True
+
+def export_path(job_id, export_format):
+    directory = current_app.config['JOBS_EXPORT_DIR'] or os.path.join(current_app.instance_path, 'exports')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'job-{job_id}.{export_format}')
+
+def remove_export_files(job_id):
+    """Delete a job's export file and any partial one left by a failed attempt"""
+    for export_format in EXPORT_FORMATS:
+        path = export_path(job_id, export_format)
+        for leftover in (path, f'{path}.part'):
+            try:
+                os.remove(leftover)
+            except FileNotFoundError:
+                pass
+
+def requeue(session, job):
+    """Queue a failed job again with a fresh set of attempts; commits"""
+    job.status = 'queued'
+    job.attempts = 0
+    job.error = None
+    job.run_after = datetime.utcnow()
+    job.finished_at = None
+    session.commit()
+    get_job_queue().notify()
+    return job
+
+class JobContext:
+    """What a handler gets: its job, payload and session, and progress reporting"""
+    
+    def __init__(self, session, job, worker_id):
+        self.session = session
+        self.job = job
+        self.job_id = job.id
+        self.payload = job.payload
+        self.worker_id = worker_id
+    
+    def progress(self, done, total=None, result=None):
+        """Record progress, renew the lease and commit the session.
+        
+        The handler's pending writes commit together with the progress, so
+        a retry can resume from context.job.progress. Raises JobLeaseLost
+        when another worker has taken the job over.
+        """
+        from models.job import Job
+        
+        values = {'progress': done, 'locked_at': datetime.utcnow()}
+        if total is not None:
+            values['total'] = total
+        if result is not None:
+            values['result'] = result
+        renewed = self.session.execute(
+            update(Job).where(Job.id == self.job_id, Job.locked_by == self.worker_id).values(**values),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        if not renewed:
+            self.session.rollback()
+            raise JobLeaseLost(self.job_id)
+        self.session.commit()
+
+class JobQueue:
+    """Runs queued jobs on a pool of worker threads.
+    
+    Jobs live in the jobs table, so any number of processes (web workers,
+    run_jobs.py) can share the queue: a job is claimed with a conditional
+    UPDATE, and one whose worker stops renewing its lease is retried.
+    notify() wakes this process's workers at once; jobs queued elsewhere
+    are picked up within poll_interval.
+    """
+    
+    def __init__(self, app, workers=2, poll_interval=1.0, lease_timeout=300, retry_backoff=5, retention=None):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.retry_backoff = retry_backoff
+        self.retention = retention  # timedelta after which finished jobs are deleted; None keeps them
+        self._next_expiry = 0
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+    
+    @classmethod
+    def from_config(cls, app):
+        config = app.config
+        return cls(
+            app,
+            workers=config['JOBS_WORKERS'],
+            poll_interval=config['JOBS_POLL_INTERVAL'],
+            lease_timeout=config['JOBS_LEASE_TIMEOUT'],
+            retry_backoff=config['JOBS_RETRY_BACKOFF'],
+            retention=timedelta(days=config['JOBS_RETENTION_DAYS']) if config['JOBS_RETENTION_DAYS'] else None
+        )
+    
+    @property
+    def running(self):
+        return bool(self._threads)
+    
+    def start(self):
+        """Start the worker threads (once)"""
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            prefix = f'{socket.gethostname()}:{os.getpid()}'
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(f'{prefix}:{index}',), name=f'job-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def stop(self, timeout=None):
+        """Stop the workers once their current jobs finish"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in threads:
+            thread.join(timeout)
+    
+    def notify(self):
+        self._wakeup.set()
+    
+    def claim(self, session, worker_id):
+        """Take the oldest ready job, after requeueing those whose lease expired"""
+        from models.job import Job
+        
+        now = datetime.utcnow()
+        exhausted = Job.attempts >= Job.max_attempts
+        session.execute(
+            update(Job)
+            .where(Job.status == 'running', Job.locked_at < now - timedelta(seconds=self.lease_timeout))
+            .values(
+                status=case((exhausted, 'failed'), else_='queued'),
+                finished_at=case((exhausted, now), else_=None),
+                error='Worker stopped before the job finished',
+                locked_by=None,
+                locked_at=None
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        
+        while True:
+            job_id = session.scalar(
+                select(Job.id)
+                .where(Job.status == 'queued', Job.run_after <= now)
+                .order_by(Job.run_after, Job.id)
+                .limit(1)
+            )
+            if job_id is None:
+                session.commit()
+                return None
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'queued')
+                .values(status='running', locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1),
+                execution_options={'synchronize_session': False}
+            ).rowcount
+            session.commit()
+            if claimed:
+                return session.get(Job, job_id, populate_existing=True)
+            # Another worker claimed it first; try the next one
+    
+    def execute(self, session, job, worker_id):
+        """Run one claimed job and record its outcome"""
+        job_id, kind, attempts, max_attempts = job.id, job.kind, job.attempts, job.max_attempts
+        handler = JOB_HANDLERS.get(kind)
+        try:
+            if handler is None:
+                raise LookupError(f'No handler for job type {kind!r}')
+            result = handler(JobContext(session, job, worker_id))
+        except JobLeaseLost:
+            session.rollback()
+            self.app.logger.warning('Job %s lost its lease to another worker', job_id)
+            return
+        except Exception as err:
+            session.rollback()
+            now = datetime.utcnow()
+            values = {'error': str(err) or err.__class__.__name__, 'locked_by': None, 'locked_at': None}
+            if handler is not None and attempts < max_attempts:
+                values.update(status='queued', run_after=now + timedelta(
+                    seconds=self.retry_backoff * 2 ** (attempts - 1)))
+                self.app.logger.warning('Job %s (%s) failed attempt %d, retrying', job_id, kind, attempts)
+            else:
+                values.update(status='failed', finished_at=now)
+                self.app.logger.exception('Job %s (%s) failed', job_id, kind)
+            self._record(session, job_id, worker_id, values)
+            return
+        
+        self._record(session, job_id, worker_id, {
+            'status': 'succeeded',
+            'result': result,
+            'error': None,
+            'finished_at': datetime.utcnow(),
+            'locked_by': None,
+            'locked_at': None
+        })
+    
+    def _record(self, session, job_id, worker_id, values):
+        from models.job import Job
+        
+        session.execute(
+            update(Job).where(Job.id == job_id, Job.locked_by == worker_id).values(**values),
+            execution_options={'synchronize_session': False}
+        )
+        session.commit()
+    
+    def expire(self, session):
+        """Delete jobs finished longer than retention ago, then their export files; returns how many"""
+        from models.job import Job
+        
+        if self.retention is None:
+            return 0
+        cutoff = datetime.utcnow() - self.retention
+        job_ids = session.scalars(
+            select(Job.id).where(Job.status.in_(('succeeded', 'failed')), Job.finished_at < cutoff)
+        ).all()
+        if not job_ids:
+            return 0
+        session.execute(delete(Job).where(Job.id.in_(job_ids)), execution_options={'synchronize_session': False})
+        session.commit()
+        for job_id in job_ids:
+            remove_export_files(job_id)
+        return len(job_ids)
+    
+    def expire_due(self, session):
+        """expire(), at most once per EXPIRY_INTERVAL across this process's workers"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_expiry:
+                return 0
+            self._next_expiry = now + EXPIRY_INTERVAL
+        return self.expire(session)
+    
+    def run_pending(self, worker_id=None):
+        """Run ready jobs in the calling thread until none is left; returns how many ran"""
+        worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        session = db.session
+        ran = 0
+        while (job := self.claim(session, worker_id)) is not None:
+            self.execute(session, job, worker_id)
+            ran += 1
+        return ran
+    
+    def _work(self, worker_id):
+        while not self._stopping.is_set():
+            with self.app.app_context():
+                try:
+                    self.run_pending(worker_id)
+                    self.expire_due(db.session)
+                except Exception:
+                    self.app.logger.exception('Job worker %s failed', worker_id)
+                finally:
+                    db.session.remove()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+def get_job_queue():
+    return current_app.extensions['job_queue']
+
+def init_jobs(app):
+    """Create the job queue; its workers start with the app's first request.
+    
+    Starting on a request rather than here keeps workers out of scripts
+    that build the app and out of pre-fork masters. With JOBS_WORKERS = 0
+    the app only queues jobs, for run_jobs.py processes to run.
+    """
+    queue = app.extensions['job_queue'] = JobQueue.from_config(app)
+    if queue.workers:
+        app.before_request(queue.start)
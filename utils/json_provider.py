@@ -0,0 +1,49 @@
+from flask.json.provider import DefaultJSONProvider
+from utils.metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's default provider, with response encoding reported as the serialization phase"""
+    
+    def response(self, *args, **kwargs):
+        with timed('serialization'):
+            return super().response(*args, **kwargs)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider encoding responses with orjson.
+    
+    Keys stay sorted and values orjson does not handle natively (dates,
+    decimals, dataclasses...) go through Flask's default hook, so payloads
+    match the default provider apart from escaping of non-ASCII text.
+    """
+    
+    def _options(self, indent=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+    
+    def response(self, *args, **kwargs):
+        with timed('serialization'):
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+            return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+def configure_json(app):
+    """Switch the app to orjson when JSON_USE_ORJSON is set and orjson is installed"""
+    if app.config.get('JSON_USE_ORJSON') and orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = JSONProvider(app)
@@ -0,0 +1,243 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as StatementCounter
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PHASES = ('jwt', 'validation', 'db', 'serialization')
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def get(self, *labels):
+        return self._values.get(labels, 0)
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (made cumulative when rendered), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+    
+    def sum(self, *labels):
+        series = self._series.get(labels)
+        return series[1] if series else 0.0
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket in zip((*self.buckets, '+Inf'), counts):
+                    cumulative += bucket
+                    le = bound if bound == '+Inf' else _number(float(bound))
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}")
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+        return lines
+
+class Metrics:
+    """Per-process request metrics, rendered in the Prometheus text format.
+    
+    Each worker process keeps its own registry; scrape every worker (or
+    aggregate them) when running several.
+    """
+    
+    def __init__(self):
+        self.requests = Counter(
+            'http_requests_total', 'Requests handled', ('endpoint', 'method', 'status'))
+        self.duration = Histogram(
+            'http_request_duration_seconds', 'Request handling time', ('endpoint', 'method'))
+        self.queries = Histogram(
+            'http_request_queries', 'SQL statements executed per request', ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.phases = Histogram(
+            'http_request_phase_seconds', 'Time per request spent in JWT decode, validation, SQL and serialization',
+            ('endpoint', 'phase'))
+        self.slow_queries = Counter(
+            'db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_THRESHOLD', ('endpoint',))
+    
+    def observe(self, endpoint, method, status, duration, request_metrics):
+        self.requests.inc(endpoint, method, str(status))
+        self.duration.observe(duration, endpoint, method)
+        self.queries.observe(request_metrics.query_count, endpoint)
+        for phase in PHASES:
+            self.phases.observe(request_metrics.phases.get(phase, 0.0), endpoint, phase)
+        if request_metrics.slow_queries:
+            self.slow_queries.inc(endpoint, amount=request_metrics.slow_queries)
+    
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.duration, self.queries, self.phases, self.slow_queries):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+class RequestMetrics:
+    """What one request spent its time on; statements are kept only for the query guard"""
+    
+    def __init__(self, slow_threshold, track_statements=False):
+        self.started = time.perf_counter()
+        self.slow_threshold = slow_threshold
+        self.query_count = 0
+        self.query_started = None
+        self.slow_queries = 0
+        self.phases = {}
+        self.statements = StatementCounter() if track_statements else None
+    
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+    
+    def record_query(self, statement, seconds):
+        self.query_count += 1
+        self.add('db', seconds)
+        if self.statements is not None:
+            self.statements[statement] += 1
+        if seconds >= self.slow_threshold:
+            self.slow_queries += 1
+            return True
+        return False
+
+def current_request_metrics():
+    return g.get('request_metrics') if has_request_context() else None
+
+@contextmanager
+def timed(phase):
+    """Add the block's duration to `phase` of the current request, if it is instrumented"""
+    metrics = current_request_metrics()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(phase, time.perf_counter() - started)
+
+class InstrumentedJWTManager(JWTManager):
+    """JWTManager that times token decoding (signature and claims checks)"""
+    
+    def _decode_jwt_from_config(self, *args, **kwargs):
+        with timed('jwt'):
+            return super()._decode_jwt_from_config(*args, **kwargs)
+
+# Statement listeners are registered on the Engine class, so the primary,
+# replica and async engines are all measured. Requests run their statements
+# one at a time, so the start time can live on the request's metrics.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics.query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = current_request_metrics()
+    if metrics is None or metrics.query_started is None:
+        return
+    seconds = time.perf_counter() - metrics.query_started
+    metrics.query_started = None
+    if metrics.record_query(statement, seconds) and current_app.config['QUERY_GUARD_ENABLED']:
+        current_app.logger.warning(
+            'Slow query (%.1f ms) in %s: %s', seconds * 1000, request.endpoint, statement)
+
+def get_metrics():
+    return current_app.extensions.get('metrics')
+
+def _start_request():
+    g.request_metrics = RequestMetrics(
+        current_app.config['SLOW_QUERY_THRESHOLD'],
+        track_statements=current_app.config['QUERY_GUARD_ENABLED']
+    )
+
+def _finish_request(response):
+    request_metrics = g.pop('request_metrics', None)
+    if request_metrics is None:
+        return response
+    
+    endpoint = request.endpoint or 'unmatched'
+    duration = time.perf_counter() - request_metrics.started
+    get_metrics().observe(endpoint, request.method, response.status_code, duration, request_metrics)
+    if request_metrics.statements is not None:
+        check_query_patterns(endpoint, request_metrics)
+    return response
+
+def check_query_patterns(endpoint, request_metrics):
+    """Log statements repeated within one request (N+1) and requests running too many"""
+    config = current_app.config
+    for statement, count in request_metrics.statements.items():
+        if count >= config['QUERY_GUARD_REPEAT_THRESHOLD']:
+            current_app.logger.warning(
+                'Possible N+1 in %s: statement ran %d times: %s', endpoint, count, statement)
+    if request_metrics.query_count > config['QUERY_GUARD_MAX_QUERIES']:
+        current_app.logger.warning(
+            '%s ran %d SQL statements (limit %d)',
+            endpoint, request_metrics.query_count, config['QUERY_GUARD_MAX_QUERIES'])
+
+def metrics_view():
+    token = current_app.config['METRICS_ACCESS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return current_app.response_class('Unauthorized\n', status=401, mimetype='text/plain')
+    return current_app.response_class(
+        get_metrics().render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def init_metrics(app):
+    """Instrument every request and serve the registry at METRICS_PATH"""
+    if app.config['QUERY_GUARD_ENABLED'] is None:
+        app.config['QUERY_GUARD_ENABLED'] = app.debug
+    if not app.config['METRICS_ENABLED']:
+        return
+    
+    app.extensions['metrics'] = Metrics()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule(app.config['METRICS_PATH'], 'metrics', metrics_view)
+    
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+def encode_cursor(sort_value, task_id, direction='next'):
+    """Encode a (sort column, id) keyset position into an opaque token"""
+    payload = json.dumps(
+        [sort_value.isoformat(), task_id, direction],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_value, task_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in ('next', 'prev') or not isinstance(task_id, int):
+            raise InvalidCursor(token)
+        return datetime.fromisoformat(sort_value), task_id, direction
+    except (ValueError, TypeError) as err:
+        raise InvalidCursor(token) from err
+
+def keyset_paginate(query, sort_col, id_col, per_page, cursor=None, descending=True):
+    """Seek-based pagination over (sort_col, id), newest first unless descending is False.
+
+    Fetches one extra row to learn whether another page exists, so no
+    COUNT(*) or OFFSET is ever issued. Cursors carry the sort value, so keep
+    the same sort and order while following them. Returns (items,
+    next_cursor, prev_cursor).
+    """
+    direction = 'next'
+    if cursor:
+        sort_value, task_id, direction = decode_cursor(cursor)
+        position = tuple_(sort_col, id_col)
+        # Walking forward in descending order means going to smaller keys
+        if (direction == 'next') == descending:
+            query = query.filter(position < (sort_value, task_id))
+        else:
+            query = query.filter(position > (sort_value, task_id))
+
+    # Previous pages are read in the opposite order, then reversed
+    if (direction == 'next') == descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col.asc(), id_col.asc())
+
+    items = query.limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if direction == 'prev':
+        items.reverse()
+        has_next, has_prev = bool(cursor), has_more
+    else:
+        has_next, has_prev = has_more, bool(cursor)
+
+    next_cursor = prev_cursor = None
+    if items:
+        if has_next:
+            last = items[-1]
+            next_cursor = encode_cursor(getattr(last, sort_col.key), last.id, 'next')
+        if has_prev:
+            first = items[0]
+            prev_cursor = encode_cursor(getattr(first, sort_col.key), first.id, 'prev')
+
+    return items, next_cursor, prev_cursor
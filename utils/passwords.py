@@ -0,0 +1,179 @@
+import asyncio
+import os
+import threading
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue is full or a hash timed out; surfaced to clients as 503"""
+
+def _bcrypt_hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+def _hash(password, method, rounds):
+    if method == 'bcrypt':
+        return _bcrypt_hash(password, rounds)
+    return generate_password_hash(password, method=method)
+
+def _verify(password, password_hash):
+    if password_hash.startswith('$2'):
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+    return check_password_hash(password_hash, password)
+
+class PasswordHasher:
+    """Hashes and verifies passwords off the request thread.
+    
+    method is 'bcrypt' or any werkzeug method string (e.g. 'scrypt' or
+    'pbkdf2:sha256:600000'). Work runs on a bounded pool; once max_pending
+    calls are queued or running, new calls fail fast with PasswordHashingBusy
+    instead of piling up behind a login storm. Calls waiting longer than
+    timeout seconds fail the same way, though their hash keeps its slot
+    until it finishes. workers=0 hashes inline.
+    """
+    
+    def __init__(self, method='bcrypt', rounds=12, workers=None, max_pending=64,
+                 executor='thread', timeout=30, bulk_workers=None):
+        self.method = method
+        self.rounds = rounds
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending
+        self.executor_type = executor
+        self.timeout = timeout
+        self.bulk_workers = bulk_workers
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._method_prefix = None
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            method=config['PASSWORD_HASH_METHOD'],
+            rounds=config['PASSWORD_BCRYPT_ROUNDS'],
+            workers=config['PASSWORD_HASH_WORKERS'],
+            max_pending=config['PASSWORD_HASH_MAX_PENDING'],
+            executor=config['PASSWORD_HASH_EXECUTOR'],
+            bulk_workers=config['PASSWORD_BULK_HASH_WORKERS']
+        )
+    
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                executor_class = ProcessPoolExecutor if self.executor_type == 'process' else ThreadPoolExecutor
+                self._executor = executor_class(max_workers=self.workers)
+            return self._executor
+    
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashingBusy()
+            self._pending += 1
+    
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+    
+    def _submit(self, func, *args):
+        # The slot is freed when the work is done, not when the caller stops waiting
+        self._acquire()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+    
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        
+        future = self._submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHashingBusy() from None
+    
+    async def _run_async(self, func, *args):
+        # Same pool and backpressure, awaited instead of blocking the event loop
+        if not self.workers:
+            return func(*args)
+        
+        future = self._submit(func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise PasswordHashingBusy() from None
+    
+    @property
+    def pending(self):
+        return self._pending
+    
+    def hash(self, password):
+        return self._run(_hash, password, self.method, self.rounds)
+    
+    def verify(self, password, password_hash):
+        return self._run(_verify, password, password_hash)
+    
+    async def hash_async(self, password):
+        return await self._run_async(_hash, password, self.method, self.rounds)
+    
+    async def verify_async(self, password, password_hash):
+        return await self._run_async(_verify, password, password_hash)
+    
+    def hash_many(self, passwords, workers=None):
+        """Hash a batch in parallel on `workers` (default: bulk_workers, or one per core).
+        
+        Runs on a pool of its own rather than the request pool, so bulk
+        provisioning neither queues ahead of logins nor trips max_pending.
+        """
+        workers = workers or self.bulk_workers or os.cpu_count() or 1
+        if workers == 1 or len(passwords) < 2:
+            return [_hash(password, self.method, self.rounds) for password in passwords]
+        
+        executor_class = ProcessPoolExecutor if self.executor_type == 'process' else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            return list(executor.map(
+                _hash, passwords, repeat(self.method), repeat(self.rounds),
+                chunksize=max(1, len(passwords) // (workers * 4))
+            ))
+    
+    @property
+    def method_prefix(self):
+        """The 'method:params' prefix werkzeug writes for the configured method.
+        
+        Taken from a fresh hash, since werkzeug fills in defaults ('scrypt'
+        is stored as 'scrypt:32768:8:1') that change between its versions.
+        """
+        if self._method_prefix is None or self._method_prefix[0] != self.method:
+            self._method_prefix = (self.method, generate_password_hash('', method=self.method).split('$', 1)[0])
+        return self._method_prefix[1]
+    
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different method or cost"""
+        if self.method == 'bcrypt':
+            if not password_hash.startswith('$2'):
+                return True
+            return int(password_hash.split('$')[2]) != self.rounds
+        return password_hash.split('$', 1)[0] != self.method_prefix
+    
+    def reset_after_fork(self):
+        """Drop a pool inherited from the parent process; its workers did not survive the fork"""
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+def init_password_hasher(app):
+    app.extensions['password_hasher'] = PasswordHasher.from_config(app.config)
+
+def get_password_hasher():
+    return current_app.extensions['password_hasher']
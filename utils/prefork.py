@@ -0,0 +1,34 @@
+import gc
+from app import db
+from utils.passwords import get_password_hasher
+from utils.replicas import get_replica_router
+
+def prepare_for_fork(app):
+    """Ready an app built in a pre-fork master for sharing with its workers.
+    
+    Closes pooled connections so no worker inherits a socket, compiles the
+    URL map once instead of on each worker's first request, and freezes the
+    objects built so far: the collector then no longer walks them, which
+    would write to their pages and undo the copy-on-write sharing.
+    """
+    with app.app_context():
+        db.engine.dispose()
+        router = get_replica_router()
+        if router is not None:
+            router.dispose()
+    app.url_map.update()
+    gc.collect()
+    gc.freeze()
+
+def after_fork(app):
+    """Reset per-process state a worker inherited from the master"""
+    with app.app_context():
+        # Leave the parent's connections (if any) to the parent
+        db.engine.dispose(close=False)
+        router = get_replica_router()
+        if router is not None:
+            router.dispose(close=False)
+        if app.config['ASYNC_MODE']:
+            from utils.async_db import async_db
+            async_db.engine.sync_engine.dispose(close=False)
+        get_password_hasher().reset_after_fork()
@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy import insert, or_, select
+from models.user import User
+from schemas.serializers import dump_user
+
+def taken_query(usernames, emails):
+    """Existing users holding any of the usernames or emails, in one lookup over both unique indexes"""
+    return select(User.username, User.email).where(
+        or_(User.username.in_(usernames), User.email.in_(emails))
+    )
+
+def duplicate_error(data, taken):
+    """The registration error for data given rows of taken_query(), or None if both are free"""
+    if any(row.username == data['username'] for row in taken):
+        return 'Username already exists'
+    if any(row.email == data['email'] for row in taken):
+        return 'Email already exists'
+    return None
+
+def provision_users(session, valid, hasher):
+    """Insert users from validated (index, data) pairs without committing.
+    
+    Items whose username or email is taken, in the database or earlier in
+    the batch, fail with the registration errors; a single query checks the
+    whole batch. Only the accepted passwords are hashed, in parallel.
+    Returns a result per item.
+    """
+    taken = session.execute(taken_query(
+        {data['username'] for _, data in valid}, {data['email'] for _, data in valid}
+    )).all()
+    usernames = {row.username for row in taken}
+    emails = {row.email for row in taken}
+    
+    results, accepted = [], []
+    for index, data in valid:
+        if data['username'] in usernames:
+            results.append({'index': index, 'status': 400, 'error': 'Username already exists'})
+        elif data['email'] in emails:
+            results.append({'index': index, 'status': 400, 'error': 'Email already exists'})
+        else:
+            accepted.append((index, data))
+            usernames.add(data['username'])
+            emails.add(data['email'])
+    
+    if accepted:
+        hashes = hasher.hash_many([data['password'] for _, data in accepted])
+        now = datetime.utcnow()
+        rows = [{
+            'username': data['username'],
+            'email': data['email'],
+            'password_hash': password_hash,
+            'role': data['role'],
+            'created_at': now,
+            'updated_at': now
+        } for (_, data), password_hash in zip(accepted, hashes)]
+        
+        users = session.scalars(insert(User).returning(User, sort_by_parameter_order=True), rows).all()
+        for (index, _), user in zip(accepted, users):
+            results.append({'index': index, 'status': 201, 'user': dump_user(user)})
+    
+    return results
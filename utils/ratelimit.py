@@ -0,0 +1,175 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import decode_token
+from werkzeug.utils import import_string
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+EPSILON = 1e-6  # Float slack, so a full burst is never refused by rounding
+
+def parse_limit(limit):
+    """'10/minute' -> (capacity, seconds per token); None means unlimited"""
+    if limit is None:
+        return None
+    count, _, period = limit.partition('/')
+    count, period = int(count), period.strip()
+    seconds = PERIODS[period] if period in PERIODS else float(period)
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f'Invalid rate limit {limit!r}')
+    return count, seconds / count
+
+class RateLimitBackend:
+    """Storage interface for rate limit buckets.
+    
+    A bucket holding up to capacity tokens, refilled one per interval
+    seconds, is fully described by the time it will be full again, so a
+    backend keeps one number per key. Shared backends (e.g. Redis with a
+    script) must make consume() atomic across every worker process.
+    """
+    
+    name = 'base'
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+    
+    def consume(self, key, capacity, interval):
+        """Take a token from the bucket; returns (allowed, remaining, retry_after seconds)"""
+        raise NotImplementedError
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process buckets in a dict; O(1) per request.
+    
+    Full buckets carry no information, so every sweep_interval seconds the
+    consuming request drops them, which bounds memory by the clients seen
+    within one refill period.
+    """
+    
+    name = 'memory'
+    
+    def __init__(self, sweep_interval=60, clock=time.monotonic):
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._full_at = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + sweep_interval
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(sweep_interval=config['RATELIMIT_SWEEP_INTERVAL'])
+    
+    def consume(self, key, capacity, interval):
+        with self._lock:
+            now = self.clock()
+            if now >= self._next_sweep:
+                self.sweep(now)
+            full_at = max(self._full_at.get(key, now), now) + interval
+            backlog = full_at - now  # Seconds of refill owed, including this token
+            window = capacity * interval
+            if backlog > window + EPSILON:
+                return False, 0, backlog - window
+            self._full_at[key] = full_at
+            return True, int((window - backlog) / interval + EPSILON), 0.0
+    
+    def sweep(self, now):
+        self._full_at = {key: full_at for key, full_at in self._full_at.items() if full_at > now}
+        self._next_sweep = now + self.sweep_interval
+    
+    def __len__(self):
+        return len(self._full_at)
+
+BACKENDS = {'memory': MemoryBackend}
+
+class RateLimiter:
+    """Token buckets per client and limit, checked before the view runs.
+    
+    The limit of a request is the first of its endpoint ('auth.login'), its
+    blueprint ('tasks') and 'default' found in the limits; each has its own
+    bucket per client. Clients are the JWT subject of a validly signed
+    token, otherwise the remote address. Nothing here touches the database.
+    """
+    
+    def __init__(self, backend, limits, enabled=True, token_cache_size=10000):
+        self.backend = backend
+        self.limits = {scope: parse_limit(limit) for scope, limit in limits.items()}
+        self.enabled = enabled
+        self.token_cache_size = token_cache_size
+        self._resolved = {}  # endpoint -> (scope, limit)
+        self._subjects = OrderedDict()  # Verified token -> subject; decoding costs more than the check
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, app):
+        config = app.config
+        backend_name = config['RATELIMIT_BACKEND']
+        backend_class = BACKENDS.get(backend_name) or import_string(backend_name)
+        return cls(backend_class.from_config(config), config['RATELIMIT_LIMITS'], enabled=config['RATELIMIT_ENABLED'])
+    
+    def resolve(self, endpoint):
+        resolved = self._resolved.get(endpoint)
+        if resolved is None:
+            scopes = [endpoint, endpoint.rpartition('.')[0]] if endpoint else []
+            scope = next((scope for scope in scopes if scope in self.limits), 'default')
+            resolved = self._resolved[endpoint] = (scope, self.limits.get(scope))
+        return resolved
+    
+    def token_subject(self, token):
+        with self._lock:
+            subject = self._subjects.get(token)
+            if subject is not None:
+                self._subjects.move_to_end(token)
+                return subject
+        try:
+            subject = str(decode_token(token, allow_expired=True)['sub'])
+        except Exception:
+            return None  # Limited by address; the view rejects the token
+        with self._lock:
+            self._subjects[token] = subject
+            while len(self._subjects) > self.token_cache_size:
+                self._subjects.popitem(last=False)
+        return subject
+    
+    def client_key(self):
+        auth = request.headers.get('Authorization', '')
+        subject = self.token_subject(auth[7:]) if auth.startswith('Bearer ') else None
+        return f'user:{subject}' if subject is not None else f'ip:{request.remote_addr}'
+    
+    def check(self):
+        """before_request hook: the 429 response when the client is over its limit"""
+        if not self.enabled or request.method == 'OPTIONS':
+            return None
+        scope, limit = self.resolve(request.endpoint)
+        if limit is None:
+            return None
+        
+        capacity, interval = limit
+        allowed, remaining, retry_after = self.backend.consume(f'{scope}:{self.client_key()}', capacity, interval)
+        g.rate_limit = (capacity, remaining)
+        if allowed:
+            return None
+        
+        retry_after = max(math.ceil(retry_after), 1)
+        response = jsonify({'error': 'Too many requests', 'retry_after': retry_after})
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 429
+
+def _check_rate_limit():
+    return get_rate_limiter().check()
+
+def _add_rate_limit_headers(response):
+    rate_limit = g.pop('rate_limit', None)
+    if rate_limit is not None:
+        response.headers['X-RateLimit-Limit'] = str(rate_limit[0])
+        response.headers['X-RateLimit-Remaining'] = str(rate_limit[1])
+    return response
+
+def get_rate_limiter():
+    return current_app.extensions['rate_limiter']
+
+def init_rate_limiter(app):
+    """Check limits ahead of every other request hook that may query the database"""
+    app.extensions['rate_limiter'] = RateLimiter.from_config(app)
+    app.before_request(_check_rate_limit)
+    app.after_request(_add_rate_limit_headers)
@@ -0,0 +1,154 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context
+from flask_jwt_extended import get_current_user
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql import Select
+
+REPLICA_STRATEGIES = ('round_robin', 'least_loaded')
+
+class ReplicaRouter:
+    """Picks a replica engine for read-only requests.
+    
+    round_robin cycles through the replicas; least_loaded picks the one with
+    the fewest connections checked out of its pool. Users who committed a
+    write in the last `window` seconds keep reading from the primary, so
+    they always see their own changes. That record is per process.
+    """
+    
+    def __init__(self, engines, strategy='round_robin', window=5, maxsize=10000):
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f'Unknown replica strategy {strategy!r}')
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.window = window
+        self.maxsize = maxsize
+        self._cycle = itertools.cycle(self.engines)
+        self._in_use = {engine: 0 for engine in self.engines}
+        self._writes = OrderedDict()
+        self._lock = threading.Lock()
+        
+        for engine in self.engines:
+            event.listen(engine, 'checkout', self._make_counter(engine, 1))
+            event.listen(engine, 'checkin', self._make_counter(engine, -1))
+    
+    def _make_counter(self, engine, delta):
+        def count(*args):
+            with self._lock:
+                self._in_use[engine] += delta
+        return count
+    
+    def choose(self):
+        with self._lock:
+            if self.strategy == 'least_loaded':
+                return min(self.engines, key=self._in_use.__getitem__)
+            return next(self._cycle)
+    
+    def dispose(self, close=True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+    
+    def in_use(self, engine):
+        return self._in_use[engine]
+    
+    def record_write(self, user_id):
+        with self._lock:
+            self._writes[user_id] = time.monotonic() + self.window
+            self._writes.move_to_end(user_id)
+            while len(self._writes) > self.maxsize:
+                self._writes.popitem(last=False)
+    
+    def recently_wrote(self, user_id):
+        with self._lock:
+            until = self._writes.get(user_id)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._writes[user_id]
+                return False
+            return True
+
+def init_replica_router(app):
+    """Create an engine per SQLALCHEMY_REPLICA_URIS entry, with the primary's engine profile"""
+    from utils.engine import engine_options, tune_engine
+    
+    engines = []
+    for uri in app.config.get('SQLALCHEMY_REPLICA_URIS') or ():
+        engine = create_engine(uri, **engine_options(app.config, uri))
+        tune_engine(engine, app.config)
+        engines.append(engine)
+    
+    if engines:
+        app.extensions['replica_router'] = ReplicaRouter(
+            engines,
+            strategy=app.config['REPLICA_STRATEGY'],
+            window=app.config['REPLICA_READ_YOUR_WRITES_WINDOW']
+        )
+
+def get_replica_router():
+    return current_app.extensions.get('replica_router')
+
+def current_user_id():
+    """Id of the JWT-authenticated caller, or None outside protected views"""
+    try:
+        return get_current_user().id
+    except RuntimeError:
+        return None
+
+class RoutingSession(Session):
+    """Session that sends SELECTs to the request's replica, if one was chosen.
+    
+    Everything else (flushes, INSERT/UPDATE/DELETE, raw SQL) and every read
+    outside a replica_reads view stays on the primary.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = g.get('replica_bind') if has_app_context() else None
+        if replica is not None and bind is None and not self._flushing and isinstance(clause, Select):
+            return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _note_write(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _note_bulk_write(orm_execute_state):
+    # insert()/update()/delete() statements run without a flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _record_write(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        router = get_replica_router()
+        user_id = current_user_id()
+        if router is not None and user_id is not None:
+            router.record_write(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_write(session):
+    session.info.pop('wrote', None)
+
+def replica_reads(view):
+    """Serve a read-only view from a replica unless the caller wrote recently.
+    
+    Apply inside jwt_required(), so token revocation is still checked
+    against the primary.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        router = get_replica_router()
+        if router is None or router.recently_wrote(current_user_id()):
+            return view(*args, **kwargs)
+        
+        g.replica_bind = router.choose()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop('replica_bind', None)
+    return wrapper
@@ -0,0 +1,78 @@
+import re
+from flask import current_app
+from sqlalchemy import or_, text, Integer, Float
+from sqlalchemy.exc import OperationalError
+from utils.engine import sqlite_object_exists
+
+FTS_TABLE = 'tasks_fts'
+
+# External-content FTS5 index over tasks(title, description); the triggers
+# keep it in step with every write path, including bulk and cascade deletes.
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+def install_search_index(conn, rebuild=True):
+    """Create the FTS5 index and sync triggers; a no-op off SQLite or without FTS5"""
+    if conn.dialect.name != 'sqlite':
+        return False
+    try:
+        for statement in FTS_DDL:
+            conn.exec_driver_sql(statement)
+    except OperationalError:
+        return False
+    if rebuild:
+        conn.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    return True
+
+def drop_search_index(conn):
+    if conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql('DROP TABLE IF EXISTS tasks_fts')
+
+def fts_available(session):
+    """Whether the database serving the session's reads has the FTS index"""
+    return sqlite_object_exists(session, 'table', FTS_TABLE)
+
+def build_match_expression(search, prefix=False):
+    """Turn free text into an FTS5 query of quoted terms (implicit AND)"""
+    terms = re.findall(r'\w+', search)
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{term}"{suffix}' for term in terms)
+
+def apply_search(query, model, search, prefix=False):
+    """Filter query by search text.
+
+    Uses the FTS index when present, returning the rank column so callers can
+    order by relevance; otherwise falls back to LIKE and returns None.
+    """
+    match = build_match_expression(search, prefix)
+    session = query.session
+    if match and current_app.config.get('SEARCH_FULL_TEXT', True) and fts_available(session):
+        matches = (
+            text('SELECT rowid, rank FROM tasks_fts WHERE tasks_fts MATCH :match')
+            .bindparams(match=match)
+            .columns(rowid=Integer, rank=Float)
+            .subquery('search_matches')
+        )
+        query = query.join(matches, matches.c.rowid == model.id)
+        return query, matches.c.rank
+    
+    query = query.filter(
+        or_(
+            model.title.contains(search),
+            model.description.contains(search)
+        )
+    )
+    return query, None
@@ -0,0 +1,13 @@
+"""
+WSGI entry point for pre-fork servers.
+
+The app is built at import, so a server that preloads it builds it once
+in the master and shares it with every worker:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_CONFIG', 'default'))